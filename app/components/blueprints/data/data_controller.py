@@ -4,14 +4,17 @@ Controlador Flask que se encarga de recibir las peticiones HTTP y delegar
 la lógica a DataService.
 """
 
-from flask import Blueprint, request, redirect, jsonify
+from flask import Blueprint, current_app, g, request, redirect, jsonify, make_response
 from flask_cors import CORS
 from dotenv import load_dotenv
 from marshmallow import ValidationError
-from app.utils.response import render_json_response
+from app.utils.response import render_json_response, render_ndjson_response, render_stream_response
+from app.utils.stage_timing import failed_stage, start_timing, server_timing_header
 from utils.logging.logger_configurator import LoggerConfigurator
 from app.core.config import FlaskConfig
 from app.core.dependency_container import container
+from app.components.services.data.data_validator import BatchSchemaValidator
+from app.components.services.response.batch_processor import create_batch_processor
 
 data_service = container.data_service
 
@@ -27,6 +30,9 @@ config = flask_config.get_config()
 root_API = config['root_API']
 logger.info("Ruta raíz del API: %s", root_API)
 
+batch_config = config.get("BATCH") or {}
+batch_validator = BatchSchemaValidator(batch_config.get("MAX_ITEMS", 500))
+
 @data_controller.route(root_API + '/', methods=['GET'])
 @data_controller.route(           '/', methods=['GET'])
 def redirect_to_frontend():
@@ -46,12 +52,19 @@ def receive_data():
     if request.method == 'HEAD':
         return '', 200
 
+    g.timings = start_timing()
     try:
         logger.info("Request JSON: \n| %s \n", request.json)
         # Procesar la data con nuestro DataService
         response_message = data_service.process_incoming_data(request.json)
-        logger.info("Respuesta generada: %s", response_message)
-        return render_json_response(200, response_message, stream=False)
+        if not isinstance(response_message, str):
+            logger.info("Enviando respuesta en streaming (SSE).")
+            # En streaming, Server-Timing solo cubre las etapas previas al primer fragmento.
+            response = render_stream_response(response_message)
+        else:
+            logger.info("Respuesta generada: %s", response_message)
+            response = make_response(render_json_response(200, response_message, stream=False))
+        return response
 
     except ValidationError as ve:
         logger.error("Error de validación: %s", ve)
@@ -64,6 +77,41 @@ def receive_data():
         return render_json_response(400, "Tipo de dato incorrecto en la solicitud.", stream=False)
 
 
+@data_controller.after_request
+def add_server_timing(response):
+    """
+    Publica las etapas medidas en la cabecera Server-Timing, también en las
+    respuestas de error (4xx y 500 por excepciones no manejadas), junto con la
+    etapa que falló, si alguna.
+    """
+    timings = g.get("timings")
+    if timings is not None:
+        response.headers["Server-Timing"] = server_timing_header(timings, failed_stage())
+    return response
+
+
+@data_controller.route(root_API  +'receive-batch'  , methods=['POST'])
+@data_controller.route('/API/V1/'+'receive-batch'  , methods=['POST'])
+@data_controller.route('/'       + 'receive-batch' , methods=['POST'])
+def receive_batch():
+    """
+    Recibe un lote {"prompts": [{"id", "prompt_user", "user_id"}, ...]} y responde
+    en NDJSON una línea por consulta, en el orden de entrada. Las reglas de negocio
+    se resuelven en el momento y el resto va al LLM con concurrencia acotada.
+    """
+    try:
+        items = batch_validator.validate(request.json)
+    except ValidationError as ve:
+        logger.error("Error de validación del lote: %s", ve)
+        return render_json_response(400, "Datos inválidos en la solicitud.", stream=False)
+
+    logger.info("Procesando lote de %d consultas.", len(items))
+    # Cada consulta corre en el pool con su propio app context (sesiones y base de datos).
+    processor = create_batch_processor(container.response_generator, batch_config,
+                                       context_factory=current_app._get_current_object().app_context)  # pylint: disable=protected-access
+    return render_ndjson_response(processor.process(items))
+
+
 @data_controller.route(root_API  + 'health-check' , methods=['GET'])
 @data_controller.route(root_API  + 'health-check/', methods=['GET'])
 @data_controller.route('/API/V1/'+ 'health-check' , methods=['GET'])
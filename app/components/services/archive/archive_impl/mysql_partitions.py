@@ -0,0 +1,78 @@
+"""
+Path: app/components/services/archive/archive_impl/mysql_partitions.py
+
+Implementación de IConversationPartitions sobre particiones nativas de MySQL/MariaDB
+(migración 0003): PARTITION BY RANGE (TO_DAYS(created_at)), una partición pAAAAMM
+por mes y `pmax` (VALUES LESS THAN MAXVALUE) al final, que debe quedar vacía.
+Las consultas que filtran por created_at solo leen las particiones del rango.
+"""
+
+import datetime
+from typing import Iterator, List
+from sqlalchemy import func, select, text
+from app.components.services.archive.partitions import IConversationPartitions, add_months, partition_name
+from app.models import Conversation
+
+_table = Conversation.__table__
+
+MAXVALUE_PARTITION = "PARTITION pmax VALUES LESS THAN MAXVALUE"
+
+
+def partition_definition(month: datetime.date) -> str:
+    """Definición de la partición de un mes: las filas con created_at anterior al mes siguiente."""
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{add_months(month, 1):%Y-%m-%d}'))"
+
+
+class MySQLPartitions(IConversationPartitions):
+    """
+    Particiones mensuales nativas de `conversations` en MySQL/MariaDB.
+    """
+    def __init__(self, engine):
+        """
+        :param engine: Engine de SQLAlchemy de la base de datos de la aplicación.
+        """
+        self.engine = engine
+
+    def months(self) -> List[datetime.date]:
+        with self.engine.connect() as connection:
+            names = connection.execute(text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+                "ORDER BY PARTITION_ORDINAL_POSITION"), {"table": _table.name}).scalars().all()
+        if not names:
+            raise RuntimeError("La tabla conversations no está particionada: aplicá la migración 0003.")
+        return [datetime.datetime.strptime(name[1:], "%Y%m").date() for name in names if name != "pmax"]
+
+    def ensure(self, until: datetime.date) -> None:
+        months = self.months()
+        month = add_months(months[-1], 1) if months else until
+        missing = []
+        while month <= until:
+            missing.append(partition_definition(month))
+            month = add_months(month, 1)
+        if missing:
+            # pmax está vacía, así que dividirla no copia filas.
+            with self.engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {_table.name} REORGANIZE PARTITION pmax INTO "
+                    f"({', '.join(missing + [MAXVALUE_PARTITION])})"))
+
+    def count(self, month: datetime.date) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(self._in_partition(select(func.count()).select_from(_table), month)).scalar_one()
+
+    def rows(self, month: datetime.date, batch_size: int = 1000) -> Iterator[dict]:
+        # stream_results usa un cursor sin buffer (SSCursor): las filas llegan de a `batch_size`.
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+                self._in_partition(select(_table), month).order_by(_table.c.id))
+            for row in result:
+                yield dict(row._mapping)
+
+    def drop(self, month: datetime.date) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {_table.name} DROP PARTITION {partition_name(month)}"))
+
+    @staticmethod
+    def _in_partition(statement, month: datetime.date):
+        return statement.with_hint(_table, f"PARTITION ({partition_name(month)})", "mysql")
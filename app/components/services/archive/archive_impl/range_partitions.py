@@ -0,0 +1,63 @@
+"""
+Path: app/components/services/archive/archive_impl/range_partitions.py
+
+Implementación de IConversationPartitions para motores sin particiones nativas
+(SQLite en desarrollo y pruebas): cada mes es un rango de created_at sobre la
+tabla única, que aprovecha el índice (user_id, created_at) y se elimina con un DELETE.
+"""
+
+import datetime
+from typing import Iterator, List
+from sqlalchemy import func, select
+from app.components.services.archive.partitions import IConversationPartitions, add_months, month_start
+from app.models import Conversation
+
+_table = Conversation.__table__
+
+
+class RangePartitions(IConversationPartitions):
+    """
+    Meses como rangos [inicio, inicio del mes siguiente) de created_at.
+    """
+    def __init__(self, engine):
+        """
+        :param engine: Engine de SQLAlchemy de la base de datos de la aplicación.
+        """
+        self.engine = engine
+
+    def months(self) -> List[datetime.date]:
+        with self.engine.connect() as connection:
+            first, last = connection.execute(
+                select(func.min(_table.c.created_at), func.max(_table.c.created_at))).one()
+        if first is None:
+            return []
+        months, month = [], month_start(first)
+        while month <= month_start(last):
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def ensure(self, until: datetime.date) -> None:
+        """Sin particiones nativas no hay nada que crear."""
+
+    def count(self, month: datetime.date) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(func.count()).select_from(_table).where(*self._range(month))).scalar_one()
+
+    def rows(self, month: datetime.date, batch_size: int = 1000) -> Iterator[dict]:
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(_table).where(*self._range(month)).order_by(_table.c.id))
+            for row in result:
+                yield dict(row._mapping)
+
+    def drop(self, month: datetime.date) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(_table.delete().where(*self._range(month)))
+
+    @staticmethod
+    def _range(month: datetime.date):
+        start = datetime.datetime.combine(month, datetime.time())
+        end = datetime.datetime.combine(add_months(month, 1), datetime.time())
+        return _table.c.created_at >= start, _table.c.created_at < end
@@ -0,0 +1,172 @@
+"""
+Path: app/components/services/archive/conversation_archiver.py
+Archiva los meses de conversaciones más antiguos que la retención y los elimina
+de la base de datos.
+
+Cada mes se lee con un cursor del lado del servidor (de a BATCH_SIZE filas, con
+memoria acotada) y se escribe en un JSONL comprimido, conversations-AAAA-MM.jsonl.gz,
+con una conversación por línea. El archivo se escribe en un temporario, se
+sincroniza a disco y se renombra; recién entonces, y solo si la cantidad de
+filas escritas coincide con la del mes, se elimina la partición. Si el proceso
+se interrumpe antes de eliminarla, la próxima corrida vuelve a archivar el mes
+en un archivo nuevo (con sufijo), así que ninguna fila se pierde: a lo sumo
+queda repetida, con el mismo `id`.
+
+El mismo proceso crea por adelantado las particiones de los próximos meses.
+Pensado para ejecutarse periódicamente (p. ej. un cron diario):
+    python archive_conversations.py --retention-months 12
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import sys
+from typing import Callable, List, Optional
+from app.components.services.archive.partitions import IConversationPartitions, add_months, month_start
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+class ConversationArchiver:
+    """
+    Archiva y elimina los meses de `conversations` anteriores a la retención.
+    """
+
+    def __init__(self, partitions: IConversationPartitions, archive_dir: str = "archive/conversations",
+                 retention_months: int = 12, months_ahead: int = 3, batch_size: int = 1000,
+                 today: Callable[[], datetime.date] = datetime.date.today):
+        """
+        :param partitions: Particiones mensuales de la tabla de conversaciones.
+        :param archive_dir: Directorio de los archivos JSONL comprimidos.
+        :param retention_months: Meses completos que se conservan además del mes en curso.
+        :param months_ahead: Meses futuros cuyas particiones se crean por adelantado.
+        :param batch_size: Filas por lectura del cursor.
+        :param today: (Opcional) Fecha actual inyectable, útil en pruebas.
+        """
+        self.partitions = partitions
+        self.archive_dir = archive_dir
+        self.retention_months = retention_months
+        self.months_ahead = months_ahead
+        self.batch_size = batch_size
+        self.today = today
+
+    def cutoff(self) -> datetime.date:
+        """Primer mes que se conserva: los anteriores se archivan."""
+        return add_months(month_start(self.today()), -self.retention_months)
+
+    def run(self, dry_run: bool = False) -> List[dict]:
+        """
+        Crea las particiones futuras y archiva los meses vencidos.
+        Retorna un resumen por mes: {"month", "rows", "path"}. Con `dry_run`, solo
+        informa qué meses se archivarían y cuántas filas tienen.
+        """
+        current = month_start(self.today())
+        if not dry_run:
+            self.partitions.ensure(add_months(current, self.months_ahead))
+        cutoff = self.cutoff()
+        results = []
+        for month in self.partitions.months():
+            if month >= cutoff:
+                break
+            if dry_run:
+                results.append({"month": f"{month:%Y-%m}", "rows": self.partitions.count(month), "path": None})
+            else:
+                results.append(self.archive_month(month))
+        return results
+
+    def archive_month(self, month: datetime.date) -> dict:
+        """Escribe el archivo del mes, verifica la cantidad de filas y elimina el mes."""
+        expected = self.partitions.count(month)
+        path = None
+        if expected:
+            path = self._archive_path(month)
+            written = self._write(month, path)
+            if written != expected:
+                os.remove(path)
+                raise RuntimeError(f"El mes {month:%Y-%m} tiene {expected} filas pero se archivaron "
+                                   f"{written}; no se elimina.")
+        self.partitions.drop(month)
+        logger.info("Mes %s archivado (%d conversaciones) en %s.", f"{month:%Y-%m}", expected, path)
+        return {"month": f"{month:%Y-%m}", "rows": expected, "path": path}
+
+    def _archive_path(self, month: datetime.date) -> str:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        base = os.path.join(self.archive_dir, f"conversations-{month:%Y-%m}")
+        path, suffix = base + ".jsonl.gz", 1
+        while os.path.exists(path):
+            suffix += 1
+            path = f"{base}.{suffix}.jsonl.gz"
+        return path
+
+    def _write(self, month: datetime.date, path: str) -> int:
+        """Escribe las filas del mes en `path` de forma atómica; retorna cuántas escribió."""
+        temporary_path = path + ".tmp"
+        written = 0
+        try:
+            with open(temporary_path, "wb") as file:
+                with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+                    for row in self.partitions.rows(month, self.batch_size):
+                        archive.write((json.dumps(row, ensure_ascii=False, default=_json_default) + "\n")
+                                      .encode("utf-8"))
+                        written += 1
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return written
+
+
+def create_conversation_archiver(archive_config: dict,
+                                 partitions: IConversationPartitions) -> ConversationArchiver:
+    """
+    Crea el archivador según la sección CONVERSATION_ARCHIVE de la configuración
+    (RETENTION_MONTHS, MONTHS_AHEAD, ARCHIVE_DIR, BATCH_SIZE).
+    """
+    archive_config = archive_config or {}
+    return ConversationArchiver(
+        partitions,
+        archive_dir=archive_config.get("ARCHIVE_DIR", "archive/conversations"),
+        retention_months=archive_config.get("RETENTION_MONTHS", 12),
+        months_ahead=archive_config.get("MONTHS_AHEAD", 3),
+        batch_size=archive_config.get("BATCH_SIZE", 1000)
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.json", help="Configuración de la aplicación.")
+    parser.add_argument("--retention-months", type=int, help="Meses que se conservan (por defecto, "
+                                                             "CONVERSATION_ARCHIVE).")
+    parser.add_argument("--archive-dir", help="Directorio de los archivos (por defecto, CONVERSATION_ARCHIVE).")
+    parser.add_argument("--dry-run", action="store_true", help="Solo informa qué meses se archivarían.")
+    args = parser.parse_args(argv)
+
+    # pylint: disable=import-outside-toplevel
+    from app.core.config import FlaskConfig, db
+    from app.components.services.archive.partitions import create_conversation_partitions
+
+    flask_config = FlaskConfig(args.config)
+    archive_config = dict(flask_config.get_config().get("CONVERSATION_ARCHIVE") or {})
+    if args.retention_months is not None:
+        archive_config["RETENTION_MONTHS"] = args.retention_months
+    if args.archive_dir:
+        archive_config["ARCHIVE_DIR"] = args.archive_dir
+
+    with flask_config.create_app().app_context():
+        archiver = create_conversation_archiver(archive_config, create_conversation_partitions(db.engine))
+        for result in archiver.run(dry_run=args.dry_run):
+            print(f"{result['month']}: {result['rows']} conversaciones"
+                  + (f" -> {result['path']}" if result["path"] else ""), file=sys.stderr)
+    return 0
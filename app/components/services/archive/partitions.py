@@ -0,0 +1,80 @@
+"""
+Path: app/components/services/archive/partitions.py
+Particiones mensuales de la tabla de conversaciones.
+
+Definición de interfaces (ISP):
+- IConversationPartitions: enumera los meses de la tabla, crea los próximos,
+  recorre las filas de un mes con un cursor del lado del servidor y lo elimina.
+
+Implementaciones (archive_impl):
+- MySQLPartitions: particiones nativas PARTITION BY RANGE (TO_DAYS(created_at)),
+  una por mes (pAAAAMM); eliminar un mes es DROP PARTITION, instantáneo.
+- RangePartitions: cualquier otro motor (SQLite en desarrollo): el "mes" es un
+  rango de created_at sobre la tabla única y eliminarlo es un DELETE por rango.
+"""
+
+import datetime
+from abc import ABC, abstractmethod
+from typing import Iterator, List
+
+
+def month_start(value) -> datetime.date:
+    """Primer día del mes de `value` (date o datetime)."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    """Primer día del mes que está `months` meses después (o antes) de `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    """Nombre de la partición de un mes: pAAAAMM."""
+    return f"p{month:%Y%m}"
+
+
+class IConversationPartitions(ABC):
+    """
+    Interfaz de las particiones mensuales de `conversations`.
+    """
+    @abstractmethod
+    def months(self) -> List[datetime.date]:
+        """
+        Meses (primer día) que pueden tener filas, del más antiguo al más reciente.
+        """
+
+    @abstractmethod
+    def ensure(self, until: datetime.date) -> None:
+        """
+        Crea las particiones que falten hasta el mes `until` inclusive.
+        """
+
+    @abstractmethod
+    def count(self, month: datetime.date) -> int:
+        """
+        Cantidad de filas del mes.
+        """
+
+    @abstractmethod
+    def rows(self, month: datetime.date, batch_size: int = 1000) -> Iterator[dict]:
+        """
+        Filas del mes ordenadas por id, leídas de a `batch_size` con un cursor del
+        lado del servidor: la memoria no depende del tamaño del mes.
+        """
+
+    @abstractmethod
+    def drop(self, month: datetime.date) -> None:
+        """
+        Elimina las filas del mes (y su partición, si el motor las tiene).
+        """
+
+
+def create_conversation_partitions(engine) -> IConversationPartitions:
+    """Particiones para el motor de `engine`: nativas en MySQL/MariaDB, por rango en el resto."""
+    # pylint: disable=import-outside-toplevel
+    if engine.dialect.name in ("mysql", "mariadb"):
+        from app.components.services.archive.archive_impl.mysql_partitions import MySQLPartitions
+        return MySQLPartitions(engine)
+    from app.components.services.archive.archive_impl.range_partitions import RangePartitions
+    return RangePartitions(engine)
@@ -4,112 +4,278 @@ Path: app/components/services/business/business_rules_engine.py
 """
 
 import json
+import os
 import re
-from difflib import get_close_matches
+from functools import lru_cache
 import pymysql
-from Levenshtein import distance as levenshtein_distance
 from app.core.config import FlaskConfig
+from app.components.services.business.rule_index import RuleIndex, TIER_RATIO, TIER_LEVENSHTEIN, TIER_TFIDF
+from app.components.services.business.rule_cache import RuleResultCache, MISSING
+from app.components.services.business.rule_reloader import RuleReloader
+from app.components.services.business.mysql_rule_source import MySQLRuleSource
+from app.components.services.business.phrase_matcher import PhraseMatcher
 from utils.logging.logger_configurator import LoggerConfigurator
 
+_PUNCTUATION_RE = re.compile(r"[^a-záéíóúüñ\s]")
+_REPEATED_CHARS_RE = re.compile(r"(.)\1{2,}")
+
+@lru_cache(maxsize=8192)
+def normalize_text(text: str) -> str:
+    """
+    Normaliza el texto con expresiones precompiladas (memoizado por texto de entrada):
+    - Convierte a minúsculas
+    - Elimina signos de puntuación
+    - Reduce repeticiones de letras (ej. "holaaa" → "hola")
+    """
+    text = text.lower()
+    text = _PUNCTUATION_RE.sub("", text)  # Quitar signos de puntuación
+    text = _REPEATED_CHARS_RE.sub(r"\1", text)  # Reducir repeticiones excesivas de letras
+    return text.strip()
+
 class BusinessRulesEngine:
     """
     Clase que gestiona las reglas de negocio dinámicas para la generación de respuestas.
     Puede obtener reglas desde un archivo JSON o desde MySQL, según la configuración.
+
+    El índice compilado y su caché de resultados se publican juntos en una única
+    tupla (`self._active`), de modo que una recarga los reemplaza con una sola
+    asignación: los lectores nunca se bloquean ni ven un conjunto de reglas a medio construir.
     """
 
-    def __init__(self):
+    def __init__(self, config: dict = None):
+        """
+        :param config: (Opcional) Configuración inyectada. Si no se provee, se usa FlaskConfig.
+        """
         self.logger = LoggerConfigurator().configure()
-        self.config = FlaskConfig().get_config()
+        self.config = config if config is not None else FlaskConfig().get_config()
         self.rule_source = self.config.get("RULE_SOURCE", "json")  # "json" o "mysql"
+        self.mysql_source = None
+        self.rule_priorities = {}  # Prioridad opcional por palabra clave ("priority" en rules.json)
+
+        self._version = self._source_version()
+        self._active = (self._build_index(self._load_rules()), self._new_cache())
+
+        self.reloader = None
+        reload_interval = self.config.get("RULE_RELOAD_INTERVAL", 0)
+        if reload_interval and self.rule_source in ("json", "mysql"):
+            self.reloader = RuleReloader(self, reload_interval, self.logger)
+            self.reloader.start()
+
+    @property
+    def index(self) -> RuleIndex:
+        """Índice compilado activo."""
+        return self._active[0]
+
+    @property
+    def cache(self) -> RuleResultCache:
+        """Caché de resultados asociada al índice activo."""
+        return self._active[1]
+
+    @property
+    def rules(self) -> dict:
+        """Reglas activas (palabra clave normalizada → respuesta)."""
+        return self.index.rules
 
+    def _new_cache(self) -> RuleResultCache:
+        return RuleResultCache(self.config.get("RULE_CACHE_SIZE", 4096))
+
+    def _load_rules(self, strict: bool = False) -> dict:
+        """
+        Carga las reglas desde la fuente configurada.
+
+        :param strict: Si es True, los errores de lectura se propagan en lugar de
+                       devolver un diccionario vacío (usado al recargar, para no
+                       reemplazar reglas válidas por un archivo a medio escribir).
+        """
+        if self.rule_source == "json":
+            return self._load_rules_from_json(strict)
+        if self.rule_source == "mysql":
+            return self._load_rules_from_mysql(strict)
+        self.logger.error("RULE_SOURCE no válido en configuración. Debe ser 'json' o 'mysql'.")
+        return {}
+
+    def _source_version(self):
+        """
+        Marcador de versión de la fuente de reglas:
+        - JSON: (mtime_ns, tamaño) del archivo.
+        - MySQL: (MAX(updated_at), COUNT(*)) de la tabla business_rules.
+        Retorna None si no puede determinarse.
+        """
         if self.rule_source == "json":
-            self.rules = self._load_rules_from_json()
-        elif self.rule_source == "mysql":
-            self.rules = self._load_rules_from_mysql()
-        else:
-            self.logger.error("RULE_SOURCE no válido en configuración. Debe ser 'json' o 'mysql'.")
-            self.rules = {}
-
-    def _load_rules_from_json(self):
+            try:
+                stat = os.stat(self.config.get("RULES_JSON_PATH", "config/rules.json"))
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                return None
+        if self.rule_source == "mysql":
+            return self._mysql_version()
+        return None
+
+    def _mysql_version(self):
+        """Consulta el marcador de versión de la tabla business_rules."""
+        try:
+            return self._mysql_source().version()
+        except (pymysql.MySQLError, KeyError, TypeError) as e:
+            self.logger.error("Error consultando la versión de reglas en MySQL: %s", e)
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Recarga las reglas si cambió el marcador de versión de la fuente.
+        Pensado para ejecutarse desde RuleReloader, fuera del camino de las peticiones.
+
+        :return: True si se recargaron las reglas.
+        """
+        version = self._source_version()
+        if version is None or version == self._version:
+            return False
+        self.set_rules(self._load_rules(strict=True))
+        self._version = version
+        return True
+
+    def stop_reloader(self) -> None:
+        """Detiene la recarga en segundo plano, si está activa."""
+        if self.reloader:
+            self.reloader.stop()
+
+    def _build_index(self, rules: dict) -> RuleIndex:
+        """
+        Compila las reglas en un RuleIndex según la estrategia (RULE_MATCHING_STRATEGY:
+        "cascade" o "tfidf") y los umbrales de la configuración.
+        Con RULE_MATCH_MODE = "phrase" se compila además el autómata de frases.
+        """
+        phrase_matcher = None
+        if self.config.get("RULE_MATCH_MODE", "whole") == "phrase":
+            phrase_matcher = PhraseMatcher(
+                rules.keys(),
+                priorities=self.rule_priorities,
+                tie_break=self.config.get("RULE_PHRASE_TIE_BREAK", "longest"),
+                min_coverage=self.config.get("RULE_PHRASE_MIN_COVERAGE", 0.6)
+            )
+        return RuleIndex(
+            rules,
+            ratio_cutoff=self.config.get("RULE_RATIO_CUTOFF", 0.7),
+            max_distance=self.config.get("RULE_MAX_DISTANCE", 2),
+            phrase_matcher=phrase_matcher,
+            strategy=self.config.get("RULE_MATCHING_STRATEGY", "cascade"),
+            tfidf_threshold=self.config.get("RULE_TFIDF_THRESHOLD", 0.5)
+        )
+
+    def _load_rules_from_json(self, strict: bool = False):
         """Carga reglas de negocio desde un archivo JSON."""
         try:
             with open(self.config.get("RULES_JSON_PATH", "config/rules.json"), "r", encoding="utf-8") as file:
                 data = json.load(file)
 
             rules_dict = {}
+            priorities = {}
             for rule in data["rules"]:
                 for keyword in rule["keywords"]:
                     rules_dict[keyword.lower()] = rule["response"]
+                    if "priority" in rule:
+                        priorities[keyword.lower()] = rule["priority"]
+            self.rule_priorities = priorities
 
             self.logger.info("Reglas de negocio cargadas desde JSON.")
             return rules_dict
         except (FileNotFoundError, json.JSONDecodeError) as e:
             self.logger.error("Error cargando reglas desde JSON: %s", e)
+            if strict:
+                raise
             return {}
 
-    def _load_rules_from_mysql(self):
-        """Carga reglas de negocio desde MySQL."""
+    def _load_rules_from_mysql(self, strict: bool = False):
+        """
+        Carga reglas de negocio desde MySQL. Tras la primera carga, solo se
+        traen las filas modificadas (ver MySQLRuleSource).
+        """
         try:
-            db_config = self.config.get("MYSQL_CONFIG")
-            connection = pymysql.connect(
-                host=db_config["host"],
-                user=db_config["user"],
-                password=db_config["password"],
-                database=db_config["database"],
-                cursorclass=pymysql.cursors.DictCursor
-            )
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT keyword, response FROM business_rules")
-                rules = {row["keyword"].lower(): row["response"] for row in cursor.fetchall()}
-            connection.close()
+            rules = self._mysql_source().load()
             self.logger.info("Reglas de negocio cargadas desde MySQL.")
             return rules
-        except (pymysql.MySQLError, pymysql.OperationalError, pymysql.ProgrammingError) as e:
+        except (pymysql.MySQLError, KeyError, TypeError) as e:
             self.logger.error("Error cargando reglas desde MySQL: %s", e)
+            if strict:
+                raise
             return {}
 
-    def _normalize_text(self, text: str) -> str:
+    def _mysql_source(self) -> MySQLRuleSource:
+        """Retorna la fuente MySQL, creándola (con el pool compartido) la primera vez."""
+        if self.mysql_source is None:
+            self.mysql_source = MySQLRuleSource(self.config.get("MYSQL_CONFIG"), logger=self.logger)
+        return self.mysql_source
+
+    def set_rules(self, rules: dict) -> None:
         """
-        Normaliza el texto:
-        - Convierte a minúsculas
-        - Elimina signos de puntuación
-        - Reduce repeticiones de letras (ej. "holaaa" → "hola")
+        Reemplaza las reglas activas por `rules`. El índice se compila antes de
+        publicarse y se acompaña de una caché vacía, de modo que la caché anterior
+        queda invalidada en la misma asignación.
         """
-        text = text.lower()
-        text = re.sub(r"[^a-záéíóúüñ\s]", "", text)  # Quitar signos de puntuación
-        text = re.sub(r"(.)\1{2,}", r"\1", text)  # Reducir repeticiones excesivas de letras
-        return text.strip()
+        self._active = (self._build_index(rules), self._new_cache())
+        self.logger.info("Reglas de negocio actualizadas: %s palabras clave.", len(rules))
+
+    def cache_stats(self) -> dict:
+        """Retorna los contadores de la caché de resultados."""
+        return self.cache.stats()
+
+    def _normalize_text(self, text: str) -> str:
+        """Normaliza el texto (ver `normalize_text`)."""
+        return normalize_text(text)
 
     def get_response(self, message_input: str):
         """
         Busca una respuesta en las reglas de negocio con:
         - Coincidencia exacta
-        - Búsqueda aproximada con `difflib`
+        - (Modo "phrase") Todas las palabras clave contenidas en el mensaje
+        - Búsqueda aproximada con ratio de `difflib`
         - Distancia de Levenshtein para errores tipográficos
+        Las capas aproximadas se resuelven con el índice de RuleIndex en lugar de
+        recorrer todas las palabras clave. Los resultados (incluidos los fallos) se
+        cachean por texto normalizado.
         """
         message_input = self._normalize_text(message_input)
 
-        # Búsqueda exacta
-        if message_input in self.rules:
-            return self.rules[message_input]
-
-        # Búsqueda aproximada con `difflib`
-        close_matches = get_close_matches(message_input, self.rules.keys(), n=1, cutoff=0.7)
-        if close_matches:
-            self.logger.info("Match aproximado encontrado: %s", close_matches[0])
-            return self.rules[close_matches[0]]
-
-        # Comparación con distancia de Levenshtein
-        best_match = None
-        min_distance = float("inf")
-        for keyword in self.rules.keys():
-            distance = levenshtein_distance(message_input, keyword)
-            if distance < min_distance and distance <= 2:  # Solo aceptar si hay 2 o menos diferencias
-                min_distance = distance
-                best_match = keyword
-
-        if best_match:
-            self.logger.info("Match basado en Levenshtein encontrado: %s", best_match)
-            return self.rules[best_match]
-
-        return None  # No se encontró una respuesta en las reglas
+        # Se toma una única instantánea (índice, caché): si las reglas cambian durante
+        # la búsqueda, el resultado se guarda en la caché descartada, no en la nueva.
+        index, cache = self._active
+        cached = cache.get(message_input)
+        if cached is not MISSING:
+            return cached
+
+        response = self._lookup(index, message_input)
+        cache.put(message_input, response)
+        return response
+
+    def _lookup(self, index: RuleIndex, message_input: str):
+        """Recorre la cascada de búsqueda del índice sobre un texto ya normalizado."""
+        # Las apariciones exactas de frases son más precisas que un parecido
+        # aproximado del mensaje completo, así que se evalúan antes.
+        if index.phrase_matcher and message_input not in index.rules:
+            response = self._lookup_phrases(index, message_input)
+            if response is not None:
+                return response
+
+        match = index.lookup(message_input)
+        if match is None:
+            return None  # No se encontró una respuesta en las reglas
+
+        keyword, tier = match
+        if tier == TIER_RATIO:
+            self.logger.info("Match aproximado encontrado: %s", keyword)
+        elif tier == TIER_LEVENSHTEIN:
+            self.logger.info("Match basado en Levenshtein encontrado: %s", keyword)
+        elif tier == TIER_TFIDF:
+            self.logger.info("Match TF-IDF encontrado: %s", keyword)
+        return index.rules[keyword]
+
+    def _lookup_phrases(self, index: RuleIndex, message_input: str):
+        """
+        Combina las respuestas de todas las frases clave encontradas en el mensaje,
+        sin repetir respuestas y en orden de aparición.
+        """
+        keywords = index.phrase_matcher.match(message_input)
+        if not keywords:
+            return None
+        self.logger.info("Match por frases encontrado: %s", keywords)
+        responses = list(dict.fromkeys(index.rules[keyword] for keyword in keywords))
+        return " ".join(responses)
@@ -0,0 +1,104 @@
+"""
+Path: app/components/services/business/mysql_rule_source.py
+Fuente de reglas de negocio en MySQL con conexiones del pool, cursor del lado
+del servidor y carga incremental.
+
+La primera carga lee toda la tabla en lotes con un cursor no bufferizado
+(SSDictCursor), sin materializar el resultado completo en memoria del cliente.
+Las siguientes cargas solo traen las filas con `updated_at` >= la última marca
+vista. Si la cantidad de filas no coincide (hubo borrados), se hace una carga completa.
+
+Se asume la tabla `business_rules(id, keyword, response, updated_at)`.
+"""
+
+import threading
+import pymysql
+from app.infrastructure.mysql_pool import get_pool
+from utils.logging.logger_configurator import LoggerConfigurator
+
+_COLUMNS = "id, keyword, response, updated_at"
+
+
+class MySQLRuleSource:
+    """
+    Mantiene una copia local de las filas de `business_rules` (id → palabra clave,
+    respuesta) y la sincroniza de forma incremental.
+    """
+
+    def __init__(self, db_config: dict, pool=None, fetch_size: int = 1000, logger=None):
+        """
+        :param db_config: Configuración de conexión (host, user, password, database).
+        :param pool: (Opcional) Pool inyectado. Por defecto se usa el pool compartido.
+        :param fetch_size: Filas leídas por lote desde el cursor del servidor.
+        :param logger: (Opcional) Logger inyectado.
+        """
+        self.pool = pool if pool else get_pool(db_config)
+        self.fetch_size = fetch_size
+        self.logger = logger if logger else LoggerConfigurator().configure()
+        self._rows = {}
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def version(self):
+        """
+        Marcador de versión de la tabla: (MAX(updated_at), COUNT(*)).
+        """
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT MAX(updated_at) AS version, COUNT(*) AS total FROM business_rules")
+                row = cursor.fetchone()
+        return row["version"], row["total"]
+
+    def load(self) -> dict:
+        """
+        Sincroniza la copia local y retorna las reglas (palabra clave → respuesta),
+        ordenadas por id. Propaga los errores de pymysql.
+        """
+        with self._lock:
+            if self._watermark is None:
+                self._full_load()
+            else:
+                self._delta_load()
+            return {keyword: response for _, (keyword, response) in sorted(self._rows.items())}
+
+    def _full_load(self) -> None:
+        rows = {}
+        watermark = None
+        for row in self._stream(f"SELECT {_COLUMNS} FROM business_rules ORDER BY id"):
+            rows[row["id"]] = (row["keyword"].lower(), row["response"])
+            if row["updated_at"] is not None and (watermark is None or row["updated_at"] > watermark):
+                watermark = row["updated_at"]
+        self._rows = rows
+        self._watermark = watermark
+        self.logger.info("Carga completa de reglas desde MySQL: %s filas.", len(rows))
+
+    def _delta_load(self) -> None:
+        changed = 0
+        watermark = self._watermark
+        # ">=" vuelve a leer las filas de la marca actual: es idempotente y evita
+        # perder filas escritas en el mismo instante que la última lectura.
+        for row in self._stream(
+                f"SELECT {_COLUMNS} FROM business_rules WHERE updated_at >= %s ORDER BY updated_at",
+                (self._watermark,)):
+            self._rows[row["id"]] = (row["keyword"].lower(), row["response"])
+            watermark = max(watermark, row["updated_at"])
+            changed += 1
+        self._watermark = watermark
+
+        _, total = self.version()
+        if total != len(self._rows):
+            self.logger.info("Se detectaron reglas eliminadas en MySQL; recargando la tabla completa.")
+            self._full_load()
+        else:
+            self.logger.info("Carga incremental de reglas desde MySQL: %s filas.", changed)
+
+    def _stream(self, query: str, params=None):
+        """Itera las filas de `query` en lotes usando un cursor del lado del servidor."""
+        with self.pool.connection() as connection:
+            with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(query, params)
+                while True:
+                    batch = cursor.fetchmany(self.fetch_size)
+                    if not batch:
+                        break
+                    yield from batch
@@ -0,0 +1,126 @@
+"""
+Path: app/components/services/business/phrase_matcher.py
+Coincidencia de múltiples frases clave dentro de un mensaje con un autómata Aho–Corasick.
+
+Permite responder localmente mensajes como "hola, ¿qué puedes hacer?", que
+contienen varias palabras clave pero no se parecen a ninguna en su totalidad.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+TIE_BREAK_LONGEST = "longest"
+TIE_BREAK_LEFTMOST = "leftmost"
+
+
+class AhoCorasickAutomaton:
+    """
+    Autómata Aho–Corasick sobre caracteres: encuentra todas las apariciones de
+    todos los patrones en una sola pasada lineal sobre el texto.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build_failure_links(self) -> None:
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Itera las apariciones como tuplas (inicio, fin, patrón), con `fin` exclusivo.
+        """
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern in self._output[state]:
+                yield position + 1 - len(pattern), position + 1, pattern
+
+
+class PhraseMatcher:
+    """
+    Selecciona, entre las apariciones de palabras clave en un mensaje, un conjunto
+    sin solapamientos:
+    - Gana la mayor prioridad de regla.
+    - En empate, según `tie_break`: la frase más larga ("longest") o la que
+      aparece primero ("leftmost").
+    Solo se acepta el resultado si las frases cubren al menos `min_coverage`
+    de las palabras del mensaje; así, un saludo al comienzo de una pregunta real
+    no impide que esta llegue al LLM.
+    """
+
+    def __init__(self, keywords: Iterable[str], priorities: Dict[str, int] = None,
+                 tie_break: str = TIE_BREAK_LONGEST, min_coverage: float = 0.6):
+        """
+        :param keywords: Palabras clave normalizadas.
+        :param priorities: (Opcional) Prioridad por palabra clave (mayor gana). Por defecto 0.
+        :param tie_break: "longest" o "leftmost".
+        :param min_coverage: Fracción mínima de palabras del mensaje cubiertas por frases.
+        """
+        if tie_break not in (TIE_BREAK_LONGEST, TIE_BREAK_LEFTMOST):
+            raise ValueError(f"tie_break no válido: {tie_break}")
+        self.priorities = priorities or {}
+        self.tie_break = tie_break
+        self.min_coverage = min_coverage
+        self._automaton = AhoCorasickAutomaton(keywords)
+
+    def match(self, text: str) -> List[str]:
+        """
+        Retorna las palabras clave elegidas, en orden de aparición en `text`,
+        o una lista vacía si no alcanzan la cobertura mínima.
+        """
+        candidates = [
+            (start, end, keyword) for start, end, keyword in self._automaton.iter_matches(text)
+            if (start == 0 or text[start - 1] == " ") and (end == len(text) or text[end] == " ")
+        ]
+        if not candidates:
+            return []
+
+        candidates.sort(key=self._rank)
+        taken = [False] * len(text)
+        selected = []
+        for start, end, keyword in candidates:
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * (end - start)
+                selected.append((start, keyword))
+
+        covered_words = sum(len(keyword.split()) for _, keyword in selected)
+        if covered_words < self.min_coverage * len(text.split()):
+            return []
+        return [keyword for _, keyword in sorted(selected)]
+
+    def _rank(self, candidate: Tuple[int, int, str]):
+        start, end, keyword = candidate
+        priority = -self.priorities.get(keyword, 0)
+        if self.tie_break == TIE_BREAK_LONGEST:
+            return priority, start - end, start
+        return priority, start, start - end
@@ -0,0 +1,80 @@
+"""
+Path: app/components/services/business/rule_cache.py
+Caché LRU acotada de resultados de reglas de negocio.
+
+Guarda tanto aciertos como fallos (mensajes sin regla), de modo que las entradas
+repetidas evitan por completo la cascada de búsqueda del motor.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Centinela para distinguir "no está en caché" de un fallo cacheado (None).
+MISSING = object()
+
+
+class RuleResultCache:
+    """
+    Caché LRU, segura entre hilos, que mapea texto normalizado → respuesta (o None).
+    Lleva contadores de aciertos y fallos para poder observar su efectividad.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        :param maxsize: Cantidad máxima de entradas. Con 0 la caché queda deshabilitada.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Retorna la respuesta cacheada para `key`, o MISSING si no está.
+        """
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value) -> None:
+        """
+        Almacena `value` (puede ser None para recordar un fallo) expulsando la entrada
+        menos usada si se supera `maxsize`.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Invalida todas las entradas (por ejemplo, cuando cambian las reglas).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Retorna tamaño y contadores de la caché.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
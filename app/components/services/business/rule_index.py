@@ -0,0 +1,173 @@
+"""
+Path: app/components/services/business/rule_index.py
+Índice compilado de reglas de negocio.
+
+Reemplaza los recorridos en Python sobre todas las palabras clave por:
+- Un índice de borrados simétricos al estilo SymSpell que encuentra todas las
+  palabras clave a distancia de Levenshtein <= max_distance sin recorrer el diccionario.
+- Cotas exactas para la capa de `difflib`, que buscan la mejor palabra clave sin
+  perder coincidencias:
+  - Longitud: ratio <= 2·min(n, m) / (n + m). Las palabras clave se agrupan por
+    longitud y solo se recorren, de la más prometedora a la menos, las longitudes
+    que todavía pueden alcanzar el cutoff o superar al mejor candidato encontrado.
+  - Multiconjunto de caracteres: ratio <= quick_ratio (2·|caracteres en común| / (n + m)).
+  - Prefiltro en C (rapidfuzz): el ratio de SequenceMatcher nunca supera el ratio
+    Indel (2·LCS / longitud total).
+"""
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+from Levenshtein import distance as levenshtein_distance
+from rapidfuzz import fuzz, process
+
+TIER_EXACT = "exact"
+TIER_RATIO = "ratio"
+TIER_LEVENSHTEIN = "levenshtein"
+TIER_TFIDF = "tfidf"
+
+STRATEGY_CASCADE = "cascade"
+STRATEGY_TFIDF = "tfidf"
+
+
+def _deletes(text: str, max_distance: int) -> Set[str]:
+    """Todas las variantes de `text` con hasta `max_distance` caracteres eliminados."""
+    variants = frontier = {text}
+    for _ in range(min(max_distance, len(text))):
+        frontier = {word[:index] + word[index + 1:] for word in frontier for index in range(len(word))}
+        variants = variants | frontier
+    return variants
+
+
+class RuleIndex:
+    """
+    Índice inmutable de reglas (palabra clave → respuesta).
+
+    Con la estrategia "cascade" mantiene las tres capas de búsqueda del motor original:
+    - Coincidencia exacta.
+    - Mejor ratio de `SequenceMatcher` >= ratio_cutoff (semántica de `get_close_matches`).
+    - Menor distancia de Levenshtein <= max_distance (gana la primera palabra clave en empate).
+
+    Con la estrategia "tfidf", tras la coincidencia exacta se usa la similitud coseno
+    de n-gramas de caracteres (ver TfidfRuleMatcher; requiere NumPy y SciPy).
+
+    Al ser inmutable, puede reconstruirse fuera del camino de la petición y
+    reemplazarse con una sola asignación de referencia.
+    """
+
+    def __init__(self, rules: Dict[str, str], ratio_cutoff: float = 0.7, max_distance: int = 2,
+                 prefix_length: int = 7, phrase_matcher=None, strategy: str = STRATEGY_CASCADE,
+                 tfidf_threshold: float = 0.5):
+        """
+        :param rules: Diccionario palabra clave normalizada → respuesta.
+        :param ratio_cutoff: Ratio mínimo aceptado en la capa aproximada.
+        :param max_distance: Distancia de Levenshtein máxima aceptada.
+        :param prefix_length: Longitud del prefijo indexado en el índice de borrados (SymSpell).
+        :param phrase_matcher: (Opcional) PhraseMatcher compilado con las mismas palabras clave.
+        :param strategy: "cascade" (difflib + Levenshtein) o "tfidf".
+        :param tfidf_threshold: Similitud coseno mínima en la estrategia "tfidf".
+        """
+        if strategy not in (STRATEGY_CASCADE, STRATEGY_TFIDF):
+            raise ValueError(f"Estrategia de coincidencia no válida: {strategy}")
+        self.rules = dict(rules)
+        self.ratio_cutoff = ratio_cutoff
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.phrase_matcher = phrase_matcher
+        self.strategy = strategy
+
+        self._keywords = list(self.rules)
+        self._order = {keyword: position for position, keyword in enumerate(self._keywords)}
+        self._delete_postings: Dict[str, List[str]] = defaultdict(list)
+        self._by_length: Dict[int, List[str]] = defaultdict(list)
+        self.tfidf_matcher = None
+
+        if strategy == STRATEGY_TFIDF:
+            # Importación diferida: NumPy/SciPy solo son necesarios con esta estrategia.
+            from app.components.services.business.tfidf_matcher import TfidfRuleMatcher  # pylint: disable=import-outside-toplevel
+            self.tfidf_matcher = TfidfRuleMatcher(self._keywords, threshold=tfidf_threshold)
+        else:
+            for keyword in self._keywords:
+                self._by_length[len(keyword)].append(keyword)
+                for variant in _deletes(keyword[:prefix_length], max_distance):
+                    self._delete_postings[variant].append(keyword)
+        self._delete_postings = dict(self._delete_postings)
+        self._by_length = dict(self._by_length)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def lookup(self, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Busca `text` (ya normalizado) recorriendo las capas de la estrategia en orden.
+
+        :return: Tupla (palabra clave, capa) o None si no hay coincidencia.
+        """
+        if text in self.rules:
+            return text, TIER_EXACT
+
+        if self.tfidf_matcher is not None:
+            match = self.tfidf_matcher.best_match(text)
+            return (match[0], TIER_TFIDF) if match else None
+
+        keyword = self.closest_by_ratio(text)
+        if keyword is not None:
+            return keyword, TIER_RATIO
+
+        keyword = self.closest_by_distance(text)
+        if keyword is not None:
+            return keyword, TIER_LEVENSHTEIN
+
+        return None
+
+    def closest_by_ratio(self, text: str) -> Optional[str]:
+        """
+        Palabra clave con mayor ratio de `SequenceMatcher` >= ratio_cutoff.
+        En empate gana la mayor lexicográficamente, igual que `get_close_matches(n=1)`.
+        """
+        best = None
+        matcher = SequenceMatcher()
+        matcher.set_seq2(text)
+        length = len(text)
+        for bound, keyword_length in self._length_bounds(length):
+            # Los empates también cuentan: con igual ratio gana la mayor lexicográficamente.
+            floor = self.ratio_cutoff if best is None else max(self.ratio_cutoff, best[0])
+            if bound < floor:
+                break
+            candidates = process.extract(text, self._by_length[keyword_length], scorer=fuzz.ratio,
+                                         score_cutoff=floor * 100 - 1e-6, limit=None)
+            for keyword, _, _ in candidates:
+                floor = self.ratio_cutoff if best is None else max(self.ratio_cutoff, best[0])
+                matcher.set_seq1(keyword)
+                if matcher.quick_ratio() >= floor:
+                    score = matcher.ratio()
+                    if score >= self.ratio_cutoff and (best is None or (score, keyword) > best):
+                        best = (score, keyword)
+        return best[1] if best else None
+
+    def _length_bounds(self, length: int) -> List[Tuple[float, int]]:
+        """Longitudes de palabra clave con su cota de ratio 2·min / suma, de mayor a menor cota."""
+        bounds = [(2.0 * min(length, keyword_length) / (length + keyword_length), keyword_length)
+                  for keyword_length in self._by_length if length + keyword_length]
+        bounds.sort(reverse=True)
+        return bounds
+
+    def closest_by_distance(self, text: str) -> Optional[str]:
+        """
+        Palabra clave con menor distancia de Levenshtein <= max_distance.
+        En empate gana la que aparece primero en las reglas.
+        """
+        candidates = set()
+        for variant in _deletes(text[:self.prefix_length], self.max_distance):
+            candidates.update(self._delete_postings.get(variant, ()))
+
+        best = None
+        for keyword in candidates:
+            if abs(len(keyword) - len(text)) > self.max_distance:
+                continue
+            distance = levenshtein_distance(text, keyword, score_cutoff=self.max_distance)
+            if distance <= self.max_distance:
+                rank = (distance, self._order[keyword], keyword)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
@@ -0,0 +1,56 @@
+"""
+Path: app/components/services/business/rule_reloader.py
+Recarga en segundo plano de las reglas de negocio.
+
+Un hilo daemon consulta periódicamente la versión de la fuente de reglas
+(mtime del JSON o marcador `updated_at` en MySQL) y, si cambió, pide al motor
+que reconstruya el índice fuera del camino de las peticiones.
+"""
+
+import threading
+from utils.logging.logger_configurator import LoggerConfigurator
+
+
+class RuleReloader:
+    """
+    Hilo que invoca `engine.reload_if_changed()` cada `interval` segundos.
+    """
+
+    def __init__(self, engine, interval: float, logger=None):
+        """
+        :param engine: Motor con un método `reload_if_changed()`.
+        :param interval: Segundos entre verificaciones.
+        :param logger: (Opcional) Logger inyectado.
+        """
+        self.engine = engine
+        self.interval = interval
+        self.logger = logger if logger else LoggerConfigurator().configure()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Inicia el hilo de recarga si no está en ejecución."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rule-reloader", daemon=True)
+        self._thread.start()
+        self.logger.info("Recarga de reglas iniciada cada %s segundos.", self.interval)
+
+    def stop(self, timeout: float = None) -> None:
+        """Detiene el hilo de recarga."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        """Indica si el hilo de recarga está activo."""
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.engine.reload_if_changed()
+            except Exception as e:  # pylint: disable=broad-except
+                # El hilo no debe morir por un error transitorio de la fuente.
+                self.logger.error("Error recargando reglas de negocio: %s", e)
@@ -0,0 +1,99 @@
+"""
+Path: app/components/services/business/tfidf_matcher.py
+Estrategia de coincidencia por similitud coseno sobre TF-IDF de n-gramas de caracteres.
+
+Todas las palabras clave se precomputan en una matriz dispersa (SciPy) con filas
+normalizadas; cada mensaje se puntúa contra todas las reglas con un único
+producto matriz-vector, sin bucles de Python por palabra clave.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int]) -> Counter:
+    """Cuenta los n-gramas de caracteres de `text` (con relleno en los extremos)."""
+    padded = f" {text} "
+    grams = Counter()
+    for size in range(ngram_range[0], ngram_range[1] + 1):
+        for i in range(len(padded) - size + 1):
+            grams[padded[i:i + size]] += 1
+    return grams
+
+
+class TfidfRuleMatcher:
+    """
+    Matriz TF-IDF (palabras clave × n-gramas) con filas de norma L2 unitaria.
+    El IDF usa suavizado (log((1 + N) / (1 + df)) + 1) y el TF es sublineal (1 + log tf).
+    """
+
+    def __init__(self, keywords: Iterable[str], ngram_range: Tuple[int, int] = (2, 4),
+                 threshold: float = 0.5):
+        """
+        :param keywords: Palabras clave normalizadas.
+        :param ngram_range: Tamaños mínimo y máximo de n-grama.
+        :param threshold: Similitud coseno mínima para aceptar una coincidencia.
+        """
+        self.keywords = list(keywords)
+        self.ngram_range = tuple(ngram_range)
+        self.threshold = threshold
+
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, keyword in enumerate(self.keywords):
+            for gram, count in char_ngrams(keyword, self.ngram_range).items():
+                col = self.vocabulary.setdefault(gram, len(self.vocabulary))
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+
+        shape = (len(self.keywords), len(self.vocabulary))
+        tf = np.asarray(counts, dtype=np.float64)
+        tf = 1.0 + np.log(tf)
+        document_frequency = np.bincount(np.asarray(cols, dtype=np.int64), minlength=shape[1])
+        self.idf = np.log((1.0 + shape[0]) / (1.0 + document_frequency)) + 1.0
+
+        matrix = sparse.csr_matrix((tf, (rows, cols)), shape=shape)
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        # CSC: seleccionar solo las columnas de los n-gramas presentes en el mensaje es barato.
+        self._matrix = sparse.csr_matrix(matrix.multiply(1.0 / norms[:, None])).tocsc()
+
+    def scores(self, text: str) -> np.ndarray:
+        """Similitud coseno de `text` contra todas las palabras clave."""
+        weights = {}
+        # Los n-gramas fuera del vocabulario no suman al producto, pero sí a la norma
+        # del mensaje (con el IDF máximo), para que un mensaje mucho más largo que
+        # la palabra clave no puntúe alto.
+        unknown = 0.0
+        max_idf = math.log(1.0 + len(self.keywords)) + 1.0
+        for gram, count in char_ngrams(text, self.ngram_range).items():
+            col = self.vocabulary.get(gram)
+            if col is None:
+                unknown += ((1.0 + math.log(count)) * max_idf) ** 2
+            else:
+                weights[col] = (1.0 + math.log(count)) * self.idf[col]
+        if not weights:
+            return np.zeros(len(self.keywords))
+
+        cols = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+        values = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+        norm = math.sqrt(float(values @ values) + unknown)
+        return self._matrix[:, cols] @ (values / norm)
+
+    def best_match(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Retorna (palabra clave, similitud) de la mejor coincidencia >= threshold, o None.
+        En empate gana la primera palabra clave.
+        """
+        if not self.keywords:
+            return None
+        scores = self.scores(text)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self.keywords[best], float(scores[best])
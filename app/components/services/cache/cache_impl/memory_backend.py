@@ -0,0 +1,57 @@
+"""
+Path: app/components/services/cache/cache_impl/memory_backend.py
+
+Implementación en memoria de IResponseCacheBackend: LRU acotada con TTL por entrada.
+Solo se comparte entre los hilos de un mismo proceso.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.components.services.cache.response_cache import IResponseCacheBackend
+
+
+class MemoryCacheBackend(IResponseCacheBackend):
+    """
+    LRU segura entre hilos; las entradas expiradas se descartan al leerlas.
+    """
+    def __init__(self, max_entries: int = 1024, clock=time.monotonic):
+        """
+        :param max_entries: Cantidad máxima de entradas.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,51 @@
+"""
+Path: app/components/services/cache/cache_impl/redis_backend.py
+
+Implementación de IResponseCacheBackend sobre un almacén compatible con Redis.
+
+Acepta cualquier cliente con la API de redis-py (`get`, `set(ex=...)`, `delete`,
+`scan_iter`), por lo que en desarrollo o pruebas puede reemplazarse por un
+sustituto local (p. ej. fakeredis o un servidor compatible como Valkey/KeyDB).
+La expulsión LRU la realiza el servidor (`maxmemory-policy allkeys-lru`).
+"""
+
+from typing import Optional
+from app.components.services.cache.response_cache import IResponseCacheBackend
+
+
+class RedisCacheBackend(IResponseCacheBackend):
+    """
+    Caché compartida entre workers y hosts, con TTL nativo del servidor.
+    """
+    def __init__(self, client, prefix: str = "madybot:resp"):
+        """
+        :param client: Cliente compatible con redis-py.
+        :param prefix: Prefijo de las claves que `clear` puede eliminar.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        """Crea el backend con redis-py (dependencia opcional) a partir de una URL."""
+        try:
+            import redis  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError("El backend 'redis' requiere el paquete 'redis' (pip install redis).") from exc
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(key, value.encode("utf-8"), ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{self.prefix}:*"):
+            self.client.delete(key)
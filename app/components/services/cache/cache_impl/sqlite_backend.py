@@ -0,0 +1,93 @@
+"""
+Path: app/components/services/cache/cache_impl/sqlite_backend.py
+
+Implementación de IResponseCacheBackend sobre un archivo SQLite local.
+En modo WAL, varios procesos (workers) del mismo host comparten la caché.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.components.services.cache.response_cache import IResponseCacheBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteCacheBackend(IResponseCacheBackend):
+    """
+    Caché en SQLite con TTL y expulsión LRU por `accessed_at`.
+    La expulsión se ejecuta cada `evict_every` escrituras para amortizar su costo.
+    """
+    def __init__(self, path: str, max_entries: int = 10000, evict_every: int = 100):
+        """
+        :param path: Ruta del archivo SQLite (se crea el directorio si no existe).
+        :param max_entries: Cantidad máxima aproximada de entradas.
+        :param evict_every: Escrituras entre pasadas de expulsión.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache(accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now))
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM response_cache")
+
+    def _evict(self, now: float) -> None:
+        """Elimina entradas expiradas y, si sobra, las menos usadas recientemente."""
+        self._connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        self._connection.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM response_cache ORDER BY accessed_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,))
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,149 @@
+"""
+Path: app/components/services/cache/response_cache.py
+Caché de respuestas del LLM por coincidencia exacta.
+
+Definición de interfaces (ISP):
+- IResponseCacheBackend: almacenamiento clave → texto con TTL.
+- ResponseCache: calcula la clave (prompt normalizado + modelo + hash de las
+  instrucciones del sistema) y lleva contadores de aciertos y fallos.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalización conservadora para la clave de caché: Unicode NFC, minúsculas y
+    espacios colapsados. No elimina dígitos ni signos, que pueden cambiar la respuesta.
+    """
+    prompt = unicodedata.normalize("NFC", prompt)
+    return _WHITESPACE_RE.sub(" ", prompt).strip().lower()
+
+
+def instruction_hash(system_instruction: str) -> str:
+    """Hash corto de las instrucciones del sistema, para invalidar al cambiarlas."""
+    return hashlib.sha256((system_instruction or "").encode("utf-8")).hexdigest()[:16]
+
+
+def prompt_digest(prompt: str, model: str, instruction_digest: str) -> str:
+    """
+    sha256(modelo, hash de instrucciones, prompt normalizado): identifica una
+    consulta equivalente al LLM, con o sin caché configurada.
+    """
+    material = "\0".join((model, instruction_digest, normalize_prompt(prompt)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class IResponseCacheBackend(ABC):
+    """
+    Interfaz de almacenamiento para la caché de respuestas.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Retorna el valor vigente para `key`, o None si no existe o expiró.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """
+        Guarda `value` bajo `key` durante `ttl` segundos.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Elimina `key` si existe.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Elimina todas las entradas.
+        """
+
+
+class ResponseCache:
+    """
+    Fachada sobre un IResponseCacheBackend que arma las claves y lleva estadísticas.
+    """
+
+    def __init__(self, backend: IResponseCacheBackend, ttl: float = 3600, namespace: str = "madybot:resp"):
+        """
+        :param backend: Almacenamiento concreto (memoria, SQLite, Redis...).
+        :param ttl: Segundos de vigencia de cada respuesta.
+        :param namespace: Prefijo de las claves (útil en almacenes compartidos).
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, prompt: str, model: str, instruction_digest: str) -> str:
+        """
+        Clave determinística: namespace + sha256(modelo, hash de instrucciones, prompt normalizado).
+        """
+        return f"{self.namespace}:{prompt_digest(prompt, model, instruction_digest)}"
+
+    def get(self, prompt: str, model: str, instruction_digest: str) -> Optional[str]:
+        """Retorna la respuesta cacheada o None."""
+        value = self.backend.get(self.make_key(prompt, model, instruction_digest))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, prompt: str, model: str, instruction_digest: str, response: str) -> None:
+        """Guarda una respuesta; las respuestas vacías no se cachean."""
+        if response:
+            self.backend.set(self.make_key(prompt, model, instruction_digest), response, self.ttl)
+
+    def stats(self) -> dict:
+        """Contadores de aciertos y fallos."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+def create_response_cache(cache_config: dict) -> Optional[ResponseCache]:
+    """
+    Crea la caché según la sección RESPONSE_CACHE de la configuración:
+    BACKEND ("memory", "sqlite", "redis" o "none"), TTL, MAX_ENTRIES, SQLITE_PATH, REDIS_URL.
+    Retorna None si la caché está deshabilitada.
+    """
+    cache_config = cache_config or {}
+    backend_name = cache_config.get("BACKEND", "none")
+    max_entries = cache_config.get("MAX_ENTRIES", 1024)
+
+    # Importaciones diferidas: cada backend solo se carga si se usa.
+    # pylint: disable=import-outside-toplevel
+    if backend_name == "memory":
+        from app.components.services.cache.cache_impl.memory_backend import MemoryCacheBackend
+        backend = MemoryCacheBackend(max_entries)
+    elif backend_name == "sqlite":
+        from app.components.services.cache.cache_impl.sqlite_backend import SQLiteCacheBackend
+        backend = SQLiteCacheBackend(cache_config.get("SQLITE_PATH", "cache/responses.sqlite3"), max_entries)
+    elif backend_name == "redis":
+        from app.components.services.cache.cache_impl.redis_backend import RedisCacheBackend
+        backend = RedisCacheBackend.from_url(cache_config.get("REDIS_URL", "redis://localhost:6379/0"))
+    elif backend_name == "none":
+        return None
+    else:
+        raise ValueError(f"Backend de caché no válido: {backend_name}")
+
+    return ResponseCache(backend, ttl=cache_config.get("TTL", 3600))
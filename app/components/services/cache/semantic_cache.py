@@ -0,0 +1,207 @@
+"""
+Path: app/components/services/cache/semantic_cache.py
+Caché aproximada de respuestas del LLM (prompts casi duplicados).
+
+Cada prompt se reduce a un conjunto de términos (sin signos, sin palabras de
+relleno, sin importar el orden) y se resume con una firma MinHash. Un índice LSH
+por bandas encuentra en tiempo casi constante los prompts cacheados candidatos;
+luego se verifica la similitud de Jaccard exacta contra el umbral configurado.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from typing import FrozenSet, Iterable, List, Optional
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 61) - 1
+
+# Palabras de relleno frecuentes en los mensajes de chat en español.
+DEFAULT_STOPWORDS = frozenset("""
+a al algo ante como con de del el en entre es esta este esto favor gracias hola la las le les lo los
+me mi necesito o para pero podrias podria por porfa puedes quiero quisiera saber se sobre su te tu un
+una uno unos unas y ya dime decir explicame explica ayudame
+""".split())
+
+SemanticCacheHit = namedtuple("SemanticCacheHit", ["response", "cached_prompt", "similarity"])
+
+_Entry = namedtuple("_Entry", ["prompt", "terms", "signature", "response", "expires_at", "scope"])
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(char for char in decomposed if unicodedata.category(char) != "Mn")
+
+
+def prompt_terms(prompt: str, stopwords: FrozenSet[str] = DEFAULT_STOPWORDS) -> FrozenSet[str]:
+    """Conjunto de términos significativos del prompt (minúsculas, sin tildes ni relleno)."""
+    tokens = _TOKEN_RE.findall(_strip_accents(prompt.lower()))
+    terms = frozenset(token for token in tokens if token not in stopwords)
+    # Si el prompt solo tiene palabras de relleno, se usan todas para no colisionar con "".
+    return terms or frozenset(tokens)
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """Similitud de Jaccard entre dos conjuntos."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class MinHasher:
+    """
+    Firmas MinHash de `num_perm` funciones de hash universales (a·x + b mod p).
+    """
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        generator = hashlib.blake2b(str(seed).encode("utf-8"), digest_size=16)
+        self.coefficients = []
+        for _ in range(num_perm):
+            generator.update(b"\0")
+            digest = generator.digest()
+            a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+            self.coefficients.append((a, b))
+
+    def signature(self, terms: Iterable[str]) -> List[int]:
+        """Firma MinHash del conjunto de términos."""
+        hashes = [int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+                  for term in terms]
+        if not hashes:
+            return [_MAX_HASH] * len(self.coefficients)
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self.coefficients]
+
+
+class SemanticResponseCache:
+    """
+    Caché en proceso de respuestas para prompts similares (Jaccard >= threshold),
+    con TTL por entrada, expulsión LRU y un registro de las últimas reutilizaciones.
+    """
+
+    def __init__(self, threshold: float = 0.8, ttl: float = 3600, max_entries: int = 2048,
+                 num_perm: int = 64, bands: int = 16, stopwords: FrozenSet[str] = DEFAULT_STOPWORDS,
+                 clock=time.monotonic):
+        """
+        :param threshold: Similitud de Jaccard mínima para reutilizar una respuesta.
+        :param ttl: Segundos de vigencia de cada entrada.
+        :param max_entries: Cantidad máxima de entradas (LRU).
+        :param num_perm: Cantidad de funciones de hash de la firma MinHash.
+        :param bands: Bandas del índice LSH (num_perm debe ser múltiplo de bands).
+        :param stopwords: Palabras que se ignoran al comparar prompts.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands.")
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.stopwords = frozenset(stopwords)
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.recent_hits = deque(maxlen=50)
+
+        self._hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()
+        self._buckets = defaultdict(set)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, scope: str = "") -> Optional[SemanticCacheHit]:
+        """
+        Busca un prompt cacheado similar dentro del mismo `scope` (modelo + instrucciones).
+        Retorna SemanticCacheHit con la respuesta y el prompt reutilizado, o None.
+        """
+        terms = prompt_terms(prompt, self.stopwords)
+        signature = self._hasher.signature(terms)
+        now = self.clock()
+        with self._lock:
+            best = None
+            for entry_id in self._candidates(signature, scope):
+                entry = self._entries[entry_id]
+                if entry.expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                similarity = jaccard(terms, entry.terms)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, entry_id)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            similarity, entry_id = best
+            self._entries.move_to_end(entry_id)
+            entry = self._entries[entry_id]
+            hit = SemanticCacheHit(entry.response, entry.prompt, similarity)
+            self.recent_hits.append({"prompt": prompt, "cached_prompt": entry.prompt,
+                                     "similarity": round(similarity, 3)})
+            return hit
+
+    def store(self, prompt: str, response: str, scope: str = "", ttl: float = None) -> None:
+        """Guarda la respuesta de `prompt` con su propio TTL (por defecto, el de la caché)."""
+        if not response:
+            return
+        terms = prompt_terms(prompt, self.stopwords)
+        signature = self._hasher.signature(terms)
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(prompt, terms, signature, response, expires_at, scope)
+            for band_key in self._band_keys(signature, scope):
+                self._buckets[band_key].add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        """Contadores, tamaño y últimas reutilizaciones (prompt → prompt cacheado)."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "recent_hits": list(self.recent_hits)
+            }
+
+    def _band_keys(self, signature: List[int], scope: str):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield scope, band, tuple(signature[start:start + self.rows])
+
+    def _candidates(self, signature: List[int], scope: str):
+        candidates = set()
+        for band_key in self._band_keys(signature, scope):
+            candidates.update(self._buckets.get(band_key, ()))
+        return candidates
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for band_key in self._band_keys(entry.signature, entry.scope):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band_key]
+
+
+def create_semantic_cache(cache_config: dict) -> Optional[SemanticResponseCache]:
+    """
+    Crea la caché aproximada según la sección SEMANTIC_CACHE de la configuración
+    (ENABLED, THRESHOLD, TTL, MAX_ENTRIES). Retorna None si está deshabilitada.
+    """
+    cache_config = cache_config or {}
+    if not cache_config.get("ENABLED", False):
+        return None
+    return SemanticResponseCache(
+        threshold=cache_config.get("THRESHOLD", 0.8),
+        ttl=cache_config.get("TTL", 3600),
+        max_entries=cache_config.get("MAX_ENTRIES", 2048)
+    )
@@ -4,15 +4,29 @@ Servicio para gestionar la persistencia de conversaciones.
 Aplica el SRP, usando el patrón de repositorio para comunicarse con la base de datos.
 """
 
+import queue
 from sqlalchemy.exc import DatabaseError, IntegrityError
 from app.repositories.conversation_repository import ConversationRepository
+from app.components.services.data.user_persistence_service import user_profile
+from app.components.services.data.user_fingerprint_cache import UserFingerprintCache
 from utils.logging.logger_configurator import LoggerConfigurator
 
 logger = LoggerConfigurator().configure()
 
 class ConversationPersistenceService:
-    def __init__(self, conversation_repository: ConversationRepository):
+    def __init__(self, conversation_repository: ConversationRepository, write_behind=None,
+                 user_fingerprints: UserFingerprintCache = None):
+        """
+        :param conversation_repository: Repositorio de conversaciones.
+        :param write_behind: (Opcional) WriteBehindQueue; si se indica, save_interaction
+                             encola la escritura en lugar de esperar a la base de datos.
+        :param user_fingerprints: (Opcional) Huellas de los últimos perfiles guardados (las de
+                                  UserPersistenceService); si el perfil no cambió, se omite
+                                  el upsert del usuario.
+        """
         self.conversation_repository = conversation_repository
+        self.write_behind = write_behind
+        self.user_fingerprints = user_fingerprints
 
     def save_conversation(self, conversation_data: dict):
         """
@@ -36,6 +50,61 @@ class ConversationPersistenceService:
             logger.error("Error al guardar la conversación: %s", e)
             return None
 
+    def save_interaction(self, conversation_data: dict, user_data: dict = None):
+        """
+        Guarda el usuario y la conversación con su respuesta final en una sola transacción.
+        Retorna el ID de la conversación insertada o None en caso de error. Con escritura
+        diferida, encola el registro y retorna None (el ID se asigna al guardar el lote).
+        Si el perfil del usuario coincide con el último guardado, solo se inserta la conversación.
+        """
+        try:
+            user_id = conversation_data.get("user_id")
+            profile = user_profile(user_data) if user_data is not None else None
+            unchanged = (profile is not None and self.user_fingerprints is not None
+                         and self.user_fingerprints.matches(user_id, profile))
+            record = {
+                "kind": "interaction",
+                "user_id": user_id,
+                "message": conversation_data.get("message"),
+                "response": conversation_data.get("response"),
+                "profile": None if unchanged else profile,
+                "known_profile": profile if unchanged else None
+            }
+            if self.write_behind is not None:
+                try:
+                    self.write_behind.put(record)
+                    self._remember(user_id, record["profile"])
+                    return None
+                except queue.Full:
+                    logger.warning("Cola de escritura diferida llena; se guarda la interacción en línea.")
+                except OSError as e:
+                    logger.warning("No se pudo anotar la interacción en el spool (%s); se guarda en línea.", e)
+            conversation_id = self._save(record)
+            if conversation_id is None and unchanged:
+                # La huella puede estar desactualizada (p. ej. el usuario se borró): sin perfil, el
+                # repositorio no inserta la conversación de un usuario inexistente; se reintenta con el upsert.
+                self.user_fingerprints.forget(user_id)
+                record["profile"] = profile
+                conversation_id = self._save(record)
+            if conversation_id is not None:
+                self._remember(user_id, record["profile"])
+            return conversation_id
+        except (KeyError, TypeError, DatabaseError, IntegrityError) as e:
+            logger.error("Error al guardar la interacción: %s", e)
+            return None
+
+    def _save(self, record: dict):
+        return self.conversation_repository.save_interaction(
+            user_id=record["user_id"],
+            message=record["message"],
+            response=record["response"],
+            user_profile=record["profile"]
+        )
+
+    def _remember(self, user_id, profile) -> None:
+        if profile is not None and self.user_fingerprints is not None:
+            self.user_fingerprints.remember(user_id, profile)
+
     def update_conversation_response(self, conversation_id, response):
         """
         Actualiza la respuesta de una conversación existente.
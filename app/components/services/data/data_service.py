@@ -3,6 +3,7 @@ Path: app/components/services/data/data_service.py
 Servicio para manejar la lógica principal de recepción y procesamiento de datos.
 """
 
+from typing import Iterator, Union
 from marshmallow import ValidationError
 from utils.logging.logger_configurator import LoggerConfigurator
 from app.components.services.data.data_validator import DataSchemaValidator
@@ -10,6 +11,7 @@ from app.components.services.response.response_generator import ResponseGenerato
 from app.components.channels.imessaging_channel import IMessagingChannel
 from app.components.services.data.user_persistence_service import UserPersistenceService
 from app.components.services.data.conversation_persistence_service import ConversationPersistenceService
+from app.utils.stage_timing import stage
 
 logger = LoggerConfigurator().configure()
 
@@ -27,15 +29,19 @@ class DataService:
         self.user_persistence_service = user_persistence_service
         self.conversation_persistence_service = conversation_persistence_service
 
-    def process_incoming_data(self, json_data: dict) -> str:
+    def process_incoming_data(self, json_data: dict) -> Union[str, Iterator[str]]:
         """
         Valida los datos entrantes, obtiene el mensaje y decide si la respuesta
         se genera en streaming o de forma normal.
-        Retorna el mensaje de respuesta final para ser renderizado.
+        Retorna el mensaje de respuesta final para ser renderizado o, en modo
+        streaming, un iterador de fragmentos que persiste la respuesta al terminar.
+        El usuario y la conversación se guardan con la respuesta final en una
+        única transacción, una vez generada la respuesta.
         """
         logger.info("Validando datos: %s", json_data)
         try:
-            valid_data = self.validator.validate(json_data)
+            with stage("validate"):
+                valid_data = self.validator.validate(json_data)
         except ValidationError as err:
             logger.warning("Error de validación: %s", err.messages)
             raise
@@ -51,31 +57,48 @@ class DataService:
         if not user_info:
             raise KeyError("user_data")
 
-        # Preparar los datos para la conversación
-        conversation_data = {
-            'user_id': user_info.get("id"),
-            'message': message_text,
-            'response': None  # La respuesta se actualizará posteriormente
-        }
-
-        # Guardar usuario y conversación con los servicios especializados
-        self.user_persistence_service.save_user(user_info)
-        conversation_id = self.conversation_persistence_service.save_conversation(conversation_data)
+        if is_stream:
+            logger.info("Generando respuesta en modo streaming.")
+            return self._stream_and_persist(user_info, message_text)
 
+        response = None
         try:
-            if is_stream:
-                logger.info("Generando respuesta en modo streaming.")
-                response = self.response_generator.generate_response_streaming(message_text)
-            else:
-                logger.info("Generando respuesta en modo normal.")
-                response = self.response_generator.generate_response(message_text)
-
-            self.conversation_persistence_service.update_conversation_response(conversation_id, response)
+            logger.info("Generando respuesta en modo normal.")
+            with stage("generate"):
+                response = self.response_generator.generate_response(message_text, user_info.get("id"))
             return response
 
         except (ValueError, TypeError) as e:
             logger.error("Error procesando la solicitud: %s", e)
             return "Error procesando la solicitud."
+        finally:
+            # Si la generación falló, el mensaje se guarda igual, sin respuesta.
+            with stage("persist"):
+                self._persist(user_info, message_text, response)
+
+    def _stream_and_persist(self, user_info: dict, message_text: str) -> Iterator[str]:
+        """
+        Reenvía los fragmentos del generador de respuestas y, cuando el stream
+        termina, guarda el usuario y la conversación con la respuesta completa.
+        """
+        parts = []
+        response = None
+        try:
+            for chunk in self.response_generator.generate_response_streaming(message_text, user_info.get("id")):
+                parts.append(chunk)
+                yield chunk
+            response = "".join(parts)
+        finally:
+            self._persist(user_info, message_text, response)
+
+    def _persist(self, user_info: dict, message_text: str, response) -> None:
+        """Upsert del usuario e inserción de la conversación con su respuesta, en una transacción."""
+        conversation_data = {
+            'user_id': user_info.get("id"),
+            'message': message_text,
+            'response': response
+        }
+        self.conversation_persistence_service.save_interaction(conversation_data, user_info)
 
     def save_user(self, user_data: dict):
         """
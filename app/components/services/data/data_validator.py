@@ -4,7 +4,7 @@ Este módulo contiene un esquema de validación de datos
 y un validador para los datos recibidos en el controlador.
 """
 
-from marshmallow import Schema, fields
+from marshmallow import Schema, ValidationError, fields
 
 class BrowserDataSchema(Schema):
     """
@@ -47,6 +47,40 @@ class DataSchema(Schema):
         error_messages={"invalid": "El campo 'datetime' debe ser un valor entero."}
     )
 
+class BatchPromptSchema(Schema):
+    "Esquema de validación de cada consulta de un lote."
+    id = fields.Raw(missing=None)
+    prompt_user = fields.String(
+        required=True,
+        validate=lambda m: len(m) <= 255,
+        error_messages={"required":
+                        "El campo 'prompt_user' es obligatorio.", "validator_failed":
+                        "El campo 'prompt_user' no debe exceder los 255 caracteres."}
+    )
+    user_id = fields.String(missing=None)
+
+class BatchSchema(Schema):
+    "Esquema de validación para los lotes de consultas."
+    prompts = fields.List(
+        fields.Nested(BatchPromptSchema), required=True,
+        error_messages={"required": "El campo 'prompts' es obligatorio."})
+
+class BatchSchemaValidator:
+    """
+    Valida un lote {"prompts": [{"id", "prompt_user", "user_id"}, ...]} y su tamaño máximo.
+    """
+    def __init__(self, max_items: int = 500):
+        self.max_items = max_items
+        self.schema = BatchSchema()
+
+    def validate(self, data):
+        "Valida el lote y retorna las consultas como {'id', 'prompt', 'user_id'}."
+        batch = self.schema.load(data)
+        if not 1 <= len(batch["prompts"]) <= self.max_items:
+            raise ValidationError({"prompts": [f"El lote debe tener entre 1 y {self.max_items} consultas."]})
+        return [{"id": item["id"], "prompt": item["prompt_user"], "user_id": item["user_id"]}
+                for item in batch["prompts"]]
+
 class DataSchemaValidator:
     """
     DataSchemaValidator is a class responsible for validating data against a predefined schema.
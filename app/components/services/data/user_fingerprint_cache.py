@@ -0,0 +1,100 @@
+"""
+Path: app/components/services/data/user_fingerprint_cache.py
+Caché en memoria de la huella (hash) del último perfil de usuario guardado.
+
+Casi todas las solicitudes de un usuario que vuelve traen el mismo perfil de
+navegador; si su huella coincide con la del último perfil guardado, el upsert
+del usuario se omite y la solicitud no toca la tabla de usuarios. Cada proceso
+tiene su caché: el TTL acota cuánto tiempo un proceso puede omitir un perfil
+que otro proceso cambió entretanto.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def profile_fingerprint(profile: dict) -> str:
+    """Hash corto y estable (independiente del orden de las claves) de un perfil."""
+    material = json.dumps(profile, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+class UserFingerprintCache:
+    """
+    LRU segura entre hilos user_id → huella del perfil guardado, con TTL por entrada.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600, clock=time.monotonic):
+        """
+        :param max_entries: Usuarios máximos recordados.
+        :param ttl: Segundos durante los que se confía en la huella guardada.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matches(self, user_id, profile: dict) -> bool:
+        """True si `profile` es el último perfil guardado de `user_id` y su entrada no expiró."""
+        fingerprint = profile_fingerprint(profile)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] <= self.clock():
+                del self._entries[user_id]
+                entry = None
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True
+
+    def remember(self, user_id, profile: dict) -> None:
+        """Anota `profile` como el último perfil guardado de `user_id`."""
+        fingerprint = profile_fingerprint(profile)
+        with self._lock:
+            self._entries[user_id] = (fingerprint, self.clock() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id) -> None:
+        """Descarta la huella de `user_id` (p. ej. si el guardado falló)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        """Entradas y proporción de upserts omitidos."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_user_fingerprint_cache(fingerprint_config: dict) -> Optional[UserFingerprintCache]:
+    """
+    Crea la caché según la sección USER_FINGERPRINT_CACHE de la configuración
+    (ENABLED, MAX_ENTRIES, TTL), o None si está deshabilitada.
+    """
+    fingerprint_config = fingerprint_config or {}
+    if not fingerprint_config.get("ENABLED", True):
+        return None
+    return UserFingerprintCache(
+        max_entries=fingerprint_config.get("MAX_ENTRIES", 10000),
+        ttl=fingerprint_config.get("TTL", 600)
+    )
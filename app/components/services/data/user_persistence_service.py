@@ -4,16 +4,42 @@ Servicio para gestionar la persistencia de datos de usuarios.
 Aplica el SRP, utilizando el patrón de repositorio (REP) para comunicarse con la capa de datos.
 """
 
+import queue
 from sqlalchemy.exc import DatabaseError, IntegrityError
 from app.repositories.user_repository import UserRepository
+from app.components.services.data.user_fingerprint_cache import UserFingerprintCache
 from utils.logging.logger_configurator import LoggerConfigurator
 
 logger = LoggerConfigurator().configure()
 
+def user_profile(user_data: dict) -> dict:
+    """
+    Extrae los campos de perfil de `user_data` (incluyendo los datos de browser)
+    con los nombres de columna de la tabla de usuarios.
+    """
+    browser_data = user_data.get("browserData") or {}
+    return {
+        "user_name": user_data.get("user_name"),
+        "user_email": user_data.get("user_email"),
+        "user_agent": browser_data.get("userAgent"),
+        "screen_resolution": browser_data.get("screenResolution"),
+        "language": browser_data.get("language"),
+        "platform": browser_data.get("platform")
+    }
+
 class UserPersistenceService:
     " Servicio para gestionar la persistencia de datos de usuarios. "
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, write_behind=None,
+                 fingerprints: UserFingerprintCache = None):
+        """
+        :param user_repository: Repositorio de usuarios.
+        :param write_behind: (Opcional) WriteBehindQueue; si se indica, save_user encola el upsert.
+        :param fingerprints: (Opcional) Huellas de los últimos perfiles guardados; si el
+                             perfil no cambió, save_user no accede a la base de datos.
+        """
         self.user_repository = user_repository
+        self.write_behind = write_behind
+        self.fingerprints = fingerprints
 
     def save_user(self, user_data: dict):
         """
@@ -29,10 +55,25 @@ class UserPersistenceService:
             language = user_data.get("browserData", {}).get("language")
             platform = user_data.get("browserData", {}).get("platform")
 
+            profile = user_profile(user_data)
+            if self.fingerprints is not None and self.fingerprints.matches(user_id, profile):
+                logger.debug("Perfil del usuario %s sin cambios; se omite el guardado.", user_id)
+                return None
+
             logger.info("Valores a almacenar en la BD (Usuario): ID=%s, Name=%s, Email=%s, UA=%s, SR=%s, Lang=%s, Plat=%s",
                         user_id, user_name, user_email, user_agent, screen_resolution, language, platform)
 
-            return self.user_repository.ensure_user_exists(
+            if self.write_behind is not None:
+                try:
+                    self.write_behind.put({"kind": "user", "user_id": user_id, "profile": profile})
+                    self._remember(user_id, profile)
+                    return None
+                except queue.Full:
+                    logger.warning("Cola de escritura diferida llena; se guarda el usuario en línea.")
+                except OSError as e:
+                    logger.warning("No se pudo anotar el usuario en el spool (%s); se guarda en línea.", e)
+
+            user = self.user_repository.ensure_user_exists(
                 user_id=user_id,
                 user_name=user_name,
                 user_email=user_email,
@@ -41,10 +82,17 @@ class UserPersistenceService:
                 language=language,
                 platform=platform
             )
+            if user is not None:
+                self._remember(user_id, profile)
+            return user
         except (KeyError, TypeError) as e:
             logger.error("Error al guardar usuario: %s", e)
             return None
 
+    def _remember(self, user_id, profile: dict) -> None:
+        if self.fingerprints is not None:
+            self.fingerprints.remember(user_id, profile)
+
     def get_user_by_id(self, user_id):
         """
         Obtiene un usuario por su ID.
@@ -0,0 +1,402 @@
+"""
+Path: app/components/services/data/write_behind.py
+Cola de escritura diferida (write-behind) para la persistencia de usuarios y conversaciones.
+
+Los servicios de persistencia encolan cada escritura y retornan enseguida; un
+hilo en segundo plano las agrupa y las guarda en lotes (executemany) cuando
+se juntan `max_batch` registros o el más antiguo espera `max_delay` segundos.
+
+Cada registro se anota antes en un spool en disco (JSONL por proceso) y, tras
+cada lote confirmado, se anota su número de secuencia como confirmado; al
+vaciarse la cola el spool se trunca. Si el proceso muere, el siguiente que
+arranca con el mismo directorio retoma los registros no confirmados de los
+spools huérfanos (los que ya no tienen un proceso que los bloquee). La entrega
+es al menos una vez: un corte entre el commit de un lote y su confirmación en
+el spool lo vuelve a escribir.
+
+Un lote que falla con un error permanente (`is_permanent`) `max_attempts` veces
+seguidas se divide a la mitad y se reintenta por partes (bisección), hasta
+aislar los registros que fallan solos; esos se apartan en el archivo
+dead-letter.jsonl del spool y la cola sigue con los siguientes. Los errores
+transitorios (p. ej. la base de datos caída) se reintentan sin límite.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _try_lock(file) -> bool:
+    """Bloqueo exclusivo no bloqueante del archivo; True si se obtuvo."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class WriteBehindQueue:
+    """
+    Cola acotada con spool en disco y un hilo que vacía lotes con `flush_fn`.
+    """
+
+    def __init__(self, flush_fn: Callable[[List[dict]], None], max_batch: int = 200, max_delay: float = 0.5,
+                 spool_dir: Optional[str] = None, fsync: bool = False, max_queue: int = 100000,
+                 put_timeout: float = 1.0, retry_delay: float = 1.0, max_retry_delay: float = 30.0,
+                 max_attempts: int = 3, is_permanent: Optional[Callable[[Exception], bool]] = None):
+        """
+        :param flush_fn: Guarda un lote de registros; debe lanzar una excepción si no lo confirmó.
+        :param max_batch: Registros por lote.
+        :param max_delay: Segundos máximos que un registro espera a completar un lote.
+        :param spool_dir: (Opcional) Directorio del spool; sin él, la cola solo vive en memoria.
+        :param fsync: Si es True, cada registro se sincroniza a disco (sobrevive a un corte de
+                      energía); si no, solo a un fallo del proceso.
+        :param max_queue: Registros pendientes máximos antes de rechazar nuevos.
+        :param put_timeout: Segundos que put() espera lugar en una cola llena antes de lanzar queue.Full.
+        :param retry_delay: Espera inicial (segundos) antes de reintentar un lote fallido.
+        :param max_retry_delay: Espera máxima entre reintentos.
+        :param max_attempts: Intentos de un lote con error permanente antes de dividirlo o,
+                             si tiene un solo registro, apartarlo en el dead-letter.
+        :param is_permanent: (Opcional) Indica si un error no se resuelve reintentando; por
+                             defecto todos se consideran permanentes.
+        """
+        self.flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.spool_dir = spool_dir
+        self.fsync = fsync
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+        self.is_permanent = is_permanent or (lambda error: True)
+        self.context_factory = nullcontext
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.recovered = 0
+        self.dead_lettered = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._pending = deque()
+        self._seq = 0
+        self._spool = None
+        self._closing = False
+        self._draining = 0
+        self._thread = None
+        self._condition = threading.Condition()
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+            self._spool_path = os.path.join(spool_dir, f"spool-{os.getpid()}.jsonl")
+            self._spool = open(self._spool_path, "a+b")  # pylint: disable=consider-using-with
+            _try_lock(self._spool)
+            self._recover(self._spool_path, own=True)
+
+    def start(self, context_factory: Optional[Callable] = None) -> None:
+        """
+        Retoma los spools huérfanos e inicia el hilo de escritura.
+        :param context_factory: (Opcional) Contexto de cada lote, p. ej. el app context de Flask.
+        """
+        if context_factory is not None:
+            self.context_factory = context_factory
+        if self._thread and self._thread.is_alive():
+            return
+        if self.spool_dir:
+            with self._condition:
+                for path in glob.glob(os.path.join(self.spool_dir, "spool-*.jsonl")):
+                    if path != self._spool_path:
+                        self._recover(path, own=False)
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        logger.info("Escritura diferida iniciada (lotes de %d, espera máxima %ss).", self.max_batch, self.max_delay)
+
+    def put(self, record: dict) -> None:
+        """
+        Encola un registro (y lo anota en el spool). Si la cola está llena más de
+        `put_timeout` segundos, lanza queue.Full para que el llamador escriba directo;
+        si no se puede escribir el spool, propaga el OSError sin encolar el registro.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._pending) < self.max_queue, self.put_timeout):
+                raise queue.Full("Cola de escritura diferida llena.")
+            self._append(record)
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que la cola se vacíe; retorna False si venció `timeout`."""
+        with self._condition:
+            self._draining += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(lambda: not self._pending, timeout)
+            finally:
+                self._draining -= 1
+
+    def close(self, timeout: float = 10) -> None:
+        """Vacía la cola (hasta `timeout` segundos) y detiene el hilo; lo pendiente queda en el spool."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._pending:
+            logger.warning("Escritura diferida detenida con %d registros pendientes en el spool.", len(self._pending))
+
+    def stats(self) -> dict:
+        """Profundidad de la cola y latencia de los lotes."""
+        with self._condition:
+            return {
+                "depth": len(self._pending),
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "failures": self.failures,
+                "recovered": self.recovered,
+                "dead_lettered": self.dead_lettered,
+                "last_flush_ms": self.last_flush_ms,
+                "avg_flush_ms": round(self._total_flush_ms / self.batches, 2) if self.batches else None,
+                "max_flush_ms": self.max_flush_ms
+            }
+
+    def _append(self, record: dict) -> None:
+        """Anota el registro en el spool y lo agrega a la cola (con el lock tomado)."""
+        seq = self._seq + 1
+        if self._spool is not None:
+            position = self._spool.tell()
+            try:
+                self._write_spool({"seq": seq, "record": record})
+            except OSError:
+                # Sin una línea a medias, la próxima anotación queda legible.
+                try:
+                    self._spool.truncate(position)
+                except OSError:
+                    pass
+                raise
+        self._seq = seq
+        self._pending.append((seq, record, time.monotonic()))
+
+    def _write_spool(self, entry: dict) -> None:
+        self._spool.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        limit = self.max_batch
+        attempts = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closing)
+                if not self._pending:
+                    return
+                while len(self._pending) < self.max_batch and not self._closing and not self._draining:
+                    remaining = self._pending[0][2] + self.max_delay - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        break
+                batch = [self._pending[index] for index in range(min(limit, len(self._pending)))]
+
+            start = time.perf_counter()
+            try:
+                with self.context_factory():
+                    self.flush_fn([record for _, record, _ in batch])
+            except Exception as e:  # pylint: disable=broad-except
+                # El lote queda al frente de la cola y se reintenta con espera creciente.
+                with self._condition:
+                    self.failures += 1
+                    closing = self._closing
+                logger.error("Error guardando un lote de %d registros diferidos: %s", len(batch), e)
+                attempts += 1
+                if attempts >= self.max_attempts and self.is_permanent(e):
+                    attempts = 0
+                    delay = self.retry_delay
+                    if len(batch) > 1:
+                        limit = len(batch) // 2
+                        logger.warning("Se divide el lote fallido: se reintenta de a %d registros.", limit)
+                    else:
+                        self._dead_letter(batch[0], e)
+                        limit = self.max_batch
+                    continue
+                if closing:
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+
+            attempts = 0
+            delay = self.retry_delay
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._condition:
+                for _ in batch:
+                    self._pending.popleft()
+                self._acknowledge(batch[-1][0])
+                self.flushed += len(batch)
+                self.batches += 1
+                self.last_flush_ms = round(elapsed_ms, 2)
+                self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+                self._total_flush_ms += elapsed_ms
+                if not self._pending:
+                    limit = self.max_batch
+                self._condition.notify_all()
+
+    def _dead_letter(self, entry, error: Exception) -> None:
+        """Aparta un registro que falla solo: lo anota en dead-letter.jsonl y lo quita de la cola."""
+        seq, record, _ = entry
+        logger.error("Registro diferido descartado tras %d intentos (%s): %s", self.max_attempts, error, record)
+        with self._condition:
+            if self.spool_dir:
+                try:
+                    with open(os.path.join(self.spool_dir, "dead-letter.jsonl"), "ab") as file:
+                        file.write((json.dumps({"record": record, "error": str(error), "at": time.time()},
+                                               ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+                        file.flush()
+                        os.fsync(file.fileno())
+                except OSError as e:
+                    logger.error("No se pudo escribir el dead-letter: %s", e)
+            self._pending.popleft()
+            self._acknowledge(seq)
+            self.dead_lettered += 1
+            self._condition.notify_all()
+
+    def _acknowledge(self, seq: int) -> None:
+        """Anota en el spool que hasta `seq` está guardado; con la cola vacía, lo trunca."""
+        if self._spool is None:
+            return
+        if self._pending:
+            self._write_spool({"ack": seq})
+        else:
+            self._spool.truncate(0)
+            self._spool.flush()
+            if self.fsync:
+                os.fsync(self._spool.fileno())
+
+    def _recover(self, path: str, own: bool) -> None:
+        """Vuelve a encolar los registros no confirmados de un spool (propio o huérfano)."""
+        try:
+            if own:
+                spool = self._spool
+            else:
+                spool = open(path, "r+b")  # pylint: disable=consider-using-with
+                if not _try_lock(spool):
+                    spool.close()  # Pertenece a un proceso en ejecución.
+                    return
+            spool.seek(0)
+            records, acknowledged = self._read_spool(spool)
+            if own:
+                spool.truncate(0)
+                spool.flush()
+            for seq, record in records.items():
+                if seq > acknowledged:
+                    self._append(record)
+                    self.recovered += 1
+            if not own:
+                spool.close()
+                os.remove(path)
+            if self.recovered:
+                logger.info("Se retomaron %d escrituras diferidas del spool %s.", self.recovered, path)
+        except OSError as e:
+            logger.error("No se pudo leer el spool %s: %s", path, e)
+
+    @staticmethod
+    def _read_spool(spool):
+        records, acknowledged = {}, 0
+        for line in spool:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Línea incompleta de un corte a mitad de escritura.
+            if "ack" in entry:
+                acknowledged = max(acknowledged, entry["ack"])
+            else:
+                records[entry["seq"]] = entry["record"]
+        return records, acknowledged
+
+
+def merge_profiles(records: List[dict]) -> Dict[str, dict]:
+    """
+    Perfil final de cada usuario de un lote: los valores no nulos más recientes
+    reemplazan a los anteriores.
+    """
+    profiles = {}
+    for record in records:
+        if record.get("profile") is None:
+            continue
+        merged = profiles.setdefault(record["user_id"], {})
+        for field, value in record["profile"].items():
+            if value is not None or field not in merged:
+                merged[field] = value
+    return profiles
+
+
+def persistence_flusher(conversation_repository) -> Callable[[List[dict]], None]:
+    """
+    Función de vaciado para los registros de los servicios de persistencia:
+    {"kind": "user" | "interaction", "user_id", "profile", "known_profile", "message", "response"}.
+    Cada lote se guarda en una transacción: upsert masivo de usuarios e INSERT masivo de conversaciones.
+    `known_profile` es el perfil cuyo upsert se omitió por no haber cambiado: se guarda
+    igual si el usuario ya no existe.
+    """
+    def flush(records: List[dict]) -> None:
+        interactions = [record for record in records if record["kind"] == "interaction"]
+        known_profiles = {record["user_id"]: record["known_profile"]
+                          for record in interactions if record.get("known_profile") is not None}
+        conversation_repository.save_interactions(interactions, merge_profiles(records), known_profiles)
+    return flush
+
+
+def is_permanent_persistence_error(error: Exception) -> bool:
+    """
+    Errores de guardado que no se resuelven reintentando (NOT NULL, clave foránea,
+    valor demasiado largo, registro mal formado). Los de conexión o bloqueo de la
+    base de datos (OperationalError, InterfaceError) son transitorios.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return False
+    return not (isinstance(error, DBAPIError) and error.connection_invalidated)
+
+
+def create_write_behind_queue(write_behind_config: dict, flush_fn,
+                              is_permanent: Optional[Callable[[Exception], bool]] = None
+                              ) -> Optional[WriteBehindQueue]:
+    """
+    Crea la cola según la sección WRITE_BEHIND de la configuración (ENABLED,
+    MAX_BATCH, MAX_DELAY, SPOOL_DIR, FSYNC, MAX_QUEUE, MAX_ATTEMPTS), o None si
+    está deshabilitada.
+    """
+    write_behind_config = write_behind_config or {}
+    if not write_behind_config.get("ENABLED", False):
+        return None
+    return WriteBehindQueue(
+        flush_fn,
+        max_batch=write_behind_config.get("MAX_BATCH", 200),
+        max_delay=write_behind_config.get("MAX_DELAY", 0.5),
+        spool_dir=write_behind_config.get("SPOOL_DIR", "cache/write_behind"),
+        fsync=write_behind_config.get("FSYNC", False),
+        max_queue=write_behind_config.get("MAX_QUEUE", 100000),
+        max_attempts=write_behind_config.get("MAX_ATTEMPTS", 3),
+        is_permanent=is_permanent
+    )
@@ -4,9 +4,16 @@ Path: app/components/services/llm/llm_client.py
 Definición de interfaces (ISP):
 - IBaseLLMClient: interfaz base con el método esencial de envío de mensajes.
 - IStreamingLLMClient: extiende de IBaseLLMClient e incluye envío en modo streaming.
+- IAsyncLLMClient: contraparte asyncio (envío y streaming como iterador asíncrono),
+  para atender muchas generaciones concurrentes sin ocupar un hilo por cada una.
 """
 
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+# Historial previo de la conversación: (rol, texto) con rol "user" o "model",
+# del turno más antiguo al más reciente.
+History = List[Tuple[str, str]]
 
 class IBaseLLMClient(ABC):
     """
@@ -14,9 +21,10 @@ class IBaseLLMClient(ABC):
     Solo define la operación esencial de enviar un mensaje.
     """
     @abstractmethod
-    def send_message(self, message: str) -> str:
+    def send_message(self, message: str, history: Optional[History] = None) -> str:
         """
         Envía un mensaje al modelo LLM y retorna la respuesta completa en texto.
+        Si se indica `history`, se envía como contexto previo de la conversación.
         """
         print("Enviando mensaje...")
 
@@ -30,12 +38,32 @@ class IStreamingLLMClient(IBaseLLMClient, ABC):
     Interfaz para clientes LLM que también soportan envío de mensajes en modo streaming.
     """
     @abstractmethod
-    def send_message_streaming(self, message: str, chunk_size: int = 30) -> str:
+    def send_message_streaming(self, message: str, history: Optional[History] = None) -> Iterator[str]:
         """
-        Envía un mensaje al modelo LLM y retorna la respuesta en modo streaming.
+        Envía un mensaje al modelo LLM y retorna un iterador con los fragmentos
+        de texto a medida que el proveedor los genera.
         """
         print("Enviando mensaje en modo streaming...")
 
     def another_method(self):
         "Another method"
         print("Another method")
+
+
+class IAsyncLLMClient(ABC):
+    """
+    Interfaz asyncio para clientes LLM.
+    """
+    @abstractmethod
+    async def send_message_async(self, message: str, history: Optional[History] = None) -> str:
+        """
+        Envía un mensaje al modelo LLM sin bloquear el event loop y retorna la respuesta completa.
+        """
+
+    @abstractmethod
+    def send_message_streaming_async(self, message: str,
+                                     history: Optional[History] = None) -> AsyncIterator[str]:
+        """
+        Envía un mensaje al modelo LLM y retorna un iterador asíncrono con los
+        fragmentos de texto a medida que el proveedor los genera.
+        """
@@ -1,26 +1,37 @@
 """
 Path: app/services/llm_impl/DeepSeek_llm.py
 
-Implementación de IBaseLLMClient utilizando la API de DeepSeek.
-No se maneja streaming, por lo que solo implementa envío de mensaje.
+Implementación de IBaseLLMClient e IAsyncLLMClient utilizando la API de DeepSeek.
+La versión síncrona solo implementa envío de mensaje; la asíncrona también streaming.
 """
 
 import os
-from openai import OpenAI, AuthenticationError, OpenAIError
+from typing import AsyncIterator, Optional
+from openai import AsyncOpenAI, OpenAI, AuthenticationError, OpenAIError
 from dotenv import load_dotenv
-from app.components.services.llm_client import IBaseLLMClient
+from app.components.services.llm.llm_client import IBaseLLMClient, IAsyncLLMClient, History
 from utils.logging.logger_configurator import LoggerConfigurator
 
 # Cargar API key desde variables de entorno
 load_dotenv()
 api_key = os.getenv("DEEPSEEK_API_KEY")
 
-class DeepSeekLLMClient(IBaseLLMClient):
+class DeepSeekLLMClient(IBaseLLMClient, IAsyncLLMClient):
     """
-    Cliente para la API de DeepSeek, implementando únicamente envío de mensajes.
+    Cliente para la API de DeepSeek: envío de mensajes síncrono y asyncio.
     """
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, model_name: str = "deepseek-chat",
+                 system_instruction: str = "You are a helpful assistant",
+                 request_timeout: Optional[float] = None):
+        """
+        :param request_timeout: (Opcional) Segundos máximos por solicitud, aplicados por el
+                                cliente HTTP del SDK. Sin reintentos propios del SDK: los
+                                hace la capa de resiliencia.
+        """
         self.logger = logger if logger else LoggerConfigurator().configure()
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.request_timeout = request_timeout
 
         if not api_key:
             raise ValueError("API key not found. Please set DEEPSEEK_API_KEY environment variable.")
@@ -28,31 +39,73 @@ class DeepSeekLLMClient(IBaseLLMClient):
         self.logger.info("Usando API Key para DeepSeek: %s", api_key)
 
         # Inicializar el cliente de OpenAI con base_url de DeepSeek
-        self.client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
+        timeout_options = {"timeout": request_timeout, "max_retries": 0} if request_timeout else {}
+        self.client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com", **timeout_options)
+        self.async_client = AsyncOpenAI(api_key=api_key, base_url="https://api.deepseek.com", **timeout_options)
 
-    def send_message(self, message: str) -> str:
+    def send_message(self, message: str, history: Optional[History] = None) -> str:
         """
         Envía un mensaje (sin streaming) y devuelve el texto de la respuesta.
         """
         try:
             response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant"},
-                    {"role": "user", "content": message},
-                ],
+                model=self.model_name,
+                messages=self._build_messages(message, history),
                 stream=False
             )
             return response.choices[0].message.content
-        except AuthenticationError as e:
-            err_msg = f"AuthenticationError en DeepSeek: {e}"
-            self.logger.error(err_msg)
+        except OpenAIError as e:
+            self._log_error(e)
             raise
+
+    async def send_message_async(self, message: str, history: Optional[History] = None) -> str:
+        """
+        Versión asyncio de send_message.
+        """
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(message, history),
+                stream=False
+            )
+            return response.choices[0].message.content
         except OpenAIError as e:
-            # Manejar caso de saldo insuficiente u otros errores
-            if "Insufficient Balance" in str(e):
-                err_msg = "OpenAIError: Insufficient Balance en DeepSeek."
-            else:
-                err_msg = f"OpenAIError en DeepSeek: {e}"
-            self.logger.error(err_msg)
+            self._log_error(e)
             raise
+
+    async def send_message_streaming_async(self, message: str,
+                                           history: Optional[History] = None) -> AsyncIterator[str]:
+        """
+        Envía un mensaje con `stream=True` y genera cada fragmento de texto apenas llega.
+        """
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(message, history),
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except OpenAIError as e:
+            self._log_error(e)
+            raise
+
+    def _build_messages(self, message: str, history: Optional[History]) -> list:
+        """Arma los mensajes en formato OpenAI (el rol "model" se envía como "assistant")."""
+        messages = [{"role": "system", "content": self.system_instruction}]
+        for role, text in history or ():
+            messages.append({"role": "assistant" if role == "model" else "user", "content": text})
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _log_error(self, e: OpenAIError) -> None:
+        """Registra el error de la API con un mensaje específico según su tipo."""
+        if isinstance(e, AuthenticationError):
+            err_msg = f"AuthenticationError en DeepSeek: {e}"
+        # Manejar caso de saldo insuficiente u otros errores
+        elif "Insufficient Balance" in str(e):
+            err_msg = "OpenAIError: Insufficient Balance en DeepSeek."
+        else:
+            err_msg = f"OpenAIError en DeepSeek: {e}"
+        self.logger.error(err_msg)
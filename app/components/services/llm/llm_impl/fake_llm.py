@@ -0,0 +1,149 @@
+"""
+Path: app/components/services/llm/llm_impl/fake_llm.py
+
+Cliente LLM local que simula un proveedor, para pruebas de carga y desarrollo
+sin llamar a APIs pagas. Implementa IStreamingLLMClient e IAsyncLLMClient con
+latencia configurable (fija, uniforme o log-normal), velocidad de generación
+en tokens por segundo, streaming e inyección de errores.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from typing import AsyncIterator, Iterator, List, Optional
+from app.components.services.llm.llm_client import IStreamingLLMClient, IAsyncLLMClient, History
+
+_WORDS = (
+    "la cooperativa registra el flujo de fondos de cada mes para planificar pagos compras "
+    "y sueldos con el precio de la materia prima y el stock del producto final podemos "
+    "calcular el punto de equilibrio y la tasa de interés que conviene para el crédito"
+).split()
+
+
+class FakeLLMError(Exception):
+    """Error simulado del proveedor; `code` imita el estado HTTP (p. ej. 503 o 429)."""
+
+    def __init__(self, message: str, code: int = 503):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeLLMClient(IStreamingLLMClient, IAsyncLLMClient):
+    """
+    Proveedor simulado: demora `latency` (tiempo hasta el primer token) y luego
+    genera `response_tokens` palabras a `tokens_per_second`.
+    """
+
+    def __init__(self, model_name: str = "fake-llm", latency_distribution: str = "lognormal",
+                 latency_ms: float = 300, latency_sigma: float = 0.5, tokens_per_second: float = 50,
+                 response_tokens: int = 60, error_rate: float = 0.0, error_code: int = 503,
+                 seed: Optional[int] = None, sleep=time.sleep):
+        """
+        :param model_name: Nombre informado del modelo.
+        :param latency_distribution: "fixed", "uniform" (0 a 2·latency_ms) o "lognormal".
+        :param latency_ms: Latencia hasta el primer token (mediana en "lognormal").
+        :param latency_sigma: Dispersión de la distribución log-normal.
+        :param tokens_per_second: Velocidad de generación (0 = instantánea).
+        :param response_tokens: Palabras de cada respuesta.
+        :param error_rate: Probabilidad de que una llamada falle con FakeLLMError.
+        :param error_code: Estado HTTP simulado de los errores.
+        :param seed: (Opcional) Semilla para reproducir latencias y errores.
+        :param sleep: (Opcional) Función de espera inyectable, útil en pruebas.
+        """
+        if latency_distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Distribución de latencia no válida: {latency_distribution}")
+        self.model_name = model_name
+        self.latency_distribution = latency_distribution
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.sleep = sleep
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, fake_config: dict, model_name: str = "fake-llm") -> "FakeLLMClient":
+        """
+        Crea el cliente desde la sección FAKE_LLM (LATENCY_DISTRIBUTION, LATENCY_MS,
+        LATENCY_SIGMA, TOKENS_PER_SECOND, RESPONSE_TOKENS, ERROR_RATE, ERROR_CODE, SEED).
+        """
+        fake_config = fake_config or {}
+        return cls(
+            model_name=model_name,
+            latency_distribution=fake_config.get("LATENCY_DISTRIBUTION", "lognormal"),
+            latency_ms=fake_config.get("LATENCY_MS", 300),
+            latency_sigma=fake_config.get("LATENCY_SIGMA", 0.5),
+            tokens_per_second=fake_config.get("TOKENS_PER_SECOND", 50),
+            response_tokens=fake_config.get("RESPONSE_TOKENS", 60),
+            error_rate=fake_config.get("ERROR_RATE", 0.0),
+            error_code=fake_config.get("ERROR_CODE", 503),
+            seed=fake_config.get("SEED")
+        )
+
+    def send_message(self, message: str, history: Optional[History] = None) -> str:
+        first_token_delay, fails, tokens = self._plan(message)
+        self.sleep(first_token_delay)
+        if fails:
+            raise FakeLLMError(f"{self.model_name}: error simulado", self.error_code)
+        self.sleep(self._generation_time(len(tokens)))
+        return " ".join(tokens)
+
+    def send_message_streaming(self, message: str, history: Optional[History] = None) -> Iterator[str]:
+        first_token_delay, fails, tokens = self._plan(message)
+        self.sleep(first_token_delay)
+        if fails:
+            raise FakeLLMError(f"{self.model_name}: error simulado", self.error_code)
+        for index, token in enumerate(tokens):
+            if index:
+                self.sleep(self._generation_time(1))
+            yield token if index == 0 else " " + token
+
+    async def send_message_async(self, message: str, history: Optional[History] = None) -> str:
+        first_token_delay, fails, tokens = self._plan(message)
+        await asyncio.sleep(first_token_delay)
+        if fails:
+            raise FakeLLMError(f"{self.model_name}: error simulado", self.error_code)
+        await asyncio.sleep(self._generation_time(len(tokens)))
+        return " ".join(tokens)
+
+    async def send_message_streaming_async(self, message: str,
+                                           history: Optional[History] = None) -> AsyncIterator[str]:
+        first_token_delay, fails, tokens = self._plan(message)
+        await asyncio.sleep(first_token_delay)
+        if fails:
+            raise FakeLLMError(f"{self.model_name}: error simulado", self.error_code)
+        for index, token in enumerate(tokens):
+            if index:
+                await asyncio.sleep(self._generation_time(1))
+            yield token if index == 0 else " " + token
+
+    def _plan(self, message: str):
+        """Sortea la latencia y el error de una llamada y arma la respuesta."""
+        with self._lock:
+            self.calls += 1
+            fails = self._random.random() < self.error_rate
+            if self.latency_distribution == "fixed":
+                latency_ms = self.latency_ms
+            elif self.latency_distribution == "uniform":
+                latency_ms = self._random.uniform(0, 2 * self.latency_ms)
+            else:
+                latency_ms = self._random.lognormvariate(math.log(max(self.latency_ms, 1e-3)),
+                                                         self.latency_sigma)
+        return latency_ms / 1000, fails, self._tokens(message)
+
+    def _tokens(self, message: str) -> List[str]:
+        """Respuesta determinística: eco del mensaje seguido de texto de relleno."""
+        words = message.split()[:self.response_tokens]
+        filler = self.response_tokens - len(words)
+        return words + [_WORDS[index % len(_WORDS)] for index in range(filler)]
+
+    def _generation_time(self, tokens: int) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.tokens_per_second
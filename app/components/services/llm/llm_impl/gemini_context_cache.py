@@ -0,0 +1,213 @@
+"""
+Path: app/components/services/llm/llm_impl/gemini_context_cache.py
+Caché de contexto de Gemini para el prefijo estático del prompt (la instrucción del sistema).
+
+Sin caché, cada llamada envía la instrucción completa y el proveedor vuelve a
+procesar esos tokens. Con un CachedContent, las llamadas solo referencian el
+contenido ya procesado. Esta clase lo crea (o reutiliza el de otro worker con
+la misma instrucción), extiende su TTL antes de que venza y lo reemplaza
+cuando cambia el hash de la instrucción. Si el proveedor no admite la caché
+(SDK sin soporte, modelo sin caché, instrucción por debajo del mínimo de
+tokens o error de la API), content() retorna None y el cliente sigue con la
+instrucción completa; se vuelve a intentar tras `retry_after` segundos.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+from utils.logging.logger_configurator import LoggerConfigurator
+
+_fallback_logger = LoggerConfigurator().configure()
+
+
+class GeminiContextCache:
+    """
+    Administra el CachedContent de la instrucción del sistema de un modelo de Gemini.
+    """
+
+    def __init__(self, model_name: str, instruction_provider: Callable[[], str], ttl: float = 3600,
+                 refresh_margin: float = 300, check_interval: float = 5, retry_after: float = 300,
+                 caching=None, logger=None, clock=time.time):
+        """
+        :param model_name: Modelo de Gemini del contenido cacheado.
+        :param instruction_provider: Función que retorna la instrucción del sistema vigente.
+        :param ttl: Segundos de vida del contenido cacheado en el proveedor.
+        :param refresh_margin: Segundos antes del vencimiento en que se extiende el TTL.
+        :param check_interval: Segundos entre verificaciones de cambios de la instrucción.
+        :param retry_after: Segundos sin caché tras un error, antes de reintentar.
+        :param caching: (Opcional) Módulo `google.generativeai.caching` o un sustituto en pruebas.
+        :param logger: (Opcional) Logger inyectado.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        self.model_name = model_name
+        self.instruction_provider = instruction_provider
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self.logger = logger if logger else _fallback_logger
+        self.clock = clock
+        self.caching = caching if caching is not None else self._import_caching()
+        self.system_instruction = instruction_provider()
+        self.digest = self._digest(self.system_instruction)
+        self.creations = 0
+        self.refreshes = 0
+        self.failures = 0
+        self._content = None
+        self._expires_at = 0.0
+        self._checked_at = self.clock()
+        self._disabled_until = 0.0
+        self._updating = False
+        self._lock = threading.Lock()
+
+    def content(self):
+        """
+        Retorna el CachedContent vigente para la instrucción actual, creándolo o
+        extendiéndolo si hace falta, o None si la caché no está disponible.
+
+        Las llamadas a la API (crear, extender, borrar) se hacen fuera del lock: un
+        solo pedido las reserva y los demás no esperan; mientras tanto usan el
+        contenido aún vigente o, si no hay, la instrucción completa.
+        """
+        with self._lock:
+            now = self.clock()
+            previous = None
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                previous = self._check_instruction()
+            content = self._content
+            usable = content if content is not None and now < self._expires_at else None
+            if self.caching is None or now < self._disabled_until:
+                usable, work = None, None
+            elif usable is not None and now < self._expires_at - self.refresh_margin:
+                work = None
+            elif self._updating:
+                work = None
+            else:
+                self._updating = True
+                work = (self.digest, self.system_instruction, self.display_name, usable)
+        self._delete(previous, "No se pudo borrar la caché de contexto anterior")
+        if work is None:
+            return usable
+
+        digest, instruction, display_name, current = work
+        try:
+            if current is not None:
+                current.update(ttl=timedelta(seconds=self.ttl))
+                refreshed = current
+            else:
+                refreshed = self._create(instruction, display_name)
+        except Exception as e:  # pylint: disable=broad-except
+            with self._lock:
+                self._updating = False
+                if digest == self.digest:
+                    self._content = None
+                    self._disabled_until = now + self.retry_after
+                self.failures += 1
+            self.logger.warning("Caché de contexto de Gemini no disponible, se envía la "
+                                "instrucción completa durante %ss: %s", self.retry_after, e)
+            return None
+
+        with self._lock:
+            self._updating = False
+            if digest != self.digest:
+                # La instrucción cambió durante la llamada: este contenido ya no corresponde.
+                return None
+            if current is not None:
+                self.refreshes += 1
+            self._content = refreshed
+            self._expires_at = now + self.ttl
+            return refreshed
+
+    def invalidate(self, delete: bool = True) -> None:
+        """
+        Olvida el contenido cacheado (p. ej. si el proveedor ya no lo encuentra);
+        con `delete`, también lo borra en el proveedor.
+        """
+        with self._lock:
+            content, self._content = self._content, None
+        if delete:
+            self._delete(content, "No se pudo borrar la caché de contexto de Gemini")
+
+    def stats(self) -> dict:
+        """Estado observable de la caché de contexto."""
+        with self._lock:
+            return {
+                "active": self._content is not None,
+                "name": getattr(self._content, "name", None),
+                "digest": self.digest,
+                "creations": self.creations,
+                "refreshes": self.refreshes,
+                "failures": self.failures
+            }
+
+    @property
+    def display_name(self) -> str:
+        """Nombre con el hash de la instrucción, compartido por todos los workers."""
+        return f"madybot-{self.digest[:16]}"
+
+    def _check_instruction(self):
+        """
+        Si la instrucción cambió, descarta el contenido cacheado de la anterior (se
+        llama con el lock tomado). Retorna ese contenido, para borrarlo fuera del lock.
+        """
+        instruction = self.instruction_provider()
+        digest = self._digest(instruction)
+        if digest == self.digest:
+            return None
+        self.logger.info("La instrucción del sistema cambió; se renueva la caché de contexto de Gemini.")
+        previous = self._content
+        self.system_instruction = instruction
+        self.digest = digest
+        self._content = None
+        self._disabled_until = 0.0
+        return previous
+
+    def _create(self, instruction: str, display_name: str):
+        """Reutiliza el contenido de otro worker con la misma instrucción o crea uno nuevo."""
+        content = self._find_existing(display_name)
+        if content is not None:
+            content.update(ttl=timedelta(seconds=self.ttl))
+            return content
+        content = self.caching.CachedContent.create(
+            model=self.model_name,
+            display_name=display_name,
+            system_instruction=instruction,
+            ttl=timedelta(seconds=self.ttl)
+        )
+        with self._lock:
+            self.creations += 1
+        self.logger.info("Caché de contexto de Gemini creada: %s", content.name)
+        return content
+
+    def _delete(self, content, message: str) -> None:
+        if content is None:
+            return
+        try:
+            content.delete()
+        except Exception as e:  # pylint: disable=broad-except
+            self.logger.warning("%s: %s", message, e)
+
+    def _find_existing(self, display_name: str):
+        try:
+            for content in self.caching.CachedContent.list():
+                if content.display_name == display_name and self.model_name in content.model:
+                    return content
+        except Exception as e:  # pylint: disable=broad-except
+            self.logger.debug("No se pudieron listar las cachés de contexto: %s", e)
+        return None
+
+    @staticmethod
+    def _digest(instruction: str) -> str:
+        return hashlib.sha256(instruction.encode("utf-8")).hexdigest()
+
+    def _import_caching(self):
+        try:
+            # pylint: disable=import-outside-toplevel
+            from google.generativeai import caching
+        except ImportError:
+            self.logger.warning("La versión instalada de google-generativeai no soporta caché de contexto.")
+            return None
+        return caching
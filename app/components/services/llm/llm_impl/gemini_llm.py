@@ -1,84 +1,187 @@
 """
 Path: app/services/llm_impl/gemini_llm.py
 
-Implementación de IStreamingLLMClient utilizando la API de Gemini.
-Acepta un logger inyectado opcionalmente.
+Implementación de IStreamingLLMClient e IAsyncLLMClient utilizando la API de Gemini.
+Acepta un logger inyectado opcionalmente y, con una GeminiContextCache, envía
+la instrucción del sistema como contenido cacheado en el proveedor.
 """
 
+from typing import AsyncIterator, Iterator, Optional
 import google.generativeai as genai
-from app.components.services.llm.llm_client import IStreamingLLMClient
+from app.components.services.llm.llm_client import IStreamingLLMClient, IAsyncLLMClient, History
+from app.components.services.llm.llm_impl.gemini_context_cache import GeminiContextCache
 from utils.logging.logger_configurator import LoggerConfigurator
 
 # Logger por defecto si no se inyecta uno externo.
 _fallback_logger = LoggerConfigurator().configure()
 
-class GeminiLLMClient(IStreamingLLMClient):
+GENERATION_CONFIG = {
+    "temperature": 1,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+    "response_mime_type": "text/plain",
+}
+
+class GeminiLLMClient(IStreamingLLMClient, IAsyncLLMClient):
     """
     Encapsula la lógica de interacción con el modelo de Gemini,
     implementando envío de mensajes y streaming.
+    No guarda estado entre llamadas: el historial de cada usuario llega en `history`.
     """
-    def __init__(self, api_key: str, system_instruction: str, logger=None):
+    def __init__(self, api_key: str, system_instruction: str, logger=None,
+                 model_name: str = "gemini-1.5-flash", context_cache: Optional[GeminiContextCache] = None,
+                 request_timeout: Optional[float] = None):
         """
         :param api_key: La clave de API para Gemini.
         :param system_instruction: Instrucciones del sistema (prompt inicial).
         :param logger: (Opcional) Logger inyectado. Usa _fallback_logger si no se provee.
+        :param model_name: (Opcional) Nombre del modelo de Gemini.
+        :param context_cache: (Opcional) Caché de contexto de la instrucción del sistema; si no
+                              está disponible, se envía la instrucción completa en cada llamada.
+        :param request_timeout: (Opcional) Segundos máximos por llamada no streaming, aplicados
+                                por el SDK (request_options): la llamada se cancela en vez de
+                                quedar ocupando un hilo.
         """
         self.api_key = api_key
+        self.model_name = model_name
         self.logger = logger if logger else _fallback_logger
+        self.context_cache = context_cache
+        self.request_timeout = request_timeout
+        self.system_instruction = system_instruction
+        self._cached_model = None
 
         # Configurar la librería 'google.generativeai'
         genai.configure(api_key=self.api_key)
 
         self.model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
-            generation_config={
-                "temperature": 1,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-                "response_mime_type": "text/plain",
-            },
+            model_name=self.model_name,
+            generation_config=GENERATION_CONFIG,
             system_instruction=system_instruction
         )
 
-        self.chat_session = None
         self.logger.info("GeminiLLMClient inicializado correctamente.")
 
-    def send_message(self, message: str) -> str:
+    def send_message(self, message: str, history: Optional[History] = None) -> str:
         """
         Envía un mensaje al modelo y retorna la respuesta completa en texto.
         """
-        self._start_chat_session()
+        model = self._current_model()
         try:
-            response = self.chat_session.send_message(message)
+            try:
+                response = self._start_chat(history, model).send_message(message, **self._request_options())
+            except Exception as e:
+                if not self._cache_lost(model, e):
+                    raise
+                response = self._start_chat(history, self.model).send_message(message, **self._request_options())
             return response.text
         except Exception as e:
             self.logger.error("Error al enviar mensaje a Gemini: %s", e)
             raise
 
-    def send_message_streaming(self, message: str, chunk_size: int = 30) -> str:
+    def send_message_streaming(self, message: str, history: Optional[History] = None) -> Iterator[str]:
         """
-        Envía un mensaje al modelo y retorna la respuesta en modo streaming.
-        Se va acumulando en un string final.
+        Envía un mensaje con `stream=True` y genera cada fragmento de texto apenas llega.
         """
-        self._start_chat_session()
+        model = self._current_model()
         try:
-            response = self.chat_session.send_message(message)
-            full_response = ""
-            offset = 0
-            while offset < len(response.text):
-                chunk = response.text[offset:offset + chunk_size]
-                full_response += chunk
-                offset += chunk_size
-            return full_response
+            try:
+                response = self._start_chat(history, model).send_message(message, stream=True)
+            except Exception as e:
+                if not self._cache_lost(model, e):
+                    raise
+                response = self._start_chat(history, self.model).send_message(message, stream=True)
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
         except Exception as e:
             self.logger.error("Error durante la respuesta streaming en Gemini: %s", e)
             raise
 
-    def _start_chat_session(self):
+    async def send_message_async(self, message: str, history: Optional[History] = None) -> str:
+        """
+        Versión asyncio de send_message.
+        """
+        model = self._current_model()
+        try:
+            try:
+                response = await self._start_chat(history, model).send_message_async(
+                    message, **self._request_options())
+            except Exception as e:
+                if not self._cache_lost(model, e):
+                    raise
+                response = await self._start_chat(history, self.model).send_message_async(
+                    message, **self._request_options())
+            return response.text
+        except Exception as e:
+            self.logger.error("Error al enviar mensaje a Gemini: %s", e)
+            raise
+
+    async def send_message_streaming_async(self, message: str,
+                                           history: Optional[History] = None) -> AsyncIterator[str]:
+        """
+        Versión asyncio de send_message_streaming.
+        """
+        model = self._current_model()
+        try:
+            try:
+                response = await self._start_chat(history, model).send_message_async(message, stream=True)
+            except Exception as e:
+                if not self._cache_lost(model, e):
+                    raise
+                response = await self._start_chat(history, self.model).send_message_async(message, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            self.logger.error("Error durante la respuesta streaming en Gemini: %s", e)
+            raise
+
+    def _request_options(self) -> dict:
+        """
+        Timeout del SDK para las llamadas no streaming. En streaming sería el plazo
+        del stream completo, así que ahí rige solo el timeout entre fragmentos.
+        """
+        if not self.request_timeout:
+            return {}
+        return {"request_options": {"timeout": self.request_timeout}}
+
+    def _start_chat(self, history: Optional[History], model=None):
+        """
+        Crea una sesión de chat local con el historial indicado (no hace llamadas a la API).
+        """
+        model = model if model is not None else self.model
+        return model.start_chat(history=[{"role": role, "parts": [text]} for role, text in history or ()])
+
+    def _current_model(self):
+        """
+        Modelo ligado al contenido cacheado vigente o, sin caché disponible, el
+        modelo con la instrucción completa (reconstruido si la instrucción cambió).
+        """
+        if self.context_cache is None:
+            return self.model
+        content = self.context_cache.content()
+        if self.context_cache.system_instruction != self.system_instruction:
+            self.system_instruction = self.context_cache.system_instruction
+            self.model = genai.GenerativeModel(model_name=self.model_name, generation_config=GENERATION_CONFIG,
+                                               system_instruction=self.system_instruction)
+        if content is None:
+            return self.model
+        cached_model = self._cached_model
+        if cached_model is None or cached_model[0] != content.name:
+            cached_model = (content.name, genai.GenerativeModel.from_cached_content(
+                cached_content=content, generation_config=GENERATION_CONFIG))
+            self._cached_model = cached_model
+        return cached_model[1]
+
+    def _cache_lost(self, model, error: Exception) -> bool:
         """
-        Inicia la sesión de chat si no existe.
+        Si la llamada con contenido cacheado falló porque el proveedor ya no lo
+        encuentra (vencido o borrado), lo descarta y retorna True para reintentar
+        con la instrucción completa.
         """
-        if not self.chat_session:
-            self.chat_session = self.model.start_chat()
-            self.logger.info("Sesión de chat iniciada con el modelo Gemini.")
+        if model is self.model or getattr(error, "code", None) not in (403, 404):
+            return False
+        self.logger.warning("El proveedor no encontró la caché de contexto, se reintenta sin ella: %s", error)
+        self.context_cache.invalidate(delete=False)
+        return True
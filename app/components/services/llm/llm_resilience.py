@@ -0,0 +1,422 @@
+"""
+Path: app/components/services/llm/llm_resilience.py
+Capa de resiliencia para los clientes LLM.
+
+- CircuitBreaker: corta las llamadas (falla rápido) cuando la tasa de errores
+  reciente supera un umbral, y vuelve a probar tras un tiempo de espera.
+- ResilientLLMClient: envuelve un cliente con timeout por llamada, reintentos
+  acotados con backoff exponencial y jitter para errores transitorios, y el
+  circuit breaker.
+
+Si el cliente aplica el timeout en su SDK (atributo `request_timeout`), las
+llamadas síncronas se hacen en el hilo del pedido y el SDK las cancela al vencer.
+Si no, se ejecutan en un pool acotado (MAX_WORKERS) como respaldo: la llamada
+vencida se abandona pero ocupa su hilo hasta terminar. El timeout corre desde que
+la llamada tiene un hilo, así que la espera por uno libre no cuenta como falla del
+proveedor; si no se libera ninguno a tiempo, se responde LLMUnavailableError sin
+tocar el circuit breaker.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Callable, Iterator, Optional
+from app.components.services.llm.llm_client import (
+    IBaseLLMClient, IStreamingLLMClient, IAsyncLLMClient, History)
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+# Códigos HTTP y nombres de excepción de los SDK (Gemini/google-api-core, OpenAI)
+# que indican un error transitorio.
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailable", "ResourceExhausted", "DeadlineExceeded", "TooManyRequests"
+}
+
+
+class LLMUnavailableError(Exception):
+    """El proveedor LLM no está disponible (circuito abierto o reintentos agotados)."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """El circuit breaker está abierto: la llamada se rechazó sin contactar al proveedor."""
+
+
+class LLMTimeoutError(TimeoutError):
+    """La llamada al proveedor LLM superó el timeout configurado."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Indica si el error es transitorio (timeout, conexión, 429 o 5xx)."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status in _RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in _RETRYABLE_NAMES
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por tasa de errores sobre una ventana de llamadas recientes.
+
+    Estados: "closed" (normal), "open" (rechaza llamadas durante `reset_timeout`)
+    y "half_open" (deja pasar una llamada de prueba; si funciona, cierra).
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str = "llm", error_threshold: float = 0.5, min_calls: int = 10,
+                 window: int = 20, reset_timeout: float = 30, clock=time.monotonic):
+        """
+        :param name: Nombre del proveedor, para los logs.
+        :param error_threshold: Tasa de errores que abre el circuito.
+        :param min_calls: Llamadas mínimas en la ventana antes de evaluar la tasa.
+        :param window: Cantidad de llamadas recientes consideradas.
+        :param reset_timeout: Segundos que el circuito permanece abierto.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Indica si una llamada puede ir al proveedor (y la registra como prueba en half_open)."""
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self._transition(self.HALF_OPEN)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Registra una llamada exitosa."""
+        with self._lock:
+            self._outcomes.append(True)
+            if self.state == self.HALF_OPEN:
+                self._outcomes.clear()
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """Registra una llamada fallida y abre el circuito si corresponde."""
+        with self._lock:
+            self._outcomes.append(False)
+            if self.state == self.HALF_OPEN:
+                self._open()
+            elif self.state == self.CLOSED and len(self._outcomes) >= self.min_calls \
+                    and self._error_rate() >= self.error_threshold:
+                self._open()
+
+    def stats(self) -> dict:
+        """Estado observable del circuito."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "error_rate": self._error_rate(),
+                "calls": len(self._outcomes),
+                "rejected": self.rejected
+            }
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self) -> None:
+        self.opened_at = self.clock()
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Circuit breaker '%s': %s -> %s (tasa de errores %.0f%%).",
+                           self.name, self.state, state, self._error_rate() * 100)
+        self.state = state
+        self._trial_in_flight = False
+
+
+class ResilientLLMClient(IStreamingLLMClient, IAsyncLLMClient):
+    """
+    Envuelve un cliente LLM con timeout, reintentos con backoff y circuit breaker.
+    Si el cliente envuelto no soporta streaming o asyncio, se recurre a send_message.
+    """
+
+    def __init__(self, client: IBaseLLMClient, timeout: float = 30, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 4.0,
+                 breaker: Optional[CircuitBreaker] = None,
+                 retryable: Callable[[Exception], bool] = is_retryable, sleep=time.sleep,
+                 backstop_margin: float = 5.0, max_workers: int = 32):
+        """
+        :param client: Cliente LLM a proteger.
+        :param timeout: Segundos máximos por llamada (o entre fragmentos, en streaming).
+        :param max_retries: Reintentos ante errores transitorios.
+        :param backoff_base: Espera base (segundos) del backoff exponencial.
+        :param backoff_max: Espera máxima (segundos) entre reintentos.
+        :param breaker: (Opcional) Circuit breaker; por defecto uno con el nombre del modelo.
+        :param retryable: (Opcional) Función que decide si un error se reintenta.
+        :param sleep: (Opcional) Función de espera inyectable, útil en pruebas.
+        :param backstop_margin: Segundos que se esperan de más, sobre el timeout del SDK
+                                del cliente, antes de abandonar una llamada asyncio.
+        :param max_workers: Hilos del pool para las llamadas sin timeout del SDK y el streaming.
+        """
+        self.client = client
+        self.model_name = getattr(client, "model_name", type(client).__name__)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(self.model_name)
+        self.retryable = retryable
+        self.sleep = sleep
+        self.native_timeout = getattr(client, "request_timeout", None)
+        self.call_timeout = (max(timeout, self.native_timeout) + backstop_margin
+                             if self.native_timeout else timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def send_message(self, message: str, history: Optional[History] = None) -> str:
+        """Envía el mensaje con timeout y reintentos, respetando el circuit breaker."""
+        attempt = 0
+        while True:
+            future = None
+            if self.native_timeout:
+                self._check_circuit()
+            else:
+                future = self._run_in_pool(self.client.send_message, message, history=history)
+            try:
+                if future is None:
+                    response = self.client.send_message(message, history=history)
+                else:
+                    response = future.result(timeout=self.call_timeout)
+            except FutureTimeoutError as e:
+                # Desde Python 3.11 es el TimeoutError nativo: si la llamada terminó, es el del SDK.
+                error = e if future is None or future.done() else LLMTimeoutError(
+                    f"{self.model_name} no respondió en {self.call_timeout} s.")
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+            else:
+                self.breaker.record_success()
+                return response
+            self._handle_failure(error, attempt)
+            self.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def send_message_streaming(self, message: str, history: Optional[History] = None) -> Iterator[str]:
+        """
+        Transmite con timeout entre fragmentos. Solo se reintenta si el error
+        ocurre antes del primer fragmento.
+        """
+        if not isinstance(self.client, IStreamingLLMClient):
+            yield self.send_message(message, history)
+            return
+
+        for attempt in range(self.max_retries + 1):
+            chunks, stop = self._start_stream(message, history)
+            started = False
+            try:
+                for chunk in self._read_stream(chunks):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                # El consumidor abandonó el stream: el proveedor sí estaba respondiendo.
+                self.breaker.record_success()
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                if started:
+                    self.breaker.record_failure()
+                    raise
+                self._handle_failure(e, attempt)
+                self.sleep(self._backoff(attempt))
+                continue
+            finally:
+                # Detiene el productor: no sigue leyendo un stream abandonado ni corre junto al reintento.
+                stop.set()
+            self.breaker.record_success()
+            return
+
+    async def send_message_async(self, message: str, history: Optional[History] = None) -> str:
+        """Versión asyncio de send_message (el timeout cancela la corrutina)."""
+        if not isinstance(self.client, IAsyncLLMClient):
+            return await asyncio.to_thread(self.send_message, message, history)
+
+        attempt = 0
+        while True:
+            self._check_circuit()
+            try:
+                response = await asyncio.wait_for(
+                    self.client.send_message_async(message, history=history), self.call_timeout)
+            except asyncio.TimeoutError:
+                error = LLMTimeoutError(f"{self.model_name} no respondió en {self.call_timeout} s.")
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+            else:
+                self.breaker.record_success()
+                return response
+            self._handle_failure(error, attempt)
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def send_message_streaming_async(self, message: str,
+                                           history: Optional[History] = None) -> AsyncIterator[str]:
+        """Versión asyncio de send_message_streaming."""
+        if not isinstance(self.client, IAsyncLLMClient):
+            yield await self.send_message_async(message, history)
+            return
+
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            started = False
+            try:
+                stream = self.client.send_message_streaming_async(message, history=history)
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(anext(stream), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError as exc:
+                        raise LLMTimeoutError(f"{self.model_name} dejó de responder.") from exc
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                self.breaker.record_success()
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                if started:
+                    self.breaker.record_failure()
+                    raise
+                self._handle_failure(e, attempt)
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.breaker.record_success()
+            return
+
+    def stats(self) -> dict:
+        """Estado del circuit breaker del proveedor."""
+        return self.breaker.stats()
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuito abierto para {self.model_name}: se omite la llamada.")
+
+    def _handle_failure(self, error: Exception, attempt: int) -> None:
+        """Registra la falla y relanza si no corresponde reintentar."""
+        self.breaker.record_failure()
+        if not self.retryable(error):
+            raise error
+        if attempt >= self.max_retries:
+            raise LLMUnavailableError(
+                f"{self.model_name} falló tras {self.max_retries + 1} intentos: {error}") from error
+        logger.warning("Error transitorio en %s (intento %d): %s", self.model_name, attempt + 1, error)
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _run_in_pool(self, fn, *args, **kwargs):
+        """
+        Espera un hilo libre del pool (hasta `timeout`), verifica el circuito y ejecuta
+        `fn` en ese hilo. Sin hilo libre a tiempo lanza LLMUnavailableError sin registrar
+        una falla: la saturación local no dice nada de la salud del proveedor.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise LLMUnavailableError(f"No hay hilos libres para llamar a {self.model_name}.")
+        try:
+            self._check_circuit()
+        except CircuitOpenError:
+            self._slots.release()
+            raise
+
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._slots.release()
+
+        return self._executor.submit(run)
+
+    def _start_stream(self, message: str, history: Optional[History]):
+        """
+        Consume el stream en un hilo del pool para poder abandonarlo si un fragmento
+        demora demasiado. Retorna la cola de fragmentos y el evento que detiene al
+        productor: entre fragmentos lo verifica y, al salir, cierra el iterador del SDK.
+        """
+        chunks = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            stream = None
+            try:
+                stream = self.client.send_message_streaming(message, history=history)
+                for chunk in stream:
+                    if stop.is_set():
+                        return
+                    chunks.put((True, chunk))
+                chunks.put((True, None))
+            except Exception as e:  # pylint: disable=broad-except
+                chunks.put((False, e))
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+
+        self._run_in_pool(produce)
+        return chunks, stop
+
+    def _read_stream(self, chunks: queue.Queue) -> Iterator[str]:
+        """Fragmentos del productor, con timeout entre uno y otro."""
+        while True:
+            try:
+                ok, value = chunks.get(timeout=self.timeout)
+            except queue.Empty as exc:
+                raise LLMTimeoutError(f"{self.model_name} dejó de responder.") from exc
+            if not ok:
+                raise value
+            if value is None:
+                return
+            yield value
+
+
+def with_resilience(client: IBaseLLMClient, resilience_config: dict) -> IBaseLLMClient:
+    """
+    Envuelve el cliente según la sección LLM_RESILIENCE de la configuración
+    (ENABLED, TIMEOUT, MAX_RETRIES, BACKOFF_BASE, BACKOFF_MAX, ERROR_THRESHOLD,
+    MIN_CALLS, WINDOW, RESET_TIMEOUT, MAX_WORKERS). Retorna el cliente sin cambios si está deshabilitada.
+    """
+    resilience_config = resilience_config or {}
+    if not resilience_config.get("ENABLED", False):
+        return client
+    breaker = CircuitBreaker(
+        getattr(client, "model_name", type(client).__name__),
+        error_threshold=resilience_config.get("ERROR_THRESHOLD", 0.5),
+        min_calls=resilience_config.get("MIN_CALLS", 10),
+        window=resilience_config.get("WINDOW", 20),
+        reset_timeout=resilience_config.get("RESET_TIMEOUT", 30)
+    )
+    return ResilientLLMClient(
+        client,
+        timeout=resilience_config.get("TIMEOUT", 30),
+        max_retries=resilience_config.get("MAX_RETRIES", 2),
+        backoff_base=resilience_config.get("BACKOFF_BASE", 0.5),
+        backoff_max=resilience_config.get("BACKOFF_MAX", 4.0),
+        breaker=breaker,
+        max_workers=resilience_config.get("MAX_WORKERS", 32)
+    )
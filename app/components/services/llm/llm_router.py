@@ -0,0 +1,248 @@
+"""
+Path: app/components/services/llm/llm_router.py
+Enrutador de clientes LLM con selección por latencia y pedidos "hedged".
+
+Lleva, por proveedor, una ventana móvil de latencias y errores. Cada pedido va
+al proveedor sano más rápido (mediana de latencia) y, si falla, al siguiente.
+Opcionalmente, si el proveedor elegido no respondió tras su p95 de latencia, se
+envía un duplicado al segundo proveedor y se usa la primera respuesta exitosa.
+Las mediciones vencen a los `sample_max_age` segundos: un proveedor relegado por
+errores, que ya casi no recibe pedidos, se queda sin mediciones y vuelve a
+probarse como uno nuevo.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+from app.components.services.llm.llm_client import IBaseLLMClient, IStreamingLLMClient, History
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+
+class ProviderStats:
+    """
+    Ventana móvil de resultados de un proveedor: (éxito, latencia en segundos),
+    con el instante de cada medición para descartar las vencidas.
+    """
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self._recorded_at = deque(maxlen=window)
+
+    def record(self, success: bool, latency: float, now: float = 0.0) -> None:
+        """Registra el resultado de una llamada."""
+        self.samples.append((success, latency))
+        self._recorded_at.append(now)
+
+    def expire(self, oldest: float) -> None:
+        """Descarta las mediciones registradas antes de `oldest`."""
+        while self._recorded_at and self._recorded_at[0] < oldest:
+            self._recorded_at.popleft()
+            self.samples.popleft()
+
+    def error_rate(self) -> float:
+        """Proporción de llamadas fallidas en la ventana."""
+        if not self.samples:
+            return 0.0
+        return sum(1 for success, _ in self.samples if not success) / len(self.samples)
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Cuantil de la latencia de las llamadas exitosas, o None sin datos."""
+        latencies = sorted(latency for success, latency in self.samples if success)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+
+class LLMRouter(IStreamingLLMClient):
+    """
+    Cliente LLM que distribuye los pedidos entre varios proveedores.
+    """
+
+    def __init__(self, providers: Dict[str, IBaseLLMClient], window: int = 50,
+                 max_error_rate: float = 0.5, min_samples: int = 5, hedge: bool = False,
+                 hedge_quantile: float = 0.95, hedge_min_delay: float = 0.5,
+                 hedge_default_delay: float = 2.0, sample_max_age: float = 60.0, clock=time.perf_counter):
+        """
+        :param providers: Clientes por nombre; el orden es la preferencia ante empates.
+        :param window: Llamadas recientes consideradas por proveedor.
+        :param max_error_rate: Tasa de errores a partir de la cual un proveedor no se considera sano.
+        :param min_samples: Llamadas mínimas antes de juzgar la tasa de errores.
+        :param hedge: Si True, los pedidos se duplican al segundo proveedor cuando el primero demora.
+        :param hedge_quantile: Cuantil de latencia del primer proveedor que dispara el duplicado.
+        :param hedge_min_delay: Espera mínima (segundos) antes de duplicar.
+        :param hedge_default_delay: Espera (segundos) mientras el proveedor no tiene mediciones.
+        :param sample_max_age: Segundos tras los cuales una medición deja de contar.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        """
+        if not providers:
+            raise ValueError("El enrutador necesita al menos un proveedor.")
+        self.providers = dict(providers)
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.sample_max_age = sample_max_age
+        self.clock = clock
+        self.model_name = "router:" + "+".join(
+            getattr(client, "model_name", name) for name, client in self.providers.items())
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._stats = {name: ProviderStats(window) for name in self.providers}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def send_message(self, message: str, history: Optional[History] = None, hedge: bool = None) -> str:
+        """
+        Envía el mensaje al proveedor sano más rápido, con conmutación ante errores.
+        :param hedge: (Opcional) Fuerza o desactiva el pedido duplicado para esta llamada.
+        """
+        ranked = self.rank()
+        if self.hedge if hedge is None else hedge:
+            return self._send_hedged(ranked, message, history)
+
+        last_error = None
+        for name in ranked:
+            try:
+                return self._timed_call(name, message, history)
+            except Exception as e:  # pylint: disable=broad-except
+                last_error = e
+                logger.warning("Proveedor LLM '%s' falló, se intenta el siguiente: %s", name, e)
+        raise last_error
+
+    def send_message_streaming(self, message: str, history: Optional[History] = None) -> Iterator[str]:
+        """
+        Transmite desde el proveedor con streaming mejor ubicado. Solo conmuta de
+        proveedor si el error ocurre antes del primer fragmento.
+        """
+        ranked = [name for name in self.rank() if isinstance(self.providers[name], IStreamingLLMClient)]
+        if not ranked:
+            yield self.send_message(message, history)
+            return
+
+        last_error = None
+        for name in ranked:
+            started = False
+            start = self.clock()
+            try:
+                for chunk in self.providers[name].send_message_streaming(message, history=history):
+                    started = True
+                    yield chunk
+                self._record(name, True, self.clock() - start)
+                return
+            except Exception as e:  # pylint: disable=broad-except
+                self._record(name, False, self.clock() - start)
+                if started:
+                    raise
+                last_error = e
+                logger.warning("Proveedor LLM '%s' falló, se intenta el siguiente: %s", name, e)
+        raise last_error
+
+    def rank(self) -> List[str]:
+        """
+        Proveedores ordenados: primero los sanos por mediana de latencia (los que
+        aún no tienen mediciones, primero, para medirlos), luego los no sanos.
+        """
+        with self._lock:
+            self._expire()
+            order = list(self.providers)
+
+            def sort_key(name):
+                stats = self._stats[name]
+                healthy = len(stats.samples) < self.min_samples or stats.error_rate() < self.max_error_rate
+                median = stats.latency_quantile(0.5)
+                return (not healthy, median if median is not None else 0.0, order.index(name))
+
+            return sorted(order, key=sort_key)
+
+    def stats(self) -> dict:
+        """Estado observable de cada proveedor y de los pedidos duplicados."""
+        with self._lock:
+            self._expire()
+            providers = {
+                name: {
+                    "samples": len(stats.samples),
+                    "error_rate": stats.error_rate(),
+                    "p50": stats.latency_quantile(0.5),
+                    "p95": stats.latency_quantile(0.95)
+                }
+                for name, stats in self._stats.items()
+            }
+            return {"providers": providers, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+    def _send_hedged(self, ranked: List[str], message: str, history: Optional[History]) -> str:
+        """
+        Lanza el pedido al primer proveedor y, si no responde dentro de su p95,
+        un duplicado al segundo. Retorna la primera respuesta exitosa; si todos
+        los pedidos en curso fallan, continúa con el siguiente proveedor.
+        """
+        executor = self._get_executor()
+        pending = {}
+        queue = deque(ranked)
+        hedged = False
+
+        def launch():
+            name = queue.popleft()
+            pending[executor.submit(self._timed_call, name, message, history)] = name
+
+        launch()
+        delay = self._hedge_delay(ranked[0])
+        last_error = None
+        while pending:
+            can_hedge = not hedged and queue
+            done, _ = wait(pending, timeout=delay if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                with self._lock:
+                    self.hedges += 1
+                launch()
+                continue
+            for future in done:
+                name = pending.pop(future)
+                if future.exception() is None:
+                    if name != ranked[0]:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                last_error = future.exception()
+                logger.warning("Proveedor LLM '%s' falló: %s", name, last_error)
+            if not pending and queue:
+                launch()
+        raise last_error
+
+    def _hedge_delay(self, name: str) -> float:
+        with self._lock:
+            quantile = self._stats[name].latency_quantile(self.hedge_quantile)
+        if quantile is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, quantile)
+
+    def _timed_call(self, name: str, message: str, history: Optional[History]) -> str:
+        start = self.clock()
+        try:
+            response = self.providers[name].send_message(message, history=history)
+        except Exception:
+            self._record(name, False, self.clock() - start)
+            raise
+        self._record(name, True, self.clock() - start)
+        return response
+
+    def _record(self, name: str, success: bool, latency: float) -> None:
+        with self._lock:
+            self._stats[name].record(success, latency, self.clock())
+
+    def _expire(self) -> None:
+        oldest = self.clock() - self.sample_max_age
+        for stats in self._stats.values():
+            stats.expire(oldest)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+            return self._executor
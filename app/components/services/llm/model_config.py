@@ -6,11 +6,19 @@ Objetivo:
 - Centralizar la carga de la API Key (GEMINI_API_KEY) y las instrucciones del sistema.
 - Mantener la opción de inyectar un logger externo, o usar uno local por defecto.
 - Reemplazar completamente la versión de 'app/services/model_config.py'.
+- Crear el cliente del proveedor elegido en SELECTED_MODEL o, si LLM_ROUTER está
+  habilitado, un LLMRouter con todos los proveedores configurados.
+- Ofrecer el proveedor "Local" (FakeLLMClient) para pruebas de carga sin APIs pagas.
+- Con GEMINI_CONTEXT_CACHE habilitado, cachear la instrucción del sistema en el
+  proveedor y renovarla cuando cambia el archivo system_instruction.txt.
 """
 
 import os
 from dotenv import load_dotenv
 from app.components.services.llm.llm_impl.gemini_llm import GeminiLLMClient
+from app.components.services.llm.llm_impl.gemini_context_cache import GeminiContextCache
+from app.components.services.llm.llm_router import LLMRouter
+from app.components.services.llm.llm_resilience import with_resilience
 
 # Intentamos cargar las variables de entorno.
 load_dotenv()
@@ -30,43 +38,137 @@ class ModelConfig:
 
     :param logger: (opcional) Permite inyectar un logger externo. Si no se
                    proporciona, se utilizará uno por defecto.
+    :param config: (opcional) Configuración de la aplicación (SELECTED_MODEL y
+                   LLM_ROUTER). Sin ella se usa Gemini con el modelo por defecto.
     """
 
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, config: dict = None):
         self.logger = logger if logger else default_logger
+        self.config = config or {}
 
+        # La API Key solo es obligatoria al crear un cliente de Gemini.
         self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError(
-                "La API Key de Gemini no está configurada en las variables de entorno."
-            )
-        self.logger.info("API Key de Gemini obtenida correctamente.")
+        if self.api_key:
+            self.logger.info("API Key de Gemini obtenida correctamente.")
+        else:
+            self.logger.warning("La API Key de Gemini no está configurada en las variables de entorno.")
 
+        self.instruction_file_path = os.path.abspath(os.path.join(
+            os.path.dirname(__file__), "..", "..", "..", "..", "config", "system_instruction.txt"))
+        self._instruction_stat = None
         self.system_instruction = self._load_system_instruction()
 
     def create_llm_client(self):
         """
-        Crea y retorna una instancia de GeminiLLMClient utilizando
-        la configuración actual (API key y system_instruction).
+        Crea y retorna el cliente LLM según la configuración: un LLMRouter si
+        LLM_ROUTER.ENABLED es verdadero, o el proveedor de SELECTED_MODEL.
+        """
+        router_config = self.config.get("LLM_ROUTER") or {}
+        if router_config.get("ENABLED", False):
+            providers = {
+                f"{provider['COMPANY']}:{provider['MODEL']}": self.create_provider_client(
+                    provider["COMPANY"], provider["MODEL"])
+                for provider in router_config.get("PROVIDERS", [])
+            }
+            self.logger.info("Enrutador LLM con proveedores: %s", ", ".join(providers))
+            return LLMRouter(
+                providers,
+                window=router_config.get("WINDOW", 50),
+                max_error_rate=router_config.get("MAX_ERROR_RATE", 0.5),
+                hedge=router_config.get("HEDGE", False),
+                hedge_quantile=router_config.get("HEDGE_QUANTILE", 0.95),
+                hedge_min_delay=router_config.get("HEDGE_MIN_DELAY", 0.5),
+                sample_max_age=router_config.get("SAMPLE_MAX_AGE", 60)
+            )
+
+        selected = self.config.get("SELECTED_MODEL") or {}
+        return self.create_provider_client(selected.get("COMPANY", "Google"),
+                                           selected.get("MODEL", "gemini-1.5-flash"))
+
+    def create_provider_client(self, company: str, model: str):
+        """
+        Crea el cliente de un proveedor con las instrucciones del sistema vigentes,
+        envuelto con timeouts, reintentos y circuit breaker si LLM_RESILIENCE está habilitado.
+        """
+        if company == "Google":
+            if not self.api_key:
+                raise ValueError(
+                    "La API Key de Gemini no está configurada en las variables de entorno."
+                )
+            # La implementación de GeminiLLMClient admite un logger inyectado.
+            client = GeminiLLMClient(self.api_key, self.system_instruction, self.logger, model_name=model,
+                                     context_cache=self.create_context_cache(model),
+                                     request_timeout=self.request_timeout())
+        elif company == "DeepSeek":
+            # Importación diferida: el SDK de OpenAI solo se carga si se usa DeepSeek.
+            # pylint: disable=import-outside-toplevel
+            from app.components.services.llm.llm_impl.deep_seek_llm import DeepSeekLLMClient
+            client = DeepSeekLLMClient(self.logger, model_name=model, system_instruction=self.system_instruction,
+                                       request_timeout=self.request_timeout())
+        elif company == "Local":
+            # pylint: disable=import-outside-toplevel
+            from app.components.services.llm.llm_impl.fake_llm import FakeLLMClient
+            client = FakeLLMClient.from_config(self.config.get("FAKE_LLM"), model_name=model)
+        else:
+            raise ValueError(f"Proveedor LLM no soportado: {company}")
+        return with_resilience(client, self.config.get("LLM_RESILIENCE"))
+
+    def request_timeout(self):
+        """
+        Timeout por llamada que aplica el SDK del proveedor: LLM_RESILIENCE.TIMEOUT
+        si la resiliencia está habilitada, o None (sin timeout) si no.
         """
-        # La implementación de GeminiLLMClient admite un logger inyectado.
-        return GeminiLLMClient(self.api_key, self.system_instruction, self.logger)
+        resilience_config = self.config.get("LLM_RESILIENCE") or {}
+        if not resilience_config.get("ENABLED", False):
+            return None
+        return resilience_config.get("TIMEOUT", 30)
+
+    def create_context_cache(self, model: str):
+        """
+        Crea la caché de contexto de Gemini para la instrucción del sistema según
+        la sección GEMINI_CONTEXT_CACHE (ENABLED, TTL, REFRESH_MARGIN,
+        CHECK_INTERVAL, RETRY_AFTER y CACHE_MODEL), o None si está deshabilitada.
+        """
+        cache_config = self.config.get("GEMINI_CONTEXT_CACHE") or {}
+        if not cache_config.get("ENABLED", False):
+            return None
+        return GeminiContextCache(
+            # La caché requiere una versión fija del modelo (p. ej. gemini-1.5-flash-002).
+            cache_config.get("CACHE_MODEL") or model,
+            self.current_system_instruction,
+            ttl=cache_config.get("TTL", 3600),
+            refresh_margin=cache_config.get("REFRESH_MARGIN", 300),
+            check_interval=cache_config.get("CHECK_INTERVAL", 5),
+            retry_after=cache_config.get("RETRY_AFTER", 300),
+            logger=self.logger
+        )
+
+    def current_system_instruction(self) -> str:
+        """
+        Retorna la instrucción del sistema vigente, releyendo el archivo solo si
+        cambió su fecha de modificación o su tamaño. Si no se puede leer, conserva la última.
+        """
+        try:
+            stat = os.stat(self.instruction_file_path)
+            if (stat.st_mtime_ns, stat.st_size) != self._instruction_stat:
+                self.system_instruction = self._load_system_instruction()
+        except OSError as e:
+            self.logger.warning("No se pudo releer system_instruction.txt: %s", e)
+        return self.system_instruction
 
     def _load_system_instruction(self):
         """
         Carga las instrucciones del sistema desde el archivo system_instruction.txt,
         ubicado en la carpeta config/ del proyecto.
         """
-        instruction_file_path = os.path.join(
-            os.path.dirname(__file__),
-            "..","..", "..", "..", "config", "system_instruction.txt"
-        )
-        instruction_file_path = os.path.abspath(instruction_file_path)
+        instruction_file_path = self.instruction_file_path
 
         self.logger.info("Buscando instrucciones del sistema en: %s", instruction_file_path)
 
         try:
             with open(instruction_file_path, "r", encoding="utf-8") as file:
+                stat = os.fstat(file.fileno())
+                self._instruction_stat = (stat.st_mtime_ns, stat.st_size)
                 return file.read()
         except FileNotFoundError as exc:
             self.logger.error("Error: El archivo system_instruction.txt no se encontró.")
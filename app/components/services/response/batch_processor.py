@@ -0,0 +1,100 @@
+"""
+Path: app/components/services/response/batch_processor.py
+Procesamiento de lotes de consultas con el mismo pipeline que /receive-data.
+
+Las consultas que resuelven las reglas de negocio se responden en el hilo que
+recorre el lote, sin ocupar un lugar de concurrencia; el resto va al
+ResponseGenerator (caché y LLM) en un pool de hilos acotado. Los resultados
+se entregan en el orden de entrada apenas está listo el primero pendiente, y
+la cantidad de consultas en vuelo está acotada, así que la memoria no crece
+con el tamaño del lote.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Iterable, Iterator, Optional
+from app.components.services.response.response_generator import ResponseGenerator
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+
+class BatchProcessor:
+    """
+    Genera respuestas para una secuencia de consultas {"id", "prompt", "user_id"}.
+    """
+
+    def __init__(self, response_generator: ResponseGenerator, max_concurrency: int = 8,
+                 max_pending: int = None, context_factory: Optional[Callable[[], ContextManager]] = None):
+        """
+        :param response_generator: Pipeline de reglas, caché y LLM.
+        :param max_concurrency: Llamadas simultáneas máximas al generador.
+        :param max_pending: Consultas en vuelo o esperando su turno de salida (por defecto 4 × concurrencia).
+        :param context_factory: (Opcional) Contexto con el que corre cada consulta en el pool,
+                                p. ej. el app context de Flask para acceder a la base de datos.
+        """
+        self.response_generator = response_generator
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending or 4 * max_concurrency
+        self.context_factory = context_factory or nullcontext
+
+    def process(self, items: Iterable[dict]) -> Iterator[dict]:
+        """
+        Retorna, en el orden de `items`, un resultado por consulta:
+        {"index", "id", "source": "rules" | "llm", "response"} o {"index", "id", "error"}.
+        """
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="batch")
+        try:
+            for index, item in enumerate(items):
+                pending.append(self._submit(executor, index, item))
+                while pending and (len(pending) >= self.max_pending or pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Si el consumidor abandona el lote, no se procesan las consultas en espera.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _submit(self, executor: ThreadPoolExecutor, index: int, item: dict) -> Future:
+        if item.get("error"):
+            return self._done({"index": index, "id": item.get("id"), "error": item["error"]})
+        try:
+            rule_hit = self.response_generator.rules_engine.get_response(item["prompt"])
+        except Exception as e:  # pylint: disable=broad-except
+            return self._done({"index": index, "id": item.get("id"), "error": str(e)})
+        if rule_hit:
+            return self._done(self._run(index, item, "rules"))
+        return executor.submit(self._run, index, item, "llm")
+
+    def _run(self, index: int, item: dict, source: str) -> dict:
+        try:
+            with self.context_factory():
+                response = self.response_generator.generate_response(item["prompt"], item.get("user_id"))
+            return {"index": index, "id": item.get("id"), "source": source, "response": response}
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("Error en la consulta %d del lote: %s", index, e)
+            return {"index": index, "id": item.get("id"), "error": str(e)}
+
+    @staticmethod
+    def _done(result: dict) -> Future:
+        future = Future()
+        future.set_result(result)
+        return future
+
+
+def create_batch_processor(response_generator: ResponseGenerator, batch_config: dict,
+                           context_factory: Optional[Callable[[], ContextManager]] = None) -> BatchProcessor:
+    """
+    Crea el procesador según la sección BATCH de la configuración (MAX_CONCURRENCY y MAX_PENDING).
+    """
+    batch_config = batch_config or {}
+    return BatchProcessor(
+        response_generator,
+        max_concurrency=batch_config.get("MAX_CONCURRENCY", 8),
+        max_pending=batch_config.get("MAX_PENDING"),
+        context_factory=context_factory
+    )
@@ -0,0 +1,163 @@
+"""
+Path: app/components/services/response/batch_runner.py
+Ejecuta un archivo JSONL de consultas con el pipeline de ResponseGenerator
+(reglas, caché y LLM), para evaluaciones y precalentamiento de la caché.
+
+Cada línea de entrada es un objeto {"id", "prompt_user" (o "prompt"), "user_id"}
+o un texto JSON. La salida es un JSONL con un resultado por línea, en el mismo
+orden. Cada `--checkpoint-every` resultados se sincroniza la salida y se guarda
+un checkpoint con la posición alcanzada en ambos archivos; al volver a
+ejecutar el mismo comando, se descarta lo escrito después del último
+checkpoint y se continúa desde ahí, así que una corrida larga sobrevive a una
+interrupción sin repetir ni perder consultas.
+
+Uso:
+    python batch_runner.py prompts.jsonl respuestas.jsonl --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterator
+
+from app.components.services.response.batch_processor import BatchProcessor, create_batch_processor
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+
+def read_checkpoint(checkpoint_path: str, input_path: str) -> dict:
+    """Checkpoint guardado para `input_path`, o la posición inicial."""
+    start = {"input": os.path.abspath(input_path), "input_offset": 0, "output_offset": 0, "done": 0}
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return start
+    if checkpoint.get("input") != start["input"]:
+        raise ValueError(f"El checkpoint {checkpoint_path} corresponde a otro archivo: {checkpoint.get('input')}")
+    return checkpoint
+
+
+def write_checkpoint(checkpoint_path: str, checkpoint: dict) -> None:
+    """Escribe el checkpoint de forma atómica (archivo temporal + rename)."""
+    temporary_path = checkpoint_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, checkpoint_path)
+
+
+def read_items(file, start_index: int, offsets: dict) -> Iterator[dict]:
+    """
+    Lee consultas de un archivo binario ya posicionado. Registra en `offsets`
+    la posición del final de cada línea, para el checkpoint.
+    """
+    index = start_index
+    offset = file.tell()
+    for line in file:
+        offset += len(line)
+        text = line.strip()
+        if not text:
+            continue
+        offsets[index] = offset
+        try:
+            item = json.loads(text)
+            if isinstance(item, str):
+                item = {"prompt": item}
+            item = {"id": item.get("id"), "prompt": item.get("prompt_user", item.get("prompt")),
+                    "user_id": item.get("user_id")}
+            if not isinstance(item["prompt"], str) or not item["prompt"]:
+                item["error"] = "La línea no tiene 'prompt_user'."
+        except (ValueError, AttributeError) as e:
+            item = {"id": None, "error": f"JSON inválido: {e}"}
+        yield item
+        index += 1
+
+
+def run_jsonl(processor: BatchProcessor, input_path: str, output_path: str,
+              checkpoint_path: str = None, checkpoint_every: int = 100) -> dict:
+    """
+    Procesa `input_path` hacia `output_path` retomando desde el checkpoint, si existe.
+    Retorna el checkpoint final ({"done", "errors", ...}); al completar el archivo,
+    el checkpoint se elimina.
+    """
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    checkpoint = read_checkpoint(checkpoint_path, input_path)
+    checkpoint.setdefault("errors", 0)
+    if checkpoint["done"]:
+        logger.info("Se retoma el lote desde la consulta %d.", checkpoint["done"])
+
+    offsets = {}
+    start = checkpoint["done"]
+    mode = "r+b" if os.path.exists(output_path) else "wb"
+    with open(input_path, "rb") as source, open(output_path, mode) as output:
+        source.seek(checkpoint["input_offset"])
+        # Lo escrito después del último checkpoint se vuelve a generar.
+        output.truncate(checkpoint["output_offset"])
+        output.seek(checkpoint["output_offset"])
+        for result in processor.process(read_items(source, start, offsets)):
+            # El procesador numera desde 0 en cada corrida; el índice de salida es el del archivo.
+            result["index"] += start
+            output.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+            checkpoint["input_offset"] = offsets.pop(result["index"])
+            checkpoint["done"] = result["index"] + 1
+            checkpoint["errors"] += "error" in result
+            if checkpoint["done"] % checkpoint_every == 0:
+                output.flush()
+                os.fsync(output.fileno())
+                checkpoint["output_offset"] = output.tell()
+                write_checkpoint(checkpoint_path, checkpoint)
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint["output_offset"] = output.tell()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return checkpoint
+
+
+def build_processor(config_path: str, concurrency: int = None) -> BatchProcessor:
+    """
+    Arma el mismo pipeline que la aplicación (reglas, cachés, LLM con resiliencia)
+    sin sesiones de chat, que dependen de la base de datos.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.core.config import FlaskConfig
+    from app.components.services.llm.model_config import ModelConfig
+    from app.components.services.cache.response_cache import create_response_cache
+    from app.components.services.cache.semantic_cache import create_semantic_cache
+    from app.components.services.response.response_generator import ResponseGenerator
+
+    config = FlaskConfig(config_path).get_config()
+    generator = ResponseGenerator(
+        ModelConfig(config=config).create_llm_client(),
+        response_cache=create_response_cache(config.get("RESPONSE_CACHE")),
+        semantic_cache=create_semantic_cache(config.get("SEMANTIC_CACHE")),
+        fallback_response=(config.get("LLM_RESILIENCE") or {}).get("FALLBACK_RESPONSE")
+    )
+    batch_config = dict(config.get("BATCH") or {})
+    if concurrency:
+        batch_config["MAX_CONCURRENCY"] = concurrency
+    return create_batch_processor(generator, batch_config)
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Archivo JSONL de consultas.")
+    parser.add_argument("output", help="Archivo JSONL de resultados.")
+    parser.add_argument("--config", default="config/config.json", help="Configuración de la aplicación.")
+    parser.add_argument("--concurrency", type=int, help="Llamadas simultáneas al LLM (por defecto, BATCH).")
+    parser.add_argument("--checkpoint", help="Archivo de checkpoint (por defecto, <output>.checkpoint).")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Resultados entre checkpoints.")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel del logger de la aplicación.")
+    args = parser.parse_args(argv)
+
+    LoggerConfigurator().configure().setLevel(args.log_level)
+    processor = build_processor(args.config, args.concurrency)
+    checkpoint = run_jsonl(processor, args.input, args.output, args.checkpoint, args.checkpoint_every)
+    print(f"{checkpoint['done']} consultas procesadas, {checkpoint['errors']} con error.", file=sys.stderr)
+    return 1 if checkpoint["errors"] else 0
@@ -3,32 +3,63 @@ Path: app/components/services/response/response_generator.py
 
 """
 
+import asyncio
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator
 from utils.logging.logger_configurator import LoggerConfigurator
 from app.components.services.llm.model_config import ModelConfig
-from app.components.services.llm.llm_client import IBaseLLMClient, IStreamingLLMClient
+from app.components.services.llm.llm_client import IBaseLLMClient, IStreamingLLMClient, IAsyncLLMClient
+from app.components.services.llm.llm_resilience import LLMUnavailableError
 from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.cache.response_cache import ResponseCache, instruction_hash, prompt_digest
+from app.components.services.cache.semantic_cache import SemanticResponseCache
+from app.components.services.response.single_flight import SingleFlight, AsyncSingleFlight
+from app.components.services.session.chat_session_manager import ChatSessionManager
+from app.utils.stage_timing import stage
 
 class ResponseGenerator:
     """
     Clase encargada de generar respuestas a partir de un mensaje de entrada.
-    Primero consulta las reglas de negocio antes de llamar al LLM.
+    Primero consulta las reglas de negocio y luego la caché de respuestas
+    (si está configurada) antes de llamar al LLM; si el usuario ya tiene
+    historial, la caché no se consulta ni se escribe. Con un user_id y un
+    administrador de sesiones, el LLM recibe el historial propio del usuario;
+    sin sesión, las consultas idénticas concurrentes no-streaming comparten una
+    única llamada al LLM. Si el LLM no está disponible (circuito abierto o
+    reintentos agotados) y hay una respuesta de contingencia, se responde con ella.
     """
 
-    def __init__(self, llm_client: IBaseLLMClient = None, custom_logger=None):
+    def __init__(self, llm_client: IBaseLLMClient = None, custom_logger=None,
+                 response_cache: ResponseCache = None, rules_engine: BusinessRulesEngine = None,
+                 semantic_cache: SemanticResponseCache = None, session_manager: ChatSessionManager = None,
+                 fallback_response: str = None):
         """
-        Constructor que admite inyección de dependencia (llm_client).
-        Si no se provee, se crea usando ModelConfig (por defecto, Gemini u otro).
+        Constructor que admite inyección de dependencias (llm_client, response_cache,
+        rules_engine, semantic_cache, session_manager) y una respuesta de contingencia.
+        Si no se provee el cliente, se crea usando ModelConfig (por defecto, Gemini u otro).
+        Sin cachés, todas las consultas que no resuelven las reglas van al LLM.
         """
         self.logger = custom_logger or LoggerConfigurator().configure()
         self.model_config = ModelConfig(logger=self.logger)
-        self.rules_engine = BusinessRulesEngine()  # Capa de reglas de negocio
+        # Capa de reglas de negocio
+        self.rules_engine = rules_engine if rules_engine else BusinessRulesEngine()
 
         # Usa el cliente LLM que se provee, o crea uno por defecto desde ModelConfig
         self.model = llm_client if llm_client else self.model_config.create_llm_client()
 
+        # La clave de caché incluye el modelo y las instrucciones del sistema vigentes.
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.model_name = getattr(self.model, "model_name", type(self.model).__name__)
+        self._digested_instruction = (None, None)
+        self.single_flight = SingleFlight()
+        self.async_single_flight = AsyncSingleFlight()
+        self.session_manager = session_manager
+        self.fallback_response = fallback_response
+
         self.logger.info("ResponseGenerator inicializado con un cliente LLM y reglas de negocio.")
 
-    def generate_response(self, message_input: str) -> str:
+    def generate_response(self, message_input: str, user_id: str = None) -> str:
         """
         Genera una respuesta no-streaming para un mensaje dado.
         Primero revisa las reglas de negocio antes de llamar al LLM.
@@ -37,28 +68,295 @@ class ResponseGenerator:
 
         try:
             # Consultar reglas de negocio primero
-            rule_response = self.rules_engine.get_response(message_input)
+            with stage("rules"):
+                rule_response = self.rules_engine.get_response(message_input)
             if rule_response:
                 self.logger.info("Respuesta obtenida desde reglas de negocio.")
+                self._remember_turn(user_id, message_input, rule_response)
                 return rule_response
 
-            # Si no hay coincidencias en reglas de negocio, llamar al LLM
-            return self.model.send_message(message_input)
+            # Si no hay coincidencias en reglas de negocio ni en caché, llamar al LLM
+            if self.session_manager is None or user_id is None:
+                with stage("cache"):
+                    cached_response = self._get_cached_response(message_input)
+                if cached_response is not None:
+                    return cached_response
+                with stage("llm"):
+                    return self._coalesced_call(message_input, lambda: self.model.send_message(message_input))
+
+            with self.session_manager.session(user_id) as chat_session:
+                history = chat_session.context(message_input)
+                # Con historial, la respuesta depende del contexto: no se reutiliza una cacheada.
+                if not history:
+                    with stage("cache"):
+                        cached_response = self._get_cached_response(message_input)
+                    if cached_response is not None:
+                        chat_session.add_turn(message_input, cached_response)
+                        return cached_response
+                with stage("llm"):
+                    response = self.model.send_message(message_input, history=history)
+                chat_session.add_turn(message_input, response)
+            # Solo se cachean las respuestas que no dependen del historial del usuario.
+            if not history:
+                self._cache_response(message_input, response)
+            return response
+        except LLMUnavailableError as e:
+            return self._fallback(e)
         except Exception as e:
             self.logger.error("Error al generar respuesta: %s", e)
             raise
 
-    def generate_response_streaming(self, message_input: str, chunk_size: int = 30) -> str:
+    def generate_response_streaming(self, message_input: str, user_id: str = None) -> Iterator[str]:
         """
-        Genera una respuesta en modo streaming, si el cliente lo soporta.
-        Caso contrario, recurre a la generación no-streaming.
+        Genera la respuesta como un iterador de fragmentos de texto, si el cliente
+        soporta streaming. Caso contrario, retorna la respuesta no-streaming en un
+        único fragmento. Como generate_response, consulta primero las reglas de
+        negocio. La respuesta completa se cachea al terminar el stream.
         """
         self.logger.info(f"Generando respuesta en streaming para: {message_input}")
 
+        if not isinstance(self.model, IStreamingLLMClient):
+            yield self.generate_response(message_input, user_id)
+            return
+
+        parts = []
         try:
-            if isinstance(self.model, IStreamingLLMClient):
-                return self.model.send_message_streaming(message_input, chunk_size)
-            return self.generate_response(message_input)
+            with stage("rules"):
+                rule_response = self.rules_engine.get_response(message_input)
+            if rule_response:
+                self.logger.info("Respuesta obtenida desde reglas de negocio.")
+                self._remember_turn(user_id, message_input, rule_response)
+                yield rule_response
+                return
+
+            with self._user_session(user_id) as chat_session:
+                history = chat_session.context(message_input) if chat_session else None
+                cached_response = None if history else self._get_cached_response(message_input)
+                if cached_response is not None:
+                    if chat_session:
+                        chat_session.add_turn(message_input, cached_response)
+                    yield cached_response
+                    return
+                for chunk in self.model.send_message_streaming(message_input, history=history):
+                    parts.append(chunk)
+                    yield chunk
+                response = "".join(parts)
+                if chat_session:
+                    chat_session.add_turn(message_input, response)
+            if not history:
+                self._cache_response(message_input, response)
+        except LLMUnavailableError as e:
+            if parts:
+                raise
+            yield self._fallback(e)
         except Exception as e:
             self.logger.error("Error al generar respuesta en streaming: %s", e)
             raise
+
+    async def generate_response_async(self, message_input: str, user_id: str = None) -> str:
+        """
+        Versión asyncio de generate_response: la llamada al LLM no bloquea el event
+        loop, por lo que un worker puede sostener muchas generaciones concurrentes.
+        Si el cliente no implementa IAsyncLLMClient, la versión síncrona se ejecuta en un hilo.
+        El lock de la sesión no se mantiene durante la llamada al LLM: el historial
+        se lee antes y el turno nuevo se agrega al terminar, ambos en un hilo aparte
+        (toman el lock y pueden leer o escribir el almacenamiento de sesiones).
+        """
+        if not isinstance(self.model, IAsyncLLMClient):
+            return await asyncio.to_thread(self.generate_response, message_input, user_id)
+
+        self.logger.info(f"Generando respuesta asíncrona para el mensaje: {message_input}")
+        try:
+            rule_response = self.rules_engine.get_response(message_input)
+            if rule_response:
+                self.logger.info("Respuesta obtenida desde reglas de negocio.")
+                await self._remember_turn_async(user_id, message_input, rule_response)
+                return rule_response
+
+            if self.session_manager is None or user_id is None:
+                cached_response = self._get_cached_response(message_input)
+                if cached_response is not None:
+                    return cached_response
+                return await self._coalesced_call_async(
+                    message_input, lambda: self.model.send_message_async(message_input))
+
+            history = await self._read_history_async(user_id, message_input)
+            if not history:
+                cached_response = self._get_cached_response(message_input)
+                if cached_response is not None:
+                    await self._remember_turn_async(user_id, message_input, cached_response)
+                    return cached_response
+            response = await self.model.send_message_async(message_input, history=history)
+            await self._remember_turn_async(user_id, message_input, response)
+            if not history:
+                self._cache_response(message_input, response)
+            return response
+        except LLMUnavailableError as e:
+            return self._fallback(e)
+        except Exception as e:
+            self.logger.error("Error al generar respuesta asíncrona: %s", e)
+            raise
+
+    async def generate_response_streaming_async(self, message_input: str,
+                                                user_id: str = None) -> AsyncIterator[str]:
+        """
+        Versión asyncio de generate_response_streaming (también consulta primero las
+        reglas de negocio): retorna un iterador asíncrono de fragmentos.
+        """
+        if not isinstance(self.model, IAsyncLLMClient):
+            yield await self.generate_response_async(message_input, user_id)
+            return
+
+        self.logger.info(f"Generando respuesta asíncrona en streaming para: {message_input}")
+        parts = []
+        try:
+            rule_response = self.rules_engine.get_response(message_input)
+            if rule_response:
+                self.logger.info("Respuesta obtenida desde reglas de negocio.")
+                await self._remember_turn_async(user_id, message_input, rule_response)
+                yield rule_response
+                return
+
+            history = await self._read_history_async(user_id, message_input)
+            cached_response = None if history else self._get_cached_response(message_input)
+            if cached_response is not None:
+                await self._remember_turn_async(user_id, message_input, cached_response)
+                yield cached_response
+                return
+            async for chunk in self.model.send_message_streaming_async(message_input, history=history):
+                parts.append(chunk)
+                yield chunk
+            response = "".join(parts)
+            await self._remember_turn_async(user_id, message_input, response)
+            if not history:
+                self._cache_response(message_input, response)
+        except LLMUnavailableError as e:
+            if parts:
+                raise
+            yield self._fallback(e)
+        except Exception as e:
+            self.logger.error("Error al generar respuesta asíncrona en streaming: %s", e)
+            raise
+
+    @property
+    def instruction_digest(self) -> str:
+        """
+        Hash de la instrucción del sistema vigente: si se edita system_instruction.txt,
+        las claves de caché cambian sin reiniciar. Solo se recalcula si cambió el texto.
+        """
+        instruction = self.model_config.current_system_instruction()
+        digested_instruction, digest = self._digested_instruction
+        if instruction is not digested_instruction:
+            digest = instruction_hash(instruction)
+            self._digested_instruction = (instruction, digest)
+        return digest
+
+    def _fallback(self, error: LLMUnavailableError) -> str:
+        """Respuesta de contingencia cuando el LLM no está disponible; sin ella, relanza el error."""
+        if self.fallback_response is None:
+            self.logger.error("LLM no disponible: %s", error)
+            raise error
+        self.logger.warning("LLM no disponible, se responde con el mensaje de contingencia: %s", error)
+        return self.fallback_response
+
+    @contextmanager
+    def _user_session(self, user_id: str):
+        """Sesión de chat del usuario con su lock tomado, o None si no hay sesiones."""
+        if self.session_manager is None or user_id is None:
+            yield None
+            return
+        with self.session_manager.session(user_id) as chat_session:
+            yield chat_session
+
+    def _read_history(self, user_id: str, message_input: str):
+        """Historial del usuario recortado al presupuesto del prompt, o None si no hay sesiones."""
+        with self._user_session(user_id) as chat_session:
+            return chat_session.context(message_input) if chat_session else None
+
+    def _remember_turn(self, user_id: str, message_input: str, response: str) -> None:
+        """Agrega al historial del usuario un turno resuelto sin el LLM (reglas o caché)."""
+        with self._user_session(user_id) as chat_session:
+            if chat_session:
+                chat_session.add_turn(message_input, response)
+
+    async def _read_history_async(self, user_id: str, message_input: str):
+        """_read_history desde el event loop: con sesiones, se ejecuta en un hilo aparte."""
+        if self.session_manager is None or user_id is None:
+            return None
+        return await asyncio.to_thread(self._read_history, user_id, message_input)
+
+    async def _remember_turn_async(self, user_id: str, message_input: str, response: str) -> None:
+        """_remember_turn desde el event loop: con sesiones, se ejecuta en un hilo aparte."""
+        if self.session_manager is None or user_id is None:
+            return
+        await asyncio.to_thread(self._remember_turn, user_id, message_input, response)
+
+    def _coalesced_call(self, message_input: str, llm_call):
+        """
+        Ejecuta `llm_call` una sola vez por consulta equivalente en curso; las
+        llamadas concurrentes reciben el mismo resultado o la misma excepción.
+        La respuesta se cachea antes de liberar la clave (si la caché falla, la
+        respuesta se entrega igual).
+        """
+        def call_and_cache():
+            response = llm_call()
+            self._cache_response(message_input, response)
+            return response
+
+        key = prompt_digest(message_input, self.model_name, self.instruction_digest)
+        return self.single_flight.do(key, call_and_cache)
+
+    async def _coalesced_call_async(self, message_input: str, llm_call):
+        """Equivalente asyncio de _coalesced_call (agrupa corrutinas del mismo event loop)."""
+        async def call_and_cache():
+            response = await llm_call()
+            self._cache_response(message_input, response)
+            return response
+
+        key = prompt_digest(message_input, self.model_name, self.instruction_digest)
+        return await self.async_single_flight.do(key, call_and_cache)
+
+    def _get_cached_response(self, message_input: str):
+        """
+        Consulta la caché exacta y, si no hay acierto, la caché aproximada
+        (solo las que estén configuradas). Un error de la caché cuenta como fallo
+        de caché: la consulta sigue hacia el LLM.
+        """
+        if self.response_cache is not None:
+            try:
+                cached_response = self.response_cache.get(message_input, self.model_name, self.instruction_digest)
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.warning("Error al consultar la caché de respuestas, se ignora: %s", e)
+                cached_response = None
+            if cached_response is not None:
+                self.logger.info("Respuesta obtenida desde la caché de respuestas.")
+                return cached_response
+
+        if self.semantic_cache is not None:
+            try:
+                hit = self.semantic_cache.lookup(message_input, self._cache_scope())
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.warning("Error al consultar la caché aproximada, se ignora: %s", e)
+                hit = None
+            if hit is not None:
+                self.logger.info("Respuesta reutilizada del prompt cacheado '%s' (similitud %.2f).",
+                                 hit.cached_prompt, hit.similarity)
+                return hit.response
+        return None
+
+    def _cache_response(self, message_input: str, response: str) -> None:
+        """Guarda la respuesta del LLM en las cachés configuradas; si una falla, se omite."""
+        if self.response_cache is not None:
+            try:
+                self.response_cache.set(message_input, self.model_name, self.instruction_digest, response)
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.warning("Error al guardar en la caché de respuestas, se omite: %s", e)
+        if self.semantic_cache is not None:
+            try:
+                self.semantic_cache.store(message_input, response, self._cache_scope())
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.warning("Error al guardar en la caché aproximada, se omite: %s", e)
+
+    def _cache_scope(self) -> str:
+        """Ámbito de la caché aproximada: las respuestas solo se reutilizan con el mismo modelo e instrucciones."""
+        return f"{self.model_name}:{self.instruction_digest}"
@@ -0,0 +1,112 @@
+"""
+Path: app/components/services/response/single_flight.py
+Coalescencia de llamadas concurrentes idénticas ("single-flight").
+
+Mientras una llamada con una clave dada está en curso, las demás llamadas con
+la misma clave esperan su resultado (o su excepción) en lugar de repetirla.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    """Llamada en curso: el resultado o la excepción se comparte con los que esperan."""
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes por clave dentro de un mismo proceso (entre hilos).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+        Ejecuta `function` si no hay otra llamada en curso con `key`; si la hay,
+        espera y retorna su resultado o relanza su excepción.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # Se libera la clave antes de despertar a los que esperan: una llamada
+            # posterior al resultado inicia un vuelo nuevo (o lo encuentra en caché).
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def waiters(self, key: Hashable) -> int:
+        """Cantidad de llamadas esperando el resultado de la llamada en curso con `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call is not None else 0
+
+    def stats(self) -> dict:
+        """Llamadas ejecutadas y llamadas que reutilizaron un resultado en curso."""
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Equivalente asyncio de SingleFlight: agrupa corrutinas concurrentes por clave
+    dentro de un mismo event loop.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta `function()` si no hay otra corrutina en curso con `key`; si la hay,
+        espera su resultado. La cancelación de un llamador no cancela a los demás.
+        """
+        task_key = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda done: self._forget(task_key, done))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key, task) -> None:
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
@@ -0,0 +1,251 @@
+"""
+Path: app/components/services/session/chat_session_manager.py
+Sesiones de chat por usuario para los clientes LLM.
+
+Cada usuario tiene su propio historial acotado (ventana de turnos y de tokens
+estimados) y su propio lock, de modo que los pedidos concurrentes de un mismo
+usuario se serializan sin bloquear a los demás. Las sesiones inactivas expiran
+por TTL y, si hay demasiadas, se expulsan por LRU; al volver a usarse se
+reconstruyen de forma diferida desde el historial persistido.
+
+Con un IChatSessionStore compartido (SQLite o Redis), el historial vive en el
+almacenamiento: cada turno lo lee al tomar la sesión y lo escribe al soltarla
+con control de versión optimista, de modo que cualquier worker puede atender
+cualquier pedido sin enrutamiento fijo.
+
+El historial que recibe el LLM en cada pedido lo arma un ContextBuilder: los
+turnos más recientes que entran en el presupuesto de tokens del prompt junto a
+la instrucción del sistema y el mensaje actual.
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from app.components.services.llm.llm_client import History
+from app.components.services.session.context_builder import ContextBuilder
+from app.components.services.session.session_store import IChatSessionStore, create_session_store
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+HistoryLoader = Callable[[str, int], List[Tuple[str, str]]]
+
+
+class ChatSession:
+    """
+    Historial de un usuario: pares (mensaje, respuesta) dentro de la ventana configurada.
+    Debe usarse mientras se tiene `lock` (ver ChatSessionManager.session).
+    `pending` guarda los turnos agregados desde la última escritura en el
+    almacenamiento compartido y `version`, la versión leída de él.
+    """
+
+    def __init__(self, user_id: str, max_turns: int, max_tokens: int, context_builder: ContextBuilder = None):
+        self.user_id = user_id
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.context_builder = context_builder or ContextBuilder()
+        self.turns = []
+        self.pending = []
+        self.version = 0
+        self.loaded = False
+        self.last_used = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def history(self) -> History:
+        """Historial en el formato que reciben los clientes LLM."""
+        history = []
+        for message, response in self.turns:
+            history.append(("user", message))
+            history.append(("model", response))
+        return history
+
+    def context(self, message: str = "") -> History:
+        """Historial recortado al presupuesto de tokens del prompt para enviar `message`."""
+        return self.context_builder.build(self.turns, message)
+
+    def add_turn(self, message: str, response: str) -> None:
+        """Agrega un turno y descarta los más antiguos que excedan la ventana."""
+        if message and response:
+            self.turns.append((message, response))
+            self.pending.append((message, response))
+            self._trim()
+
+    def replace_turns(self, turns: List[Tuple[str, str]]) -> None:
+        """Reemplaza el historial completo (p. ej. al reconstruirlo)."""
+        self.turns = [(message, response) for message, response in turns if message and response]
+        self._trim()
+
+    def _trim(self) -> None:
+        if len(self.turns) > self.max_turns:
+            del self.turns[:len(self.turns) - self.max_turns]
+        turn_tokens = self.context_builder.turn_tokens
+        total = sum(turn_tokens(message, response) for message, response in self.turns)
+        while self.turns and total > self.max_tokens:
+            message, response = self.turns.pop(0)
+            total -= turn_tokens(message, response)
+
+
+class ChatSessionManager:
+    """
+    Administra las sesiones de chat en memoria, indexadas por user_id.
+    """
+
+    def __init__(self, history_loader: Optional[HistoryLoader] = None, max_sessions: int = 1024,
+                 ttl: float = 1800, max_turns: int = 10, max_tokens: int = 4000, clock=time.monotonic,
+                 store: Optional[IChatSessionStore] = None, max_save_attempts: int = 5,
+                 context_builder: Optional[ContextBuilder] = None):
+        """
+        :param history_loader: (Opcional) Función (user_id, límite) → [(mensaje, respuesta)]
+                               del más antiguo al más reciente, para reconstruir sesiones.
+        :param max_sessions: Cantidad máxima de sesiones en memoria (LRU).
+        :param ttl: Segundos de inactividad tras los cuales una sesión expira.
+        :param max_turns: Turnos (mensaje + respuesta) que se envían como contexto.
+        :param max_tokens: Tokens estimados máximos del historial guardado por sesión.
+        :param clock: (Opcional) Reloj inyectable, útil en pruebas.
+        :param store: (Opcional) Almacenamiento compartido entre workers.
+        :param max_save_attempts: Reintentos de escritura ante conflictos de versión.
+        :param context_builder: (Opcional) Arma el historial de cada pedido dentro del
+                                presupuesto de tokens del prompt.
+        """
+        self.context_builder = context_builder or ContextBuilder()
+        self.store = store
+        self.max_save_attempts = max_save_attempts
+        self.conflicts = 0
+        self.history_loader = history_loader
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.clock = clock
+        self.loads = 0
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self, user_id: str) -> Iterator[ChatSession]:
+        """
+        Entrega la sesión del usuario con su lock tomado. La primera vez (o tras
+        expirar) el historial se reconstruye con `history_loader`.
+        """
+        chat_session = self._get_or_create(str(user_id))
+        with chat_session.lock:
+            if self.store is not None:
+                self._load_shared(chat_session)
+            elif not chat_session.loaded:
+                self._load(chat_session)
+            try:
+                yield chat_session
+            finally:
+                chat_session.last_used = self.clock()
+                if self.store is not None and chat_session.pending:
+                    self._save_shared(chat_session)
+
+    def discard(self, user_id: str) -> None:
+        """Olvida la sesión en memoria de un usuario."""
+        with self._lock:
+            self._sessions.pop(str(user_id), None)
+        if self.store is not None:
+            self.store.delete(str(user_id))
+
+    def stats(self) -> dict:
+        """Sesiones activas, reconstrucciones y expulsiones."""
+        with self._lock:
+            return {"sessions": len(self._sessions), "loads": self.loads, "evictions": self.evictions,
+                    "conflicts": self.conflicts}
+
+    def _get_or_create(self, user_id: str) -> ChatSession:
+        now = self.clock()
+        with self._lock:
+            chat_session = self._sessions.get(user_id)
+            if chat_session is not None and chat_session.loaded and chat_session.last_used + self.ttl <= now:
+                chat_session = None
+            if chat_session is None:
+                chat_session = ChatSession(user_id, self.max_turns, self.max_tokens, self.context_builder)
+                chat_session.last_used = now
+                self._sessions[user_id] = chat_session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+            self._sessions.move_to_end(user_id)
+            return chat_session
+
+    def _load(self, chat_session: ChatSession) -> None:
+        if self.history_loader is not None:
+            chat_session.replace_turns(self.history_loader(chat_session.user_id, self.max_turns))
+            with self._lock:
+                self.loads += 1
+        chat_session.loaded = True
+
+    def _load_shared(self, chat_session: ChatSession) -> None:
+        """Lee el historial vigente del almacenamiento compartido (o lo reconstruye)."""
+        stored = self.store.load(chat_session.user_id)
+        if stored is None:
+            chat_session.version = 0
+            self._load(chat_session)
+        else:
+            chat_session.replace_turns(stored.turns)
+            chat_session.version = stored.version
+            chat_session.loaded = True
+        chat_session.pending = []
+
+    def _save_shared(self, chat_session: ChatSession) -> None:
+        """
+        Escribe el historial con la versión leída. Si otro worker escribió antes,
+        vuelve a leer, agrega los turnos nuevos de este pedido y reintenta.
+        """
+        for _ in range(self.max_save_attempts):
+            version = self.store.save(chat_session.user_id, chat_session.turns, chat_session.version, self.ttl)
+            if version is not None:
+                chat_session.version = version
+                chat_session.pending = []
+                return
+            with self._lock:
+                self.conflicts += 1
+            stored = self.store.load(chat_session.user_id)
+            chat_session.replace_turns((stored.turns if stored else []) + chat_session.pending)
+            chat_session.version = stored.version if stored else 0
+        logger.warning("No se pudo guardar el historial del usuario %s tras %d conflictos de versión.",
+                       chat_session.user_id, self.max_save_attempts)
+        chat_session.pending = []
+
+
+def conversation_history_loader(conversation_repository, max_age_days: Optional[float] = None) -> HistoryLoader:
+    """
+    Adapta ConversationRepository.get_conversations_by_user como `history_loader`:
+    ordena del más antiguo al más reciente y omite las conversaciones sin respuesta.
+    Con `max_age_days`, solo lee conversaciones recientes (las particiones calientes).
+    """
+    def load(user_id: str, limit: int):
+        since = None
+        if max_age_days:
+            since = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+        conversations = conversation_repository.get_conversations_by_user(user_id, limit, since=since)
+        return [(conversation.message, conversation.response)
+                for conversation in reversed(conversations) if conversation.response]
+    return load
+
+
+def create_session_manager(session_config: dict, history_loader: Optional[HistoryLoader] = None,
+                           system_instruction: Union[str, Callable[[], str]] = "") -> ChatSessionManager:
+    """
+    Crea el administrador según la sección CHAT_SESSIONS de la configuración
+    (MAX_SESSIONS, TTL, MAX_TURNS, MAX_TOKENS, PROMPT_MAX_TOKENS y el
+    almacenamiento STORE). PROMPT_MAX_TOKENS acota el prompt completo, incluida
+    `system_instruction` (el texto, o una función que retorna el vigente).
+    """
+    session_config = session_config or {}
+    return ChatSessionManager(
+        context_builder=ContextBuilder(max_tokens=session_config.get("PROMPT_MAX_TOKENS", 6000),
+                                       system_instruction=system_instruction),
+        store=create_session_store(session_config),
+        history_loader=history_loader,
+        max_sessions=session_config.get("MAX_SESSIONS", 1024),
+        ttl=session_config.get("TTL", 1800),
+        max_turns=session_config.get("MAX_TURNS", 10),
+        max_tokens=session_config.get("MAX_TOKENS", 4000)
+    )
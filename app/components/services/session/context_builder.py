@@ -0,0 +1,148 @@
+"""
+Path: app/components/services/session/context_builder.py
+Armado del contexto que recibe el LLM dentro de un presupuesto de tokens.
+
+El prompt de cada pedido es la instrucción del sistema, el historial y el
+mensaje actual. ContextBuilder reserva los tokens de la instrucción y del
+mensaje, y completa el resto con los turnos más recientes que entran; el
+turno más antiguo que no entra completo se recorta (conservando su final) o
+se descarta. Así el tamaño del prompt, y con él la latencia y el costo,
+queda acotado sin importar cuánto lleve conversando el usuario.
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Tuple, Union
+from app.components.services.llm.llm_client import History
+
+# Palabras (incluye acentos y ñ), números o signos sueltos.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """
+    Tokenizador local aproximado: cada signo es un token y cada palabra, un
+    token cada `chars_per_token` caracteres (similar a los tokenizadores BPE
+    con texto en español). Los conteos se cachean por mensaje (LRU), porque
+    los mismos turnos del historial se vuelven a contar en cada pedido.
+    """
+
+    def __init__(self, chars_per_token: int = 4, max_entries: int = 8192):
+        self.chars_per_token = chars_per_token
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        """Tokens aproximados de `text`."""
+        if not text:
+            return 0
+        with self._lock:
+            tokens = self._counts.get(text)
+            if tokens is not None:
+                self._counts.move_to_end(text)
+                self.hits += 1
+                return tokens
+        tokens = sum(self._word_tokens(match.group()) for match in _TOKEN_PATTERN.finditer(text))
+        with self._lock:
+            self.misses += 1
+            self._counts[text] = tokens
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def truncate_start(self, text: str, max_tokens: int) -> str:
+        """Conserva el final de `text` que entra en `max_tokens` tokens."""
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 1:
+            return ""
+        kept = 1  # el "…" que marca el recorte
+        for match in reversed(list(_TOKEN_PATTERN.finditer(text))):
+            kept += self._word_tokens(match.group())
+            if kept > max_tokens:
+                return "…" + text[match.end():].lstrip()
+        return text
+
+    def stats(self) -> dict:
+        """Tamaño y aciertos de la caché de conteos."""
+        with self._lock:
+            return {"entries": len(self._counts), "hits": self.hits, "misses": self.misses}
+
+    def _word_tokens(self, word: str) -> int:
+        return max(1, math.ceil(len(word) / self.chars_per_token))
+
+
+class ContextBuilder:
+    """
+    Selecciona los turnos de historial que entran en el presupuesto del prompt.
+    """
+
+    def __init__(self, max_tokens: int = 6000, system_instruction: Union[str, Callable[[], str]] = "",
+                 counter: TokenCounter = None, turn_overhead: int = 4, min_trimmed_tokens: int = 32):
+        """
+        :param max_tokens: Tokens máximos del prompt completo (instrucción, historial y mensaje).
+        :param system_instruction: Instrucción del sistema que acompaña cada pedido, o una
+                                   función que retorna la vigente (se consulta en cada pedido).
+        :param counter: (Opcional) Contador de tokens compartido.
+        :param turn_overhead: Tokens de formato (roles, separadores) por cada mensaje del historial.
+        :param min_trimmed_tokens: Tokens mínimos para incluir recortado el turno que no entra
+                                   completo; con menos espacio, ese turno se descarta.
+        """
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+        self.turn_overhead = turn_overhead
+        self.min_trimmed_tokens = min_trimmed_tokens
+        self._system_instruction = system_instruction
+
+    @property
+    def system_tokens(self) -> int:
+        """Tokens de la instrucción del sistema vigente (el conteo queda en la caché del contador)."""
+        instruction = self._system_instruction
+        return self.counter.count(instruction() if callable(instruction) else instruction)
+
+    def turn_tokens(self, message: str, response: str) -> int:
+        """Tokens que ocupa un turno (mensaje + respuesta) en el prompt."""
+        return self.counter.count(message) + self.counter.count(response) + 2 * self.turn_overhead
+
+    def history_budget(self, message: str = "") -> int:
+        """Tokens disponibles para el historial junto al mensaje actual."""
+        return self.max_tokens - self.system_tokens - self.counter.count(message) - self.turn_overhead
+
+    def build(self, turns: List[Tuple[str, str]], message: str = "") -> History:
+        """
+        Retorna el historial, del más antiguo al más reciente, con los turnos más
+        recientes de `turns` que entran en el presupuesto junto a `message`.
+        """
+        budget = self.history_budget(message)
+        selected = []
+        for turn_message, response in reversed(turns):
+            tokens = self.turn_tokens(turn_message, response)
+            if tokens <= budget:
+                selected.append((turn_message, response))
+                budget -= tokens
+                continue
+            trimmed = self._trim_turn(turn_message, response, budget)
+            if trimmed is not None:
+                selected.append(trimmed)
+            break
+
+        history = []
+        for turn_message, response in reversed(selected):
+            history.append(("user", turn_message))
+            history.append(("model", response))
+        return history
+
+    def _trim_turn(self, message: str, response: str, budget: int):
+        """Recorta el comienzo de la respuesta (y si hace falta del mensaje) para que el turno entre."""
+        available = budget - 2 * self.turn_overhead
+        if available < self.min_trimmed_tokens:
+            return None
+        message_tokens = min(self.counter.count(message), available // 2)
+        message = self.counter.truncate_start(message, message_tokens)
+        response = self.counter.truncate_start(response, available - self.counter.count(message))
+        return (message, response) if message and response else None
@@ -0,0 +1,72 @@
+"""
+Path: app/components/services/session/session_impl/redis_store.py
+
+Implementación de IChatSessionStore sobre un almacén compatible con Redis.
+
+Cada usuario es un hash {"v": versión, "d": turnos serializados} con TTL nativo.
+La escritura condicional usa WATCH/MULTI de redis-py, por lo que en desarrollo
+puede usarse cualquier servidor o sustituto local con esa API (p. ej. fakeredis,
+Valkey o KeyDB).
+"""
+
+from typing import List, Optional, Tuple
+from app.components.services.session.session_store import (
+    IChatSessionStore, StoredSession, serialize_turns, deserialize_turns)
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # el cliente puede ser un sustituto local sin redis-py instalado
+    class WatchError(Exception):
+        """Sustituto de redis.exceptions.WatchError."""
+
+
+class RedisSessionStore(IChatSessionStore):
+    """
+    Historial compartido entre workers y hosts, con TTL nativo del servidor.
+    """
+    def __init__(self, client, prefix: str = "madybot:session"):
+        """
+        :param client: Cliente compatible con redis-py.
+        :param prefix: Prefijo de las claves.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        """Crea el almacenamiento con redis-py (dependencia opcional) a partir de una URL."""
+        try:
+            import redis  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError("El almacenamiento 'redis' requiere el paquete 'redis' (pip install redis).") from exc
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def load(self, user_id: str) -> Optional[StoredSession]:
+        values = self.client.hmget(self._key(user_id), "v", "d")
+        if values[0] is None:
+            return None
+        return StoredSession(deserialize_turns(values[1]), int(values[0]))
+
+    def save(self, user_id: str, turns: List[Tuple[str, str]], expected_version: int,
+             ttl: float) -> Optional[int]:
+        key = self._key(user_id)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.hget(key, "v")
+                if int(current or 0) != expected_version:
+                    pipe.unwatch()
+                    return None
+                pipe.multi()
+                pipe.hset(key, mapping={"v": expected_version + 1, "d": serialize_turns(turns)})
+                pipe.expire(key, max(1, int(ttl)))
+                pipe.execute()
+                return expected_version + 1
+            except WatchError:
+                return None
+
+    def delete(self, user_id: str) -> None:
+        self.client.delete(self._key(user_id))
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
@@ -0,0 +1,80 @@
+"""
+Path: app/components/services/session/session_impl/sqlite_store.py
+
+Implementación de IChatSessionStore sobre un archivo SQLite local.
+En modo WAL, varios procesos (workers) del mismo host comparten el historial.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from app.components.services.session.session_store import (
+    IChatSessionStore, StoredSession, serialize_turns, deserialize_turns)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    user_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    version INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteSessionStore(IChatSessionStore):
+    """
+    Historial en SQLite con TTL y escritura condicional por número de versión.
+    """
+    def __init__(self, path: str):
+        """
+        :param path: Ruta del archivo SQLite (se crea el directorio si no existe).
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+
+    def load(self, user_id: str) -> Optional[StoredSession]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, version, expires_at FROM chat_sessions WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            if row[2] <= time.time():
+                # Expirado: se elimina para que la próxima escritura parta de la versión 0.
+                self._connection.execute(
+                    "DELETE FROM chat_sessions WHERE user_id = ? AND version = ?", (user_id, row[1]))
+                return None
+            return StoredSession(deserialize_turns(row[0]), row[1])
+
+    def save(self, user_id: str, turns: List[Tuple[str, str]], expected_version: int,
+             ttl: float) -> Optional[int]:
+        data = serialize_turns(turns)
+        expires_at = time.time() + ttl
+        with self._lock:
+            if expected_version == 0:
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO chat_sessions (user_id, data, version, expires_at) VALUES (?, ?, 1, ?)",
+                    (user_id, data, expires_at))
+            else:
+                cursor = self._connection.execute(
+                    "UPDATE chat_sessions SET data = ?, version = version + 1, expires_at = ? "
+                    "WHERE user_id = ? AND version = ?",
+                    (data, expires_at, user_id, expected_version))
+            return expected_version + 1 if cursor.rowcount == 1 else None
+
+    def delete(self, user_id: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM chat_sessions WHERE user_id = ?", (user_id,))
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,78 @@
+"""
+Path: app/components/services/session/session_store.py
+Almacenamiento compartido del historial de chat entre workers.
+
+Definición de interfaces (ISP):
+- IChatSessionStore: lectura y escritura condicional (versión optimista) del
+  historial serializado de cada usuario.
+
+El historial se guarda como JSON compacto comprimido con zlib. Cada escritura
+indica la versión que se leyó; si otro worker escribió antes, la escritura se
+rechaza y el llamador vuelve a leer y reintenta (ver ChatSessionManager).
+"""
+
+import json
+import zlib
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+StoredSession = namedtuple("StoredSession", ["turns", "version"])
+
+
+def serialize_turns(turns: List[Tuple[str, str]]) -> bytes:
+    """Serializa los turnos (mensaje, respuesta) como JSON compacto comprimido."""
+    payload = json.dumps(turns, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def deserialize_turns(data: bytes) -> List[Tuple[str, str]]:
+    """Operación inversa de serialize_turns."""
+    return [(message, response) for message, response in json.loads(zlib.decompress(data))]
+
+
+class IChatSessionStore(ABC):
+    """
+    Interfaz de almacenamiento del historial de chat por usuario.
+    """
+    @abstractmethod
+    def load(self, user_id: str) -> Optional[StoredSession]:
+        """
+        Retorna los turnos y la versión vigentes del usuario, o None si no hay historial.
+        """
+
+    @abstractmethod
+    def save(self, user_id: str, turns: List[Tuple[str, str]], expected_version: int,
+             ttl: float) -> Optional[int]:
+        """
+        Guarda los turnos solo si la versión almacenada sigue siendo `expected_version`
+        (0 si no existía). Retorna la nueva versión, o None si hubo un conflicto.
+        """
+
+    @abstractmethod
+    def delete(self, user_id: str) -> None:
+        """
+        Elimina el historial del usuario.
+        """
+
+
+def create_session_store(session_config: dict) -> Optional[IChatSessionStore]:
+    """
+    Crea el almacenamiento compartido según CHAT_SESSIONS.STORE ("memory", "sqlite"
+    o "redis"), SQLITE_PATH y REDIS_URL. Con "memory" retorna None: cada worker
+    conserva solo su propio historial en memoria.
+    """
+    session_config = session_config or {}
+    store_name = session_config.get("STORE", "memory")
+
+    # Importaciones diferidas: cada backend solo se carga si se usa.
+    # pylint: disable=import-outside-toplevel
+    if store_name == "memory":
+        return None
+    if store_name == "sqlite":
+        from app.components.services.session.session_impl.sqlite_store import SQLiteSessionStore
+        return SQLiteSessionStore(session_config.get("SQLITE_PATH", "cache/sessions.sqlite3"))
+    if store_name == "redis":
+        from app.components.services.session.session_impl.redis_store import RedisSessionStore
+        return RedisSessionStore.from_url(session_config.get("REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Almacenamiento de sesiones no válido: {store_name}")
@@ -17,6 +17,10 @@ load_dotenv()
 # Inicializamos SQLAlchemy (se enlazará con la app en create_app)
 db = SQLAlchemy()
 
+# Directorio de las migraciones de Alembic (raíz del proyecto)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'migrations')
+
 class FlaskConfig:
     """
     Clase para manejar la configuración de la aplicación Flask.
@@ -64,6 +68,10 @@ class FlaskConfig:
         # Inicializar SQLAlchemy con Flask
         db.init_app(app)
 
+        # Migraciones versionadas del esquema: `flask --app run:create_app db upgrade`
+        from flask_migrate import Migrate  # pylint: disable=import-outside-toplevel
+        Migrate(app, db, directory=MIGRATIONS_DIR)
+
         self.logger.debug("CORS y SQLAlchemy configurados correctamente.")
         return app
 
@@ -11,28 +11,67 @@ from app.components.services.data.data_validator import DataSchemaValidator
 from app.components.services.response.response_generator import ResponseGenerator
 from app.components.services.llm.model_config import ModelConfig
 from app.components.channels.web_messaging_channel import WebMessagingChannel
+from app.components.services.cache.response_cache import create_response_cache
+from app.components.services.cache.semantic_cache import create_semantic_cache
+from app.components.services.session.chat_session_manager import (
+    create_session_manager, conversation_history_loader)
+from app.core.config import FlaskConfig
 
 # Importar los nuevos servicios de persistencia
 from app.components.services.data.user_persistence_service import UserPersistenceService
 from app.components.services.data.conversation_persistence_service import ConversationPersistenceService
+from app.components.services.data.write_behind import (
+    create_write_behind_queue, persistence_flusher, is_permanent_persistence_error)
+from app.components.services.data.user_fingerprint_cache import create_user_fingerprint_cache
 
 class DependencyContainer:
     "Contenedor de dependencias para la inyección de dependencias en la aplicación."
     
     def __init__(self):
+        self.config = FlaskConfig().get_config()
         self.web_channel = WebMessagingChannel()
         self.data_validator = DataSchemaValidator()
-        self.model_config = ModelConfig()
+        self.model_config = ModelConfig(config=self.config)
         self.llm_client = self.model_config.create_llm_client()
-        self.response_generator = ResponseGenerator(self.llm_client)
+        self.response_cache = create_response_cache(self.config.get("RESPONSE_CACHE"))
+        self.semantic_cache = create_semantic_cache(self.config.get("SEMANTIC_CACHE"))
 
         # Instanciar repositorios
         self.user_repository = UserRepository()
         self.conversation_repository = ConversationRepository()
 
+        # Sesiones de chat por usuario, reconstruidas desde las conversaciones guardadas
+        self.session_manager = create_session_manager(
+            self.config.get("CHAT_SESSIONS"),
+            conversation_history_loader(self.conversation_repository,
+                                        (self.config.get("CHAT_SESSIONS") or {}).get("HISTORY_MAX_AGE_DAYS")),
+            system_instruction=self.model_config.current_system_instruction
+        )
+        self.response_generator = ResponseGenerator(
+            self.llm_client,
+            response_cache=self.response_cache,
+            semantic_cache=self.semantic_cache,
+            session_manager=self.session_manager,
+            fallback_response=(self.config.get("LLM_RESILIENCE") or {}).get("FALLBACK_RESPONSE")
+        )
+
+        # Escritura diferida (opcional) de usuarios y conversaciones; ServerLauncher inicia su hilo
+        self.write_behind = create_write_behind_queue(
+            self.config.get("WRITE_BEHIND"),
+            persistence_flusher(self.conversation_repository),
+            is_permanent=is_permanent_persistence_error
+        )
+
         # Usar servicios especializados en lugar de PersistenceService
-        self.user_persistence_service = UserPersistenceService(self.user_repository)
-        self.conversation_persistence_service = ConversationPersistenceService(self.conversation_repository)
+        # Las huellas de perfil se comparten: un perfil guardado por uno no se vuelve a escribir en el otro
+        self.user_persistence_service = UserPersistenceService(
+            self.user_repository, self.write_behind,
+            fingerprints=create_user_fingerprint_cache(self.config.get("USER_FINGERPRINT_CACHE"))
+        )
+        self.conversation_persistence_service = ConversationPersistenceService(
+            self.conversation_repository, self.write_behind,
+            user_fingerprints=self.user_persistence_service.fingerprints
+        )
 
         # Pasar los servicios especializados a DataService
         self.data_service = DataService(
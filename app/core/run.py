@@ -3,8 +3,11 @@ Path: app/core/run.py
 
 """
 
+import atexit
 import sys
+from sqlalchemy.exc import SQLAlchemyError
 from app.core.config import FlaskConfig, db
+from app.core.dependency_container import container
 from app.components.blueprints.data.data_controller import data_controller
 
 class ServerLauncher:
@@ -27,10 +30,14 @@ class ServerLauncher:
 
     def run(self):
         """Inicia el servidor Flask."""
-        # Crear las tablas en el contexto de la aplicación
+        # El esquema lo crean las migraciones (`flask --app run:create_app db upgrade`), no el arranque
         with self.app.app_context():
-            db.create_all()
-            self.logger.info("Tablas de la base de datos creadas (si no existían).")
+            self.check_schema()
+
+        # Escritura diferida: el hilo guarda los lotes dentro del contexto de la aplicación
+        if container.write_behind is not None:
+            container.write_behind.start(self.app.app_context)
+            atexit.register(container.write_behind.close)
 
         try:
             self.app.run(debug=self.config['IS_DEVELOPMENT'], host='0.0.0.0', port=5000)
@@ -39,6 +46,24 @@ class ServerLauncher:
             self.logger.error("Error al iniciar el servidor Flask: %s", e)
             sys.exit(1)
 
+    def check_schema(self):
+        """Advierte si la base de datos no tiene aplicadas todas las migraciones."""
+        # pylint: disable=import-outside-toplevel
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+        try:
+            heads = set(ScriptDirectory.from_config(
+                self.app.extensions['migrate'].migrate.get_config()).get_heads())
+            with db.engine.connect() as connection:
+                current = set(MigrationContext.configure(connection).get_current_heads())
+        except SQLAlchemyError as e:
+            self.logger.error("No se pudo verificar la versión del esquema: %s", e)
+            return
+        if current != heads:
+            self.logger.warning("El esquema de la base de datos (%s) no está al día (%s). "
+                                "Ejecutá: flask --app run:create_app db upgrade",
+                                ", ".join(sorted(current)) or "sin migraciones", ", ".join(sorted(heads)))
+
 if __name__ == "__main__":
     launcher = ServerLauncher()
     launcher.register_blueprints()
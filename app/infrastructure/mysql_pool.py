@@ -0,0 +1,102 @@
+"""
+Path: app/infrastructure/mysql_pool.py
+Pool de conexiones pymysql reutilizables.
+
+Evita abrir y cerrar una conexión nueva cada vez que un componente necesita
+consultar MySQL fuera de SQLAlchemy (por ejemplo, la fuente de reglas de negocio).
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+import pymysql
+from utils.logging.logger_configurator import LoggerConfigurator
+
+logger = LoggerConfigurator().configure()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class MySQLConnectionPool:
+    """
+    Pool acotado y seguro entre hilos de conexiones pymysql.
+    Las conexiones se validan con `ping(reconnect=True)` al tomarlas.
+    """
+
+    def __init__(self, db_config: dict, max_size: int = 4):
+        """
+        :param db_config: Diccionario con host, user, password y database.
+        :param max_size: Cantidad máxima de conexiones inactivas retenidas.
+        """
+        self.db_config = db_config
+        self.max_size = max_size
+        self._idle = queue.LifoQueue(maxsize=max_size)
+
+    def _connect(self):
+        return pymysql.connect(
+            host=self.db_config["host"],
+            user=self.db_config["user"],
+            password=self.db_config["password"],
+            database=self.db_config["database"],
+            cursorclass=pymysql.cursors.DictCursor
+        )
+
+    def acquire(self):
+        """Toma una conexión del pool o abre una nueva si no hay disponibles."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+        try:
+            connection.ping(reconnect=True)
+            return connection
+        except pymysql.MySQLError as e:
+            logger.warning("Conexión del pool descartada: %s", e)
+            return self._connect()
+
+    def release(self, connection) -> None:
+        """Devuelve la conexión al pool, o la cierra si el pool está lleno."""
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que toma y devuelve una conexión.
+        Si ocurre un error de MySQL, la conexión se cierra en lugar de reutilizarse;
+        ante cualquier otra salida (otra excepción, GeneratorExit) vuelve al pool.
+        """
+        connection = self.acquire()
+        closed = False
+        try:
+            yield connection
+        except pymysql.MySQLError:
+            closed = True
+            connection.close()
+            raise
+        finally:
+            if not closed:
+                self.release(connection)
+
+    def close(self) -> None:
+        """Cierra todas las conexiones inactivas."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def get_pool(db_config: dict, max_size: int = 4) -> MySQLConnectionPool:
+    """
+    Retorna el pool compartido para `db_config`, creándolo la primera vez.
+    Así, varias instancias de un mismo componente reutilizan las mismas conexiones.
+    """
+    key = (db_config["host"], db_config["user"], db_config["database"])
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = MySQLConnectionPool(db_config, max_size)
+        return _pools[key]
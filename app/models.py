@@ -20,6 +20,10 @@ class User(db.Model):
 class Conversation(db.Model):
     "Modelo de datos para la tabla de conversaciones."
     __tablename__ = 'conversations'
+    # Historial por usuario: WHERE user_id = ? ORDER BY created_at DESC LIMIT n (migración 0002)
+    __table_args__ = (
+        db.Index('ix_conversations_user_id_created_at', 'user_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.String(255), db.ForeignKey('users.user_id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -1,7 +1,10 @@
 # app/repositories/conversation_repository.py
 
-from app.models import Conversation
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import Conversation, User
 from app.core.config import db
+from app.repositories.user_repository import UserRepository
 from utils.logging.logger_configurator import LoggerConfigurator
 
 logger = LoggerConfigurator().configure()
@@ -11,6 +14,43 @@ class ConversationRepository:
     Repositorio para gestionar la persistencia de conversaciones en la base de datos.
     """
 
+    def __init__(self, user_repository: UserRepository = None):
+        self.user_repository = user_repository or UserRepository()
+
+    def save_interaction(self, user_id, message, response=None, user_profile=None):
+        """
+        Guarda el usuario (si se indica su perfil) y la conversación con su respuesta
+        final en una única transacción: upsert del usuario, INSERT y un solo commit.
+        Sin perfil, la conversación solo se inserta si el usuario existe (en la misma
+        sentencia): en MySQL la tabla particionada no tiene clave foránea que lo garantice.
+
+        :param user_id: ID del usuario al que pertenece la conversación.
+        :param message: Mensaje enviado por el usuario.
+        :param response: Respuesta generada (None si la generación falló).
+        :param user_profile: (Opcional) Campos del perfil para el upsert del usuario.
+        :return: ID de la conversación insertada o None en caso de error.
+        """
+        try:
+            if user_profile is None:
+                conversation_id = self._insert_for_existing_user(user_id, message, response)
+                if conversation_id is None:
+                    db.session.rollback()
+                    logger.warning("El usuario %s no existe; no se guarda la interacción.", user_id)
+                    return None
+            else:
+                if not self.user_repository.upsert_user(user_id, commit=False, **user_profile):
+                    return None
+                result = db.session.execute(
+                    Conversation.__table__.insert().values(user_id=user_id, message=message, response=response))
+                conversation_id = result.inserted_primary_key[0]
+            db.session.commit()
+            logger.info("Interacción guardada correctamente para el usuario %s", user_id)
+            return conversation_id
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error("Error al guardar la interacción: %s", e)
+            return None
+
     def save_conversation(self, user_id, message, response=None):
         """
         Guarda una nueva conversación en la base de datos.
@@ -31,6 +71,56 @@ class ConversationRepository:
             logger.error("Error al guardar la conversación: %s", e)
             return None
 
+    def save_interactions(self, interactions, user_profiles=None, known_profiles=None):
+        """
+        Guarda un lote en una transacción: upsert masivo de los usuarios e INSERT
+        masivo (executemany) de las conversaciones. Ante un error hace rollback y
+        propaga la excepción, para que el lote se reintente.
+
+        :param interactions: Diccionarios con user_id, message y response.
+        :param user_profiles: (Opcional) Perfiles por user_id para el upsert de usuarios.
+        :param known_profiles: (Opcional) Perfiles por user_id cuyo upsert se omitió por
+                               no haber cambiado; se guardan solo los de usuarios que ya
+                               no existen (una consulta por lote).
+        """
+        try:
+            profiles = dict(user_profiles or {})
+            unverified = {user_id: profile for user_id, profile in (known_profiles or {}).items()
+                          if user_id not in profiles}
+            if unverified:
+                existing = set(db.session.execute(
+                    sa.select(User.user_id).where(User.user_id.in_(list(unverified)))).scalars())
+                profiles.update({user_id: profile for user_id, profile in unverified.items()
+                                 if user_id not in existing})
+            self.user_repository.upsert_users(profiles, commit=False)
+            if interactions:
+                db.session.execute(Conversation.__table__.insert(), [
+                    {"user_id": interaction["user_id"], "message": interaction["message"],
+                     "response": interaction.get("response")}
+                    for interaction in interactions
+                ])
+            db.session.commit()
+            logger.info("Lote guardado: %d usuarios, %d conversaciones.", len(profiles), len(interactions))
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def _insert_for_existing_user(user_id, message, response):
+        """
+        INSERT ... SELECT de la conversación condicionado a que exista el usuario.
+        Retorna el ID insertado, o None si el usuario no existe.
+        """
+        table = Conversation.__table__
+        statement = table.insert().from_select(
+            ["user_id", "message", "response"],
+            sa.select(sa.literal(user_id, table.c.user_id.type), sa.literal(message, table.c.message.type),
+                      sa.literal(response, table.c.response.type)).where(User.__table__.c.user_id == user_id))
+        if db.session.get_bind().dialect.insert_returning:
+            return db.session.execute(statement.returning(table.c.id)).scalar()
+        result = db.session.execute(statement)
+        return result.lastrowid if result.rowcount else None
+
     def get_conversation_by_id(self, conversation_id):
         """
         Obtiene una conversación por su ID.
@@ -49,17 +139,22 @@ class ConversationRepository:
             logger.error("Error al obtener la conversación %s: %s", conversation_id, e)
             return None
 
-    def get_conversations_by_user(self, user_id, limit=10):
+    def get_conversations_by_user(self, user_id, limit=10, since=None):
         """
         Obtiene las últimas conversaciones de un usuario.
 
         :param user_id: ID del usuario.
         :param limit: Cantidad máxima de conversaciones a recuperar (por defecto 10).
+        :param since: (Opcional) Fecha mínima de created_at; con la tabla particionada
+                      por mes, la consulta solo lee las particiones desde esa fecha.
         :return: Lista de objetos Conversation.
         """
         try:
+            query = Conversation.query.filter_by(user_id=user_id)
+            if since is not None:
+                query = query.filter(Conversation.created_at >= since)
             conversations = (
-                Conversation.query.filter_by(user_id=user_id)
+                query
                 .order_by(Conversation.created_at.desc())
                 .limit(limit)
                 .all()
@@ -3,13 +3,16 @@ Path: app/repositories/user_repository.py
 
 """
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models import User
 from app.core.config import db
 from utils.logging.logger_configurator import LoggerConfigurator
 
 logger = LoggerConfigurator().configure()
 
+PROFILE_FIELDS = ("user_name", "user_email", "user_agent", "screen_resolution", "language", "platform")
+
 class UserRepository:
     """
     Repositorio para gestionar la persistencia de usuarios en la base de datos.
@@ -76,6 +79,81 @@ class UserRepository:
             logger.error("Error en ensure_user_exists: %s", e)
             return None
 
+    def upsert_user(self, user_id, commit=True, **profile):
+        """
+        Inserta el usuario o actualiza los campos de perfil no nulos en una sola
+        sentencia: INSERT ... ON DUPLICATE KEY UPDATE en MySQL, ON CONFLICT en
+        SQLite/PostgreSQL y UPDATE + INSERT en otros motores.
+
+        :param user_id: Identificador único del usuario.
+        :param commit: Si es False, la escritura queda en la transacción en curso
+                       para que el llamador la confirme junto con otras.
+        :param profile: Campos de PROFILE_FIELDS; los valores None no reemplazan los guardados.
+        :return: True si se guardó, False en caso de error.
+        """
+        try:
+            self.upsert_users({user_id: profile}, commit=False)
+            if commit:
+                db.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error("Error en upsert_user para %s: %s", user_id, e)
+            return False
+
+    def upsert_users(self, profiles, commit=True):
+        """
+        Upsert masivo (executemany) de varios usuarios: {user_id: perfil}.
+        A diferencia de upsert_user, propaga SQLAlchemyError para que el llamador
+        (p. ej. la escritura diferida) sepa que el lote no se guardó.
+        """
+        if not profiles:
+            return
+        rows = [{"user_id": user_id, **{field: (profile or {}).get(field) for field in PROFILE_FIELDS}}
+                for user_id, profile in profiles.items()]
+        statement = self._upsert_statement(db.session.get_bind().dialect.name)
+        if statement is not None:
+            db.session.execute(statement, rows)
+        else:
+            for row in rows:
+                self._update_or_insert(row.pop("user_id"), row)
+        if commit:
+            db.session.commit()
+
+    @staticmethod
+    def _upsert_statement(dialect_name):
+        """Sentencia de upsert nativa del motor (para uno o muchos usuarios), o None si no tiene una."""
+        table = User.__table__
+        # pylint: disable=import-outside-toplevel
+        if dialect_name in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert
+            statement = insert(table)
+            return statement.on_duplicate_key_update({
+                field: func.coalesce(statement.inserted[field], table.c[field]) for field in PROFILE_FIELDS})
+        if dialect_name in ("sqlite", "postgresql"):
+            if dialect_name == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            statement = insert(table)
+            return statement.on_conflict_do_update(index_elements=[table.c.user_id], set_={
+                field: func.coalesce(statement.excluded[field], table.c[field]) for field in PROFILE_FIELDS})
+        return None
+
+    @staticmethod
+    def _update_or_insert(user_id, values):
+        """Upsert portable: UPDATE y, si no existía, INSERT (con reintento si otro pedido lo insertó antes)."""
+        table = User.__table__
+        changes = {field: func.coalesce(value, table.c[field]) for field, value in values.items()}
+        result = db.session.execute(update(table).where(table.c.user_id == user_id).values(changes))
+        if result.rowcount:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert().values(user_id=user_id, **values))
+        except IntegrityError:
+            db.session.execute(update(table).where(table.c.user_id == user_id).values(changes))
+
     def get_user_by_id(self, user_id):
         """
         Obtiene un usuario por su ID único.
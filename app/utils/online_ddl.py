@@ -0,0 +1,58 @@
+"""
+Path: app/utils/online_ddl.py
+Cambios de índices sin bloquear la tabla, para usar desde las migraciones de Alembic.
+
+- MySQL/MariaDB: ALTER TABLE ... ADD/DROP INDEX con ALGORITHM=INPLACE, LOCK=NONE;
+  si el motor no puede hacerlo en línea, la sentencia falla en vez de bloquear.
+- PostgreSQL: CREATE/DROP INDEX CONCURRENTLY, fuera de la transacción de la migración.
+- Otros motores (SQLite en desarrollo y pruebas): CREATE/DROP INDEX común.
+
+Las operaciones son idempotentes: si el índice ya existe (o ya no existe), no hacen
+nada, así una migración interrumpida a mitad de camino se puede volver a ejecutar.
+(Al generar SQL sin conexión, `flask db upgrade --sql`, no se puede consultar y se emite siempre.)
+"""
+
+from typing import Sequence
+import sqlalchemy as sa
+
+
+def index_exists(op, table: str, name: str) -> bool:
+    """True si la tabla `table` tiene un índice llamado `name` (False al generar SQL sin conexión)."""
+    if op.get_context().as_sql:
+        return False
+    return any(index["name"] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def _quote(dialect, identifier: str) -> str:
+    return dialect.identifier_preparer.quote(identifier)
+
+
+def create_index_online(op, name: str, table: str, columns: Sequence[str]) -> None:
+    """Crea el índice `name` sobre `table(columns)` sin bloquear escrituras."""
+    if index_exists(op, table, name):
+        return
+    dialect = op.get_context().dialect
+    if dialect.name in ("mysql", "mariadb"):
+        column_list = ", ".join(_quote(dialect, column) for column in columns)
+        op.execute(f"ALTER TABLE {_quote(dialect, table)} ADD INDEX {_quote(dialect, name)} ({column_list}), "
+                   "ALGORITHM=INPLACE, LOCK=NONE")
+    elif dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, list(columns), postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, list(columns))
+
+
+def drop_index_online(op, name: str, table: str) -> None:
+    """Elimina el índice `name` de `table` sin bloquear escrituras."""
+    if not op.get_context().as_sql and not index_exists(op, table, name):
+        return
+    dialect = op.get_context().dialect
+    if dialect.name in ("mysql", "mariadb"):
+        op.execute(f"ALTER TABLE {_quote(dialect, table)} DROP INDEX {_quote(dialect, name)}, "
+                   "ALGORITHM=INPLACE, LOCK=NONE")
+    elif dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
@@ -3,7 +3,9 @@ Path: app/utils/response.py
 
 """
 
-from flask import jsonify
+import json
+from typing import Iterable, Iterator
+from flask import Response, jsonify, stream_with_context
 from utils.logging.logger_configurator import LoggerConfigurator
 
 
@@ -36,3 +38,49 @@ def render_json_response(code, message, stream = False):
 
         logger.info("response: %s", response)
         return jsonify(response), code
+
+def render_ndjson_response(rows: Iterable[dict], code=200):
+    """
+    Genera una respuesta NDJSON (un objeto JSON por línea) que envía cada fila
+    apenas está disponible.
+
+    :param rows: Iterable de diccionarios serializables.
+    :param code: Código de estado HTTP (por defecto 200).
+    :return: Respuesta Flask en streaming.
+    """
+    def lines():
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(lines()), status=code, mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def render_stream_response(chunks: Iterator[str], code=200):
+    """
+    Genera una respuesta Server-Sent Events: cada fragmento se envía apenas está
+    disponible como un evento con el mismo formato JSON que render_json_response
+    ("response_MadyBot_stream" con el fragmento). Al final se envía un evento
+    "end"; si el stream falla, un evento "error".
+
+    :param chunks: Iterador de fragmentos de texto.
+    :param code: Código de estado HTTP (por defecto 200).
+    :return: Respuesta Flask en streaming.
+    """
+    def events():
+        try:
+            for chunk in chunks:
+                payload = {"response_MadyBot": None, "response_MadyBot_stream": chunk}
+                yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error("Error durante el stream de la respuesta: %s", e)
+            payload = {"response_MadyBot": "Error procesando la solicitud.", "response_MadyBot_stream": None}
+            yield f"event: error\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            return
+        yield "event: end\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        status=code,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,60 @@
+"""
+Path: app/utils/stage_timing.py
+Medición liviana del tiempo de cada etapa de un pedido (validación, persistencia,
+reglas, caché, LLM...), publicada en la cabecera HTTP estándar `Server-Timing`.
+
+Si una etapa termina con una excepción, queda registrada como la etapa que
+falló (la más interna) y la cabecera la informa como `error;desc=<etapa>`,
+aunque el pedido termine respondiendo con un fallback.
+
+Las mediciones se guardan en una variable de contexto: fuera de un pedido
+iniciado con start_timing(), stage() no mide nada.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+_failed_stage: ContextVar[Optional[str]] = ContextVar("failed_stage", default=None)
+
+
+def start_timing() -> Dict[str, float]:
+    """Comienza a medir las etapas del pedido en curso y retorna el diccionario de duraciones (ms)."""
+    timings = {}
+    _timings.set(timings)
+    _failed_stage.set(None)
+    return timings
+
+
+def failed_stage() -> Optional[str]:
+    """Etapa más interna que terminó con una excepción en el pedido en curso, si alguna."""
+    return _failed_stage.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Suma la duración del bloque a la etapa `name` del pedido en curso."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        # Las etapas externas ven la misma excepción: se conserva la primera que falló.
+        if _failed_stage.get() is None:
+            _failed_stage.set(name)
+        raise
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def server_timing_header(timings: Dict[str, float], failed: Optional[str] = None) -> str:
+    """Formatea las duraciones (y la etapa que falló, si se indica) como valor de la cabecera Server-Timing."""
+    entries = [f"{name};dur={duration:.1f}" for name, duration in timings.items()]
+    if failed:
+        entries.append(f"error;desc={failed}")
+    return ", ".join(entries)
@@ -0,0 +1,10 @@
+"""
+Path: archive_conversations.py
+Punto de entrada para archivar y eliminar los meses de conversaciones vencidos.
+"""
+
+import sys
+from app.components.services.archive.conversation_archiver import main
+
+if __name__ == '__main__':
+    sys.exit(main())
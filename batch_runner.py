@@ -0,0 +1,10 @@
+"""
+Path: batch_runner.py
+Punto de entrada para procesar un archivo JSONL de consultas por lotes.
+"""
+
+import sys
+from app.components.services.response.batch_runner import main
+
+if __name__ == '__main__':
+    sys.exit(main())
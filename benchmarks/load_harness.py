@@ -0,0 +1,271 @@
+"""
+Path: benchmarks/load_harness.py
+Generador de carga de extremo a extremo para el endpoint /receive-data.
+
+Envía pedidos a una tasa fija (lazo abierto): cada pedido tiene un instante
+programado y su latencia se mide desde ese instante, de modo que las demoras
+del servidor no reducen la carga ni ocultan la cola (omisión coordinada).
+Reporta throughput, p50/p95/p99 totales y por etapa (según la cabecera
+Server-Timing del servidor) y errores por tipo y por etapa. La etapa de un error
+es la que el servidor informa como `error;desc=<etapa>` en Server-Timing (rules,
+cache, llm...); sin esa entrada se usa "transport" para timeouts y fallas de
+conexión, "stream" para los cortes del stream SSE y "unknown" para el resto. Una
+respuesta 2xx con una etapa fallida (p. ej. el fallback cuando el LLM no está
+disponible) se cuenta como error "degraded".
+
+Para no depender de APIs pagas, levantar el servidor con el proveedor local:
+"SELECTED_MODEL": {"COMPANY": "Local", "MODEL": "fake-llm"} y la sección FAKE_LLM.
+
+Uso:
+    python -m benchmarks.load_harness --url http://localhost:5000/receive-data --rps 20 --duration 30
+    python -m benchmarks.load_harness --url http://localhost:5000/receive-data --rps 5 --stream --output load.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.rules_benchmark import git_revision
+from utils.logging.logger_configurator import LoggerConfigurator
+
+_PROMPTS = [
+    "Hola, ¿cómo estás?",
+    "¿Cómo calculo el punto de equilibrio de la cooperativa?",
+    "¿Qué tasa de interés conviene para un crédito de capital de trabajo?",
+    "Necesito armar el flujo de fondos del mes",
+    "¿Cuánto stock de materia prima conviene tener?",
+    "¿Cómo registro una factura de un proveedor?",
+]
+
+
+def build_payload(rnd: random.Random, users: int, stream: bool) -> dict:
+    """Pedido válido para DataSchemaValidator con un usuario y una consulta al azar."""
+    return {
+        "prompt_user": rnd.choice(_PROMPTS),
+        "stream": stream,
+        "user_data": {
+            "id": f"load-user-{rnd.randrange(users)}",
+            "browserData": {
+                "userAgent": "load-harness",
+                "screenResolution": "1920x1080",
+                "language": "es-AR",
+                "platform": "Linux"
+            }
+        },
+        "datetime": int(time.time())
+    }
+
+
+def _server_timing_entries(header: str):
+    """Recorre 'validate;dur=1.2, error;desc=llm' como pares (nombre, {parámetro: valor})."""
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        if name:
+            yield name, dict(param.strip().partition("=")[::2] for param in params.split(";") if param.strip())
+
+
+def parse_server_timing(header: str) -> dict:
+    """Convierte 'validate;dur=1.2, llm;dur=300' en {'validate': 1.2, 'llm': 300.0}."""
+    stages = {}
+    for name, params in _server_timing_entries(header):
+        if name != "error" and "dur" in params:
+            try:
+                stages[name] = float(params["dur"])
+            except ValueError:
+                pass
+    return stages
+
+
+def parse_failed_stage(header: str):
+    """Etapa informada como fallida ('error;desc=llm' -> 'llm'), o None."""
+    for name, params in _server_timing_entries(header):
+        if name == "error" and params.get("desc"):
+            return params["desc"].strip('"')
+    return None
+
+
+def http_sender(url: str, timeout: float):
+    """
+    Retorna una función send(payload) -> (status, error, stages, failed_stage)
+    que hace un POST JSON con urllib y consume el cuerpo completo (incluido el
+    stream SSE).
+    """
+    def send(payload):
+        request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = response.read()
+                header = response.headers.get("Server-Timing")
+                failed = parse_failed_stage(header)
+                if b"event: error" in body:
+                    error = "stream_error"
+                else:
+                    error = "degraded" if failed else None
+                return response.status, error, parse_server_timing(header), failed
+        except urllib.error.HTTPError as e:
+            header = e.headers.get("Server-Timing")
+            return e.code, f"http_{e.code // 100}xx", parse_server_timing(header), parse_failed_stage(header)
+        except (socket.timeout, TimeoutError):
+            return None, "timeout", {}, None
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, (socket.timeout, TimeoutError)):
+                return None, "timeout", {}, None
+            return None, "connection", {}, None
+        except OSError:
+            return None, "connection", {}, None
+    return send
+
+
+def error_stage(error: str, failed) -> str:
+    """Etapa a la que se atribuye un error: la informada por el servidor o una según el tipo."""
+    if failed:
+        return failed
+    if error in ("timeout", "connection"):
+        return "transport"
+    if error == "stream_error":
+        return "stream"
+    return "unknown"
+
+
+def run_load(send, payloads, rps: float, duration: float, concurrency: int, clock=time.perf_counter):
+    """
+    Programa `rps * duration` pedidos a intervalos regulares y los ejecuta en un
+    pool de `concurrency` hilos. Retorna (resultados, segundos transcurridos);
+    cada resultado es un dict con latency (s), status, error, stages y, si hubo
+    error, la etapa donde ocurrió (stage).
+    """
+    total = int(rps * duration)
+    results = []
+    lock = threading.Lock()
+    start = clock()
+
+    def execute(scheduled_at, payload):
+        status, error, stages, failed = send(payload)
+        # La latencia se mide desde el instante programado, no desde el envío real.
+        result = {"latency": clock() - scheduled_at, "status": status, "error": error, "stages": stages,
+                  "stage": error_stage(error, failed) if error is not None else None}
+        with lock:
+            results.append(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as executor:
+        for index in range(total):
+            scheduled_at = start + index / rps
+            delay = scheduled_at - clock()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(execute, scheduled_at, next(payloads))
+    return results, clock() - start
+
+
+def percentiles(values) -> dict:
+    """p50/p95/p99 y máximo, en milisegundos, de una serie de valores en milisegundos."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+    def percentile(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+def summarize(results, elapsed: float) -> dict:
+    """
+    Throughput, latencias totales, errores por tipo y, por etapa, las latencias
+    de los pedidos exitosos junto con la cantidad de errores ocurridos en ella y
+    su tasa sobre el total de pedidos.
+    """
+    succeeded = [result for result in results if result["error"] is None]
+    errors = {}
+    stage_errors = {}
+    for result in results:
+        if result["error"] is not None:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+            stage_errors[result["stage"]] = stage_errors.get(result["stage"], 0) + 1
+
+    stage_names = sorted({name for result in succeeded for name in result["stages"]} | set(stage_errors))
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(succeeded) / elapsed, 2) if elapsed else None,
+        "error_rate": round(1 - len(succeeded) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "latency": percentiles([result["latency"] * 1000 for result in succeeded]),
+        "stages": {
+            name: {
+                **percentiles([result["stages"][name] for result in succeeded if name in result["stages"]]),
+                "errors": stage_errors.get(name, 0),
+                "error_rate": round(stage_errors.get(name, 0) / len(results), 4),
+            }
+            for name in stage_names
+        },
+    }
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000/receive-data", help="Endpoint a probar.")
+    parser.add_argument("--rps", type=float, default=10, help="Pedidos por segundo programados.")
+    parser.add_argument("--duration", type=float, default=30, help="Duración de la carga en segundos.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Pedidos simultáneos máximos.")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout por pedido en segundos.")
+    parser.add_argument("--users", type=int, default=50, help="Usuarios distintos simulados.")
+    parser.add_argument("--stream", action="store_true", help="Pide las respuestas en streaming (SSE).")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Archivo JSON de resultados.")
+    parser.add_argument("--log-level", default="WARNING",
+                        help="Nivel del logger de la aplicación durante la medición.")
+    args = parser.parse_args(argv)
+
+    LoggerConfigurator().configure().setLevel(args.log_level)
+    rnd = random.Random(args.seed)
+    payloads = iter(lambda: build_payload(rnd, args.users, args.stream), None)
+    results, elapsed = run_load(http_sender(args.url, args.timeout), payloads,
+                                args.rps, args.duration, args.concurrency)
+
+    report = {
+        "benchmark": "receive_data_load",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "url": args.url,
+        "target_rps": args.rps,
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "stream": args.stream,
+        "summary": summarize(results, elapsed),
+    }
+    summary = report["summary"]
+    print(f"{summary['throughput_per_s']} req/s | p50 {summary['latency']['p50_ms']} ms | "
+          f"p99 {summary['latency']['p99_ms']} ms | errores {summary['errors']}", file=sys.stderr)
+    for name, stats in summary["stages"].items():
+        print(f"  {name}: p50 {stats['p50_ms']} ms | p99 {stats['p99_ms']} ms | "
+              f"errores {stats['errors']} ({stats['error_rate']:.2%})", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
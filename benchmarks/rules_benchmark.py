@@ -0,0 +1,295 @@
+"""
+Path: benchmarks/rules_benchmark.py
+Benchmark de BusinessRulesEngine sobre conjuntos de reglas sintéticos en español.
+
+Genera reglas de 10 a 100k palabras clave y cargas de mensajes con una mezcla
+conocida de aciertos exactos, errores tipográficos y fallos. Mide p50/p99,
+throughput y memoria por capa de coincidencia y por estrategia del motor,
+y escribe los resultados en JSON para comparar entre commits.
+
+Uso:
+    python -m benchmarks.rules_benchmark --sizes 10 1000 100000 --output bench_rules.json
+    python -m benchmarks.rules_benchmark --compare bench_rules.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from utils.logging.logger_configurator import LoggerConfigurator
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+_SYLLABLES = [
+    "ba", "ca", "da", "fa", "ga", "la", "ma", "na", "pa", "ra", "sa", "ta", "be", "ce", "de",
+    "le", "me", "ne", "pe", "re", "se", "te", "bi", "ci", "di", "li", "mi", "ni", "pi", "ri",
+    "si", "ti", "bo", "co", "do", "lo", "mo", "no", "po", "ro", "so", "to", "bu", "cu", "du",
+    "lu", "mu", "nu", "pu", "ru", "su", "tu", "que", "qui", "gue", "cha", "che", "chi", "cho",
+    "ña", "ño", "es", "en", "al", "el", "or", "ar", "ción", "más", "qué", "cuál", "está",
+]
+_SEED_WORDS = [
+    "hola", "precio", "stock", "factura", "cliente", "pedido", "envío", "pago", "cuenta",
+    "banco", "tasa", "interés", "crédito", "flujo", "fondos", "descuento", "inventario",
+    "producto", "materia", "prima", "cuánto", "cuesta", "dónde", "cómo", "puedo", "quiero",
+]
+
+
+def build_vocabulary(rnd: random.Random, size: int = 6000):
+    """Vocabulario de palabras con fonotáctica aproximada del español."""
+    words = set(_SEED_WORDS)
+    while len(words) < size:
+        words.add("".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(1, 4))))
+    return sorted(words)
+
+
+def generate_rules(rnd: random.Random, vocabulary, keyword_count: int, keywords_per_rule: int = 4):
+    """Genera un documento rules.json con `keyword_count` palabras clave únicas."""
+    keywords = set()
+    while len(keywords) < keyword_count:
+        keywords.add(" ".join(rnd.choice(vocabulary) for _ in range(rnd.randint(1, 4))))
+    keywords = sorted(keywords)
+    rnd.shuffle(keywords)
+    rules = []
+    for start in range(0, len(keywords), keywords_per_rule):
+        rules.append({
+            "keywords": keywords[start:start + keywords_per_rule],
+            "response": f"Respuesta sintética {len(rules)}"
+        })
+    return {"rules": rules}, keywords
+
+
+def add_typo(rnd: random.Random, text: str, edits: int = 1) -> str:
+    """Aplica `edits` sustituciones, inserciones o borrados de un carácter."""
+    chars = list(text)
+    for _ in range(edits):
+        position = rnd.randrange(len(chars)) if chars else 0
+        operation = rnd.choice(("sub", "ins", "del")) if len(chars) > 1 else "ins"
+        letter = rnd.choice("aeiosrnltdc")
+        if operation == "sub":
+            chars[position] = letter
+        elif operation == "ins":
+            chars.insert(position, letter)
+        else:
+            del chars[position]
+    return "".join(chars)
+
+
+def generate_workload(rnd: random.Random, vocabulary, keywords, count: int, mix):
+    """
+    Mensajes con la mezcla (exact, typo, miss) indicada, p. ej. (0.5, 0.3, 0.2).
+    Retorna una lista de tuplas (tipo, mensaje).
+    """
+    kinds = rnd.choices(("exact", "typo", "miss"), weights=mix, k=count)
+    workload = []
+    for kind in kinds:
+        if kind == "exact":
+            message = rnd.choice(keywords)
+        elif kind == "typo":
+            message = add_typo(rnd, rnd.choice(keywords), rnd.randint(1, 2))
+        else:
+            message = " ".join(rnd.choice(vocabulary) for _ in range(rnd.randint(5, 9)))
+        workload.append((kind, message))
+    return workload
+
+
+def summarize(latencies_ns, total_seconds):
+    """Percentiles (en microsegundos) y throughput de una serie de latencias."""
+    ordered = sorted(latencies_ns)
+    count = len(ordered)
+
+    def percentile(fraction):
+        return ordered[min(count - 1, int(fraction * count))] / 1000.0
+
+    return {
+        "count": count,
+        "p50_us": round(percentile(0.50), 3),
+        "p99_us": round(percentile(0.99), 3),
+        "max_us": round(ordered[-1] / 1000.0, 3),
+        "throughput_per_s": round(count / total_seconds, 1) if total_seconds else None,
+    }
+
+
+def time_calls(function, messages):
+    """Ejecuta `function` sobre cada mensaje y resume las latencias."""
+    latencies = []
+    started = time.perf_counter()
+    for message in messages:
+        begin = time.perf_counter_ns()
+        function(message)
+        latencies.append(time.perf_counter_ns() - begin)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def build_engine(rules_path: str, strategy: str, match_mode: str):
+    """Construye un motor sin caché de resultados y mide su memoria y tiempo de carga."""
+    config = {
+        "RULE_SOURCE": "json",
+        "RULES_JSON_PATH": rules_path,
+        "RULE_CACHE_SIZE": 0,
+        "RULE_MATCHING_STRATEGY": strategy,
+        "RULE_MATCH_MODE": match_mode,
+    }
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    engine = BusinessRulesEngine(config=config)
+    build_seconds = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return engine, {
+        "build_s": round(build_seconds, 3),
+        "retained_mb": round(retained / 2 ** 20, 2),
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+ENGINE_VARIANTS = {
+    "cascade": ("cascade", "whole"),
+    "cascade+phrase": ("cascade", "phrase"),
+    "tfidf": ("tfidf", "whole"),
+}
+
+
+def benchmark_size(rnd, vocabulary, size, messages, mix, variants, workdir):
+    """Mide todas las variantes del motor y sus capas para un tamaño de reglas."""
+    document, keywords = generate_rules(rnd, vocabulary, size)
+    rules_path = os.path.join(workdir, f"rules_{size}.json")
+    with open(rules_path, "w", encoding="utf-8") as file:
+        json.dump(document, file, ensure_ascii=False)
+
+    workload = generate_workload(rnd, vocabulary, keywords, messages, mix)
+    all_messages = [message for _, message in workload]
+    result = {"keywords": size, "messages": messages, "engines": {}}
+
+    for variant in variants:
+        strategy, match_mode = ENGINE_VARIANTS[variant]
+        engine, memory = build_engine(rules_path, strategy, match_mode)
+        normalized = [engine._normalize_text(message) for message in all_messages]  # pylint: disable=protected-access
+        index = engine.index
+
+        answered = sum(1 for message in all_messages if engine.get_response(message) is not None)
+        entry = {
+            "memory": memory,
+            "hit_rate": round(answered / len(all_messages), 4),
+            "get_response": time_calls(engine.get_response, all_messages),
+            "by_message_kind": {
+                kind: time_calls(engine.get_response, [m for k, m in workload if k == kind])
+                for kind in ("exact", "typo", "miss")
+                if any(k == kind for k, _ in workload)
+            },
+            "tiers": {},
+        }
+        if index.tfidf_matcher is not None:
+            entry["tiers"]["tfidf"] = time_calls(index.tfidf_matcher.best_match, normalized)
+        else:
+            entry["tiers"]["ratio"] = time_calls(index.closest_by_ratio, normalized)
+            entry["tiers"]["levenshtein"] = time_calls(index.closest_by_distance, normalized)
+        if index.phrase_matcher is not None:
+            entry["tiers"]["phrase"] = time_calls(index.phrase_matcher.match, normalized)
+        result["engines"][variant] = entry
+        print(f"  {size:>7} palabras clave | {variant:<15} | "
+              f"p50 {entry['get_response']['p50_us']:>10} µs | p99 {entry['get_response']['p99_us']:>10} µs | "
+              f"{entry['memory']['retained_mb']} MB", file=sys.stderr)
+    return result
+
+
+def git_revision():
+    """Commit actual, para asociar los resultados a una versión del código."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """
+    Compara p50/p99 de get_response entre dos ejecuciones.
+    Retorna la lista de regresiones mayores a `threshold` (fracción).
+    """
+    regressions = []
+    baseline_sizes = {entry["keywords"]: entry for entry in baseline["results"]}
+    for entry in current["results"]:
+        previous = baseline_sizes.get(entry["keywords"])
+        if not previous:
+            continue
+        for variant, stats in entry["engines"].items():
+            old = previous["engines"].get(variant)
+            if not old:
+                continue
+            for metric in ("p50_us", "p99_us"):
+                before, after = old["get_response"][metric], stats["get_response"][metric]
+                change = (after - before) / before if before else 0.0
+                print(f"{entry['keywords']:>7} {variant:<15} {metric}: {before} → {after} ({change:+.1%})")
+                if change > threshold:
+                    regressions.append((entry["keywords"], variant, metric, change))
+    return regressions
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Cantidades de palabras clave a medir.")
+    parser.add_argument("--messages", type=int, default=2000, help="Mensajes por carga de trabajo.")
+    parser.add_argument("--mix", type=float, nargs=3, default=(0.4, 0.3, 0.3),
+                        metavar=("EXACT", "TYPO", "MISS"), help="Proporción de cada tipo de mensaje.")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINE_VARIANTS), choices=list(ENGINE_VARIANTS))
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Archivo JSON de resultados.")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para detectar regresiones.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Regresión tolerada en --compare (fracción, por defecto 0.2).")
+    parser.add_argument("--log-level", default="WARNING",
+                        help="Nivel del logger de la aplicación durante la medición.")
+    args = parser.parse_args(argv)
+
+    # Se mide la coincidencia, no la escritura de logs en consola.
+    LoggerConfigurator().configure().setLevel(args.log_level)
+    if "tfidf" in args.engines:
+        # Importar NumPy/SciPy antes de medir, para no atribuir su carga al índice.
+        import app.components.services.business.tfidf_matcher  # pylint: disable=import-outside-toplevel,unused-import
+
+    rnd = random.Random(args.seed)
+    vocabulary = build_vocabulary(rnd)
+    report = {
+        "benchmark": "business_rules_engine",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "mix": dict(zip(("exact", "typo", "miss"), args.mix)),
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            report["results"].append(
+                benchmark_size(rnd, vocabulary, size, args.messages, args.mix, args.engines, workdir))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regresiones por encima de {args.threshold:.0%}.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
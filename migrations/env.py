@@ -0,0 +1,112 @@
+"""
+Path: migrations/env.py
+Entorno de Alembic para Flask-Migrate: toma el engine y la metadata de la aplicación.
+"""
+
+import logging
+from logging.config import fileConfig
+
+from flask import current_app
+from alembic import context
+
+from app import models  # noqa: F401  pylint: disable=unused-import  (registra los modelos en la metadata)
+
+config = context.config
+
+fileConfig(config.config_file_name)
+logger = logging.getLogger('alembic.env')
+
+
+def get_engine():
+    """Engine de Flask-SQLAlchemy de la aplicación en curso."""
+    return current_app.extensions['migrate'].db.engine
+
+
+def get_engine_url():
+    """URL del engine, con la contraseña visible y los % escapados para ConfigParser."""
+    return get_engine().url.render_as_string(hide_password=False).replace('%', '%%')
+
+
+config.set_main_option('sqlalchemy.url', get_engine_url())
+target_db = current_app.extensions['migrate'].db
+
+
+def get_metadata():
+    """Metadata de los modelos, para `flask db migrate`."""
+    return target_db.metadata
+
+
+# En MySQL/MariaDB la 0003 particiona `conversations`: quita la clave foránea a
+# users, hace created_at NOT NULL y lleva la clave primaria a (id, created_at).
+# Los modelos describen el esquema portable, así que `flask db migrate` no debe
+# proponer revertir esas diferencias (Alembic no compara claves primarias).
+_PARTITIONED_DIALECTS = ('mysql', 'mariadb')
+
+
+def include_object(object_, name, type_, reflected, compare_to):  # pylint: disable=unused-argument
+    """Omite la clave foránea conversations → users en los motores con particiones."""
+    if type_ == 'foreign_key_constraint' and object_.table.name == 'conversations' \
+            and get_engine().dialect.name in _PARTITIONED_DIALECTS:
+        return False
+    return True
+
+
+def _drop_partitioning_diffs(context, upgrade_ops):
+    """Quita el cambio de nulabilidad de conversations.created_at en los motores con particiones."""
+    if context.dialect.name not in _PARTITIONED_DIALECTS:
+        return
+    for table_ops in list(upgrade_ops.ops):
+        if getattr(table_ops, 'table_name', None) != 'conversations' or not hasattr(table_ops, 'ops'):
+            continue
+        for alter in list(table_ops.ops):
+            if getattr(alter, 'column_name', None) == 'created_at' and alter.modify_nullable is not None:
+                alter.modify_nullable = None
+                if not alter.has_changes():
+                    table_ops.ops.remove(alter)
+        if not table_ops.ops:
+            upgrade_ops.ops.remove(table_ops)
+
+
+def run_migrations_offline():
+    """Genera el SQL de las migraciones sin conectarse (`flask db upgrade --sql`)."""
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(url=url, target_metadata=get_metadata(), literal_binds=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica las migraciones sobre la base de datos de la aplicación."""
+
+    def process_revision_directives(context, revision, directives):  # pylint: disable=redefined-outer-name,unused-argument
+        # No genera migraciones vacías con `flask db migrate`.
+        if getattr(config.cmd_opts, 'autogenerate', False):
+            script = directives[0]
+            _drop_partitioning_diffs(context, script.upgrade_ops)
+            if script.upgrade_ops.is_empty():
+                directives[:] = []
+                logger.info('No se detectaron cambios en el esquema.')
+
+    conf_args = current_app.extensions['migrate'].configure_args
+    if conf_args.get("process_revision_directives") is None:
+        conf_args["process_revision_directives"] = process_revision_directives
+
+    connectable = get_engine()
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=get_metadata(),
+            include_object=include_object,
+            **conf_args
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
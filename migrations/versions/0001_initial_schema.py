@@ -0,0 +1,55 @@
+"""Esquema inicial: users y conversations (el que creaba db.create_all()).
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 16:00:00
+
+Las bases de datos creadas antes por db.create_all() ya tienen estas tablas:
+la migración las deja como están, así `flask db upgrade` sirve para ambas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_id', sa.String(length=255), nullable=False),
+            sa.Column('user_name', sa.String(length=255), nullable=True),
+            sa.Column('user_email', sa.String(length=255), nullable=True),
+            sa.Column('user_agent', sa.String(length=512), nullable=True),
+            sa.Column('screen_resolution', sa.String(length=50), nullable=True),
+            sa.Column('language', sa.String(length=10), nullable=True),
+            sa.Column('platform', sa.String(length=50), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id')
+        )
+    if not _has_table('conversations'):
+        op.create_table(
+            'conversations',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_id', sa.String(length=255), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('response', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.user_id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('conversations')
+    op.drop_table('users')
@@ -0,0 +1,28 @@
+"""Índice compuesto conversations(user_id, created_at) para el historial por usuario.
+
+Revision ID: 0002_conversation_history_index
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 16:00:00
+
+get_conversations_by_user filtra por user_id y ordena por created_at DESC con
+LIMIT: con este índice el motor lee solo las últimas filas del usuario, sin
+ordenar. Se crea en línea (sin bloquear escrituras) con app/utils/online_ddl.py.
+"""
+from alembic import op
+
+from app.utils.online_ddl import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_conversation_history_index'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_online(op, 'ix_conversations_user_id_created_at', 'conversations', ['user_id', 'created_at'])
+
+
+def downgrade():
+    drop_index_online(op, 'ix_conversations_user_id_created_at', 'conversations')
@@ -0,0 +1,86 @@
+"""Particiones mensuales de conversations en MySQL/MariaDB.
+
+Revision ID: 0003_partition_conversations_by_month
+Revises: 0002_conversation_history_index
+Create Date: 2026-10-18 17:00:00
+
+PARTITION BY RANGE (TO_DAYS(created_at)), una partición pAAAAMM por mes desde el
+mes de la conversación más antigua hasta tres meses adelante, más `pmax`. Las
+particiones siguientes las crea archive_conversations.py, que también archiva y
+elimina (DROP PARTITION) los meses vencidos.
+
+Requisitos de MySQL para particionar:
+- La columna de partición debe estar en todas las claves únicas: la clave
+  primaria pasa a ser (id, created_at) y created_at deja de admitir NULL.
+- Las tablas particionadas no admiten claves foráneas: se elimina la de
+  user_id → users.user_id. La integridad la mantiene la aplicación: guarda el
+  usuario y la conversación en la misma transacción y, cuando omite el upsert
+  del usuario, solo inserta la conversación si el usuario existe
+  (ConversationRepository.save_interaction / save_interactions).
+- migrations/env.py hace que `flask db migrate` ignore estas diferencias con
+  los modelos, que describen el esquema portable.
+
+A diferencia de la 0002, reparticionar copia la tabla y bloquea las escrituras
+mientras dura: en tablas grandes, aplicarla en una ventana de mantenimiento o
+con una herramienta de cambios en línea (pt-online-schema-change, gh-ost).
+En otros motores no hace nada: las conversaciones se archivan por rango de fechas.
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.components.services.archive.partitions import add_months, month_start
+from app.components.services.archive.archive_impl.mysql_partitions import MAXVALUE_PARTITION, partition_definition
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_partition_conversations_by_month'
+down_revision = '0002_conversation_history_index'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _is_mysql():
+    return op.get_context().dialect.name in ('mysql', 'mariadb')
+
+
+def _user_foreign_keys():
+    if op.get_context().as_sql:
+        return []
+    return [foreign_key['name'] for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys('conversations')
+            if foreign_key['referred_table'] == 'users']
+
+
+def upgrade():
+    if not _is_mysql():
+        return
+    for name in _user_foreign_keys():
+        op.execute(f"ALTER TABLE conversations DROP FOREIGN KEY {name}")
+    op.execute("UPDATE conversations SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("ALTER TABLE conversations MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+               "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+
+    current = month_start(datetime.date.today())
+    first = current
+    if not op.get_context().as_sql:
+        oldest = op.get_bind().execute(sa.text("SELECT MIN(created_at) FROM conversations")).scalar()
+        if oldest is not None:
+            first = min(first, month_start(oldest))
+    definitions, month = [], first
+    while month <= add_months(current, MONTHS_AHEAD):
+        definitions.append(partition_definition(month))
+        month = add_months(month, 1)
+    op.execute(f"ALTER TABLE conversations PARTITION BY RANGE (TO_DAYS(created_at)) "
+               f"({', '.join(definitions + [MAXVALUE_PARTITION])})")
+
+
+def downgrade():
+    if not _is_mysql():
+        return
+    op.execute("ALTER TABLE conversations REMOVE PARTITIONING")
+    op.execute("ALTER TABLE conversations DROP PRIMARY KEY, ADD PRIMARY KEY (id), "
+               "MODIFY created_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP")
+    op.create_foreign_key(None, 'conversations', 'users', ['user_id'], ['user_id'])
@@ -5,6 +5,11 @@ Punto de entrada para iniciar la aplicación Flask.
 
 from app.core.run import ServerLauncher
 
+def create_app():
+    """Fábrica de la aplicación para la CLI de Flask, p. ej. `flask --app run:create_app db upgrade`."""
+    from app.core.config import FlaskConfig  # pylint: disable=import-outside-toplevel
+    return FlaskConfig().create_app()
+
 if __name__ == '__main__':
     server = ServerLauncher()
     server.register_blueprints()
@@ -0,0 +1,166 @@
+"""
+Path: tests/test_async_llm.py
+
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+import pytest
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.llm.llm_client import IAsyncLLMClient, IBaseLLMClient
+from app.components.services.llm.llm_impl import deep_seek_llm
+from app.components.services.llm.llm_impl.gemini_llm import GeminiLLMClient
+from app.components.services.response.response_generator import ResponseGenerator
+from app.components.services.session.chat_session_manager import ChatSessionManager
+
+class SlowAsyncLLM(IAsyncLLMClient, IBaseLLMClient):
+    " Cliente asyncio simulado que tarda `delay` segundos por respuesta. "
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    def send_message(self, message, history=None):
+        raise AssertionError("No debería usarse la versión síncrona.")
+
+    async def send_message_async(self, message, history=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"R{len(history or [])}: {message}"
+
+    async def send_message_streaming_async(self, message, history=None):
+        self.calls += 1
+        for word in message.split():
+            await asyncio.sleep(0)
+            yield word + " "
+
+@pytest.fixture
+def make_generator(monkeypatch):
+    " Fixture que crea ResponseGenerator con reglas simuladas y el cliente indicado. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    return lambda llm, **kwargs: ResponseGenerator(llm, rules_engine=rules, **kwargs)
+
+def test_many_generations_run_concurrently(make_generator):
+    " Prueba que cientos de generaciones comparten un único hilo sin ejecutarse en serie. "
+    llm = SlowAsyncLLM(delay=0.05)
+    generator = make_generator(llm)
+
+    async def run():
+        return await asyncio.gather(*(generator.generate_response_async(f"pregunta {number}")
+                                      for number in range(200)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(run())
+    assert time.perf_counter() - start < 2  # en serie tardaría 10 s
+    assert responses[7] == "R0: pregunta 7"
+    assert llm.calls == 200
+
+def test_identical_async_requests_are_coalesced(make_generator):
+    " Prueba que las corrutinas concurrentes con la misma consulta comparten una llamada. "
+    llm = SlowAsyncLLM()
+    generator = make_generator(llm)
+
+    async def run():
+        return await asyncio.gather(*(generator.generate_response_async("Precio del cartón")
+                                      for _ in range(20)))
+
+    assert set(asyncio.run(run())) == {"R0: Precio del cartón"}
+    assert llm.calls == 1
+
+def test_async_streaming_updates_user_session(make_generator):
+    " Prueba el streaming asíncrono y el registro del turno en la sesión del usuario. "
+    generator = make_generator(SlowAsyncLLM(), session_manager=ChatSessionManager())
+
+    async def run():
+        return [chunk async for chunk in generator.generate_response_streaming_async("hola mundo", "u1")]
+
+    assert asyncio.run(run()) == ["hola ", "mundo "]
+    with generator.session_manager.session("u1") as chat_session:
+        assert chat_session.turns == [("hola mundo", "hola mundo ")]
+
+def test_session_access_runs_off_the_event_loop(make_generator):
+    " Prueba que leer el historial y guardar el turno no bloquean el hilo del event loop. "
+    manager = ChatSessionManager()
+    session_threads = []
+    session = manager.session
+
+    def tracked_session(user_id):
+        session_threads.append(threading.get_ident())
+        return session(user_id)
+
+    manager.session = tracked_session
+    generator = make_generator(SlowAsyncLLM(), session_manager=manager)
+
+    async def run():
+        return threading.get_ident(), await generator.generate_response_async("hola", "u1")
+
+    loop_thread, response = asyncio.run(run())
+    assert response == "R0: hola"
+    assert len(session_threads) == 2 and loop_thread not in session_threads
+
+def test_async_streaming_answers_from_business_rules(make_generator):
+    " Prueba que el streaming asíncrono responde con la regla de negocio sin llamar al LLM. "
+    llm = SlowAsyncLLM()
+    generator = make_generator(llm, session_manager=ChatSessionManager())
+    generator.rules_engine.get_response.return_value = "Horario: 9 a 18 h."
+
+    async def run():
+        return [chunk async for chunk in generator.generate_response_streaming_async("horario", "u1")]
+
+    assert asyncio.run(run()) == ["Horario: 9 a 18 h."]
+    assert llm.calls == 0
+    with generator.session_manager.session("u1") as chat_session:
+        assert chat_session.turns == [("horario", "Horario: 9 a 18 h.")]
+
+def test_sync_client_falls_back_to_thread(make_generator):
+    " Prueba que un cliente solo síncrono también funciona desde el camino asyncio. "
+    llm = Mock(spec=IBaseLLMClient)
+    llm.send_message.return_value = "sincrónica"
+    generator = make_generator(llm)
+    assert asyncio.run(generator.generate_response_async("hola")) == "sincrónica"
+
+def test_gemini_async_message():
+    " Prueba el envío asíncrono de Gemini con historial. "
+    client = GeminiLLMClient(api_key="fake_key", system_instruction="system_instruction")
+    client.model = Mock()
+    chat = client.model.start_chat.return_value
+    chat.send_message_async = AsyncMock(return_value=Mock(text="Hola async"))
+    assert asyncio.run(client.send_message_async("hola", history=[("user", "a"), ("model", "b")])) == "Hola async"
+    chat.send_message_async.assert_awaited_once_with("hola")
+
+def test_sdk_timeouts_are_passed_to_the_providers(monkeypatch):
+    " Prueba que el timeout por llamada llega a los SDK de Gemini (request_options) y DeepSeek. "
+    client = GeminiLLMClient(api_key="fake_key", system_instruction="system_instruction", request_timeout=7)
+    client.model = Mock()
+    chat = client.model.start_chat.return_value
+    chat.send_message_async = AsyncMock(return_value=Mock(text="Hola async"))
+    asyncio.run(client.send_message_async("hola"))
+    chat.send_message_async.assert_awaited_once_with("hola", request_options={"timeout": 7})
+
+    monkeypatch.setattr(deep_seek_llm, "api_key", "fake_key")
+    client = deep_seek_llm.DeepSeekLLMClient(request_timeout=7)
+    assert client.client.timeout == 7 and client.client.max_retries == 0
+    assert client.async_client.timeout == 7
+
+def test_deepseek_async_streaming(monkeypatch):
+    " Prueba el streaming asíncrono de DeepSeek con el cliente OpenAI simulado. "
+    monkeypatch.setattr(deep_seek_llm, "api_key", "fake_key")
+    client = deep_seek_llm.DeepSeekLLMClient()
+
+    async def chunks():
+        for text in ["Hola", None, " mundo"]:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    client.async_client = Mock()
+    client.async_client.chat.completions.create = AsyncMock(return_value=chunks())
+
+    async def run():
+        return [chunk async for chunk in client.send_message_streaming_async("hola", [("model", "previo")])]
+
+    assert asyncio.run(run()) == ["Hola", " mundo"]
+    messages = client.async_client.chat.completions.create.call_args.kwargs["messages"]
+    assert messages[1:] == [{"role": "assistant", "content": "previo"}, {"role": "user", "content": "hola"}]
@@ -0,0 +1,99 @@
+"""
+Path: tests/test_batch_processor.py
+
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+from flask import Flask
+from app.components.services.response.batch_processor import BatchProcessor
+from app.components.services.response.batch_runner import run_jsonl
+from app.utils.response import render_ndjson_response
+
+class SlowGenerator:
+    " Generador de respuestas simulado: las reglas responden 'hola' y el LLM demora. "
+    def __init__(self, fail_on=None):
+        self.rules_engine = Mock()
+        self.rules_engine.get_response.side_effect = lambda prompt: "¡Hola!" if prompt == "hola" else None
+        self.fail_on = fail_on
+        self.active = 0
+        self.max_active = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_response(self, prompt, user_id=None):
+        if prompt == "hola":
+            return "¡Hola!"
+        with self._lock:
+            self.calls.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02 if prompt.endswith("0") else 0.005)
+        with self._lock:
+            self.active -= 1
+        if prompt == self.fail_on:
+            raise RuntimeError("LLM caído")
+        return f"R: {prompt}"
+
+def test_batch_results_keep_input_order_with_bounded_concurrency():
+    " Prueba el orden de salida, la concurrencia acotada y los errores por consulta. "
+    generator = SlowGenerator(fail_on="p3")
+    items = [{"id": number, "prompt": "hola" if number % 5 == 0 else f"p{number}"} for number in range(20)]
+    results = list(BatchProcessor(generator, max_concurrency=3).process(items))
+    assert [result["index"] for result in results] == list(range(20))
+    assert results[0] == {"index": 0, "id": 0, "source": "rules", "response": "¡Hola!"}
+    assert results[1]["response"] == "R: p1"
+    assert results[3]["error"] == "LLM caído"
+    assert generator.max_active <= 3
+
+def test_batch_stops_when_consumer_leaves():
+    " Prueba que abandonar el lote no procesa las consultas que faltaban. "
+    generator = SlowGenerator()
+    results = BatchProcessor(generator, max_concurrency=2, max_pending=2).process(
+        {"prompt": f"p{number}"} for number in range(1000))
+    next(results)
+    results.close()
+    time.sleep(0.05)
+    assert len(generator.calls) < 10
+
+def test_jsonl_runner_resumes_from_checkpoint(tmp_path):
+    " Prueba que una corrida interrumpida se retoma sin repetir ni perder consultas. "
+    source = tmp_path / "prompts.jsonl"
+    output = tmp_path / "respuestas.jsonl"
+    lines = [json.dumps({"id": number, "prompt_user": f"p{number}"}) for number in range(10)]
+    source.write_text("\n".join(lines[:4] + ["no es json"] + lines[4:]) + "\n", encoding="utf-8")
+
+    generator = SlowGenerator(fail_on="p7")
+    interrupted = BatchProcessor(generator, max_concurrency=2)
+    original_process = interrupted.process
+
+    def process_until_interrupted(items):
+        for count, result in enumerate(original_process(items)):
+            if count == 6:
+                raise KeyboardInterrupt
+            yield result
+
+    interrupted.process = process_until_interrupted
+    with pytest.raises(KeyboardInterrupt):
+        run_jsonl(interrupted, str(source), str(output), checkpoint_every=4)
+    assert (tmp_path / "respuestas.jsonl.checkpoint").exists()
+
+    checkpoint = run_jsonl(BatchProcessor(generator, max_concurrency=2), str(source), str(output),
+                           checkpoint_every=4)
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [result["index"] for result in results] == list(range(11))
+    assert [result.get("id") for result in results] == [0, 1, 2, 3, None, 4, 5, 6, 7, 8, 9]
+    assert "JSON inválido" in results[4]["error"]
+    assert checkpoint["done"] == 11 and checkpoint["errors"] == 2
+    assert not (tmp_path / "respuestas.jsonl.checkpoint").exists()
+
+def test_render_ndjson_response():
+    " Prueba que la respuesta NDJSON envía un objeto JSON por línea. "
+    with Flask(__name__).test_request_context():
+        response = render_ndjson_response(iter([{"index": 0, "response": "¡Hola!"}, {"index": 1}]))
+        assert response.mimetype == "application/x-ndjson"
+        body = response.get_data(as_text=True)
+    assert [json.loads(line) for line in body.splitlines()] == [{"index": 0, "response": "¡Hola!"}, {"index": 1}]
@@ -0,0 +1,160 @@
+"""
+Path: tests/test_business_rules_engine.py
+
+"""
+
+import json
+import os
+import random
+from difflib import get_close_matches
+import pytest
+from Levenshtein import distance as levenshtein_distance
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.business.rule_index import RuleIndex
+from app.components.services.business.phrase_matcher import PhraseMatcher
+
+@pytest.fixture
+def rules_path(tmp_path):
+    " Fixture que escribe un rules.json temporal. "
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "rules": [
+            {"keywords": ["hola", "holis"], "response": "¡Hola!"},
+            {"keywords": ["quién eres", "quien sos"], "response": "Soy un asistente."},
+            {"keywords": ["qué puedes hacer"], "response": "Puedo ayudarte."}
+        ]
+    }), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def engine(rules_path):
+    " Fixture con un motor configurado desde el JSON temporal. "
+    return BusinessRulesEngine(config={"RULE_SOURCE": "json", "RULES_JSON_PATH": str(rules_path)})
+
+def test_exact_match(engine):
+    " Prueba de coincidencia exacta tras normalizar. "
+    assert engine.get_response("¡HOLA!") == "¡Hola!"
+
+def test_typo_match(engine):
+    " Prueba de coincidencia aproximada con errores tipográficos. "
+    assert engine.get_response("quien ers") == "Soy un asistente."
+    assert engine.get_response("que pudes hacer") == "Puedo ayudarte."
+
+def test_no_match(engine):
+    " Prueba de mensaje sin regla asociada. "
+    assert engine.get_response("explicame el flujo de fondos descontado") is None
+
+def _reference_lookup(rules, text):
+    " Implementación lineal original, usada como referencia. "
+    if text in rules:
+        return text
+    close = get_close_matches(text, rules.keys(), n=1, cutoff=0.7)
+    if close:
+        return close[0]
+    best, best_distance = None, float("inf")
+    for keyword in rules:
+        distance = levenshtein_distance(text, keyword)
+        if distance < best_distance and distance <= 2:
+            best, best_distance = keyword, distance
+    return best
+
+def test_index_matches_linear_reference():
+    " Prueba que el índice devuelve lo mismo que la búsqueda lineal original. "
+    rnd = random.Random(7)
+    alphabet = "abcdeilmnorstuáé "
+    keywords = {"".join(rnd.choice(alphabet) for _ in range(rnd.randint(3, 14))).strip() for _ in range(400)}
+    rules = {keyword: keyword.upper() for keyword in keywords if keyword}
+    index = RuleIndex(rules)
+
+    for keyword in list(rules)[:200]:
+        chars = list(keyword)
+        for _ in range(rnd.randint(1, 2)):
+            chars[rnd.randrange(len(chars))] = rnd.choice(alphabet)
+        query = "".join(chars)
+        match = index.lookup(query)
+        assert (match[0] if match else None) == _reference_lookup(rules, query)
+
+def test_levenshtein_tier_is_exact():
+    " Prueba que la capa de Levenshtein encuentra todas las palabras a distancia <= 2. "
+    rnd = random.Random(11)
+    keywords = ["".join(rnd.choice("abcdefgh") for _ in range(rnd.randint(4, 12))) for _ in range(300)]
+    rules = {keyword: keyword for keyword in keywords}
+    index = RuleIndex(rules)
+    for keyword in keywords[:100]:
+        query = keyword[1:] + rnd.choice("xyz")
+        expected = min(
+            ((levenshtein_distance(query, k), i, k) for i, k in enumerate(rules)
+             if levenshtein_distance(query, k) <= 2),
+            default=None
+        )
+        result = index.closest_by_distance(query)
+        assert result == (expected[2] if expected else None)
+
+def test_result_cache_stores_hits_and_misses(engine):
+    " Prueba que la caché guarda aciertos y fallos, y cuenta ambos. "
+    engine.get_response("hola")
+    engine.get_response("Hola!!")
+    engine.get_response("algo sin regla")
+    engine.get_response("algo sin regla")
+    stats = engine.cache_stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+def test_set_rules_invalidates_cache(engine):
+    " Prueba que al cambiar las reglas se invalida la caché. "
+    assert engine.get_response("adiós") is None
+    engine.set_rules({"adiós": "¡Hasta luego!"})
+    assert engine.get_response("adiós") == "¡Hasta luego!"
+    assert engine.get_response("hola") is None
+
+def test_reload_if_changed(engine, rules_path):
+    " Prueba que la recarga detecta cambios en el JSON y reemplaza el índice. "
+    assert engine.reload_if_changed() is False
+    old_index = engine.index
+    rules_path.write_text(json.dumps({
+        "rules": [{"keywords": ["chau"], "response": "¡Adiós!"}]
+    }), encoding="utf-8")
+    os.utime(rules_path, ns=(0, 1))
+    assert engine.reload_if_changed() is True
+    assert engine.index is not old_index
+    assert engine.get_response("chau") == "¡Adiós!"
+
+def test_reload_keeps_rules_on_invalid_json(engine, rules_path):
+    " Prueba que un JSON inválido no reemplaza las reglas vigentes. "
+    rules_path.write_text("{ incompleto", encoding="utf-8")
+    os.utime(rules_path, ns=(0, 1))
+    with pytest.raises(json.JSONDecodeError):
+        engine.reload_if_changed()
+    assert engine.get_response("hola") == "¡Hola!"
+
+def test_phrase_mode_combines_rules(rules_path):
+    " Prueba que el modo de frases responde mensajes con varias palabras clave. "
+    engine = BusinessRulesEngine(config={
+        "RULE_SOURCE": "json", "RULES_JSON_PATH": str(rules_path), "RULE_MATCH_MODE": "phrase"
+    })
+    assert engine.get_response("hola, ¿qué puedes hacer?") == "¡Hola! Puedo ayudarte."
+    # Un saludo al inicio de una pregunta real no cubre el mensaje: debe ir al LLM.
+    assert engine.get_response("hola, explícame el valor actual neto de un proyecto") is None
+
+def test_phrase_matcher_priority_and_tie_break():
+    " Prueba la prioridad y el desempate entre frases solapadas. "
+    matcher = PhraseMatcher(["qué puedes", "puedes hacer", "qué puedes hacer"], min_coverage=0)
+    assert matcher.match("qué puedes hacer hoy") == ["qué puedes hacer"]
+
+    matcher = PhraseMatcher(["qué puedes", "puedes hacer"], tie_break="leftmost", min_coverage=0)
+    assert matcher.match("qué puedes hacer") == ["qué puedes"]
+
+    matcher = PhraseMatcher(["qué puedes", "puedes hacer"], priorities={"puedes hacer": 5}, min_coverage=0)
+    assert matcher.match("qué puedes hacer") == ["puedes hacer"]
+    assert matcher.match("cholado") == []
+
+def test_tfidf_strategy(rules_path):
+    " Prueba la estrategia TF-IDF de n-gramas de caracteres. "
+    engine = BusinessRulesEngine(config={
+        "RULE_SOURCE": "json", "RULES_JSON_PATH": str(rules_path), "RULE_MATCHING_STRATEGY": "tfidf"
+    })
+    assert engine.index.tfidf_matcher is not None
+    assert engine.get_response("que puedes hacr") == "Puedo ayudarte."
+    assert engine.get_response("quien eres") == "Soy un asistente."
+    assert engine.get_response("explicame el valor actual neto") is None
@@ -0,0 +1,183 @@
+"""
+Path: tests/test_chat_sessions.py
+
+"""
+
+from unittest.mock import Mock
+import pytest
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.cache.response_cache import ResponseCache
+from app.components.services.cache.cache_impl.memory_backend import MemoryCacheBackend
+from app.components.services.llm.llm_client import IBaseLLMClient
+from app.components.services.llm.llm_impl.gemini_llm import GeminiLLMClient
+from app.components.services.response.response_generator import ResponseGenerator
+from app.components.services.session.chat_session_manager import (
+    ChatSessionManager, conversation_history_loader)
+from app.components.services.session.session_store import StoredSession
+from app.components.services.session.session_impl.sqlite_store import SQLiteSessionStore
+from app.components.services.session.session_impl.redis_store import RedisSessionStore
+
+def test_history_window_keeps_latest_turns():
+    " Prueba que el historial se recorta por turnos y por tokens estimados. "
+    manager = ChatSessionManager(max_turns=2, max_tokens=1000)
+    with manager.session("u1") as chat_session:
+        for number in range(4):
+            chat_session.add_turn(f"pregunta {number}", f"respuesta {number}")
+        assert chat_session.turns == [("pregunta 2", "respuesta 2"), ("pregunta 3", "respuesta 3")]
+        chat_session.add_turn("x" * 4000, "larga")
+        assert chat_session.turns == []
+
+def test_generator_keeps_users_apart(monkeypatch):
+    " Prueba que cada usuario recibe solo su propio historial. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IBaseLLMClient)
+    llm.send_message.side_effect = lambda message, history=None: f"R{len(history)}: {message}"
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    generator = ResponseGenerator(llm, rules_engine=rules, session_manager=ChatSessionManager())
+
+    generator.generate_response("hola, soy Ana", user_id="ana")
+    generator.generate_response("hola, soy Beto", user_id="beto")
+    assert generator.generate_response("¿cómo me llamo?", user_id="ana") == "R2: ¿cómo me llamo?"
+    assert llm.send_message.call_args.kwargs["history"] == [("user", "hola, soy Ana"),
+                                                            ("model", "R0: hola, soy Ana")]
+
+def test_follow_up_with_history_skips_response_cache(monkeypatch):
+    " Prueba que un usuario con historial no recibe la respuesta cacheada de otro sin contexto. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IBaseLLMClient)
+    llm.send_message.side_effect = lambda message, history=None: f"R{len(history)}: {message}"
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    generator = ResponseGenerator(llm, rules_engine=rules, session_manager=ChatSessionManager(),
+                                  response_cache=ResponseCache(MemoryCacheBackend()))
+
+    assert generator.generate_response("¿y cuánto cuesta?", user_id="ana") == "R0: ¿y cuánto cuesta?"
+    generator.generate_response("quiero cajas de cartón", user_id="beto")
+    assert generator.generate_response("¿y cuánto cuesta?", user_id="beto") == "R2: ¿y cuánto cuesta?"
+    assert list(generator.generate_response_streaming("¿y cuánto cuesta?", user_id="beto")) == \
+        ["R4: ¿y cuánto cuesta?"]
+    assert generator.generate_response("¿y cuánto cuesta?", user_id="carla") == "R0: ¿y cuánto cuesta?"
+    assert llm.send_message.call_count == 4
+
+def test_cold_session_is_rebuilt_from_repository_after_ttl():
+    " Prueba la reconstrucción diferida desde el repositorio y la expiración por TTL. "
+    now = [0.0]
+    repository = Mock()
+    repository.get_conversations_by_user.return_value = [
+        Mock(message="en curso", response=None),
+        Mock(message="segunda", response="r2"),
+        Mock(message="primera", response="r1")
+    ]
+    manager = ChatSessionManager(conversation_history_loader(repository), ttl=60, clock=lambda: now[0])
+    with manager.session("u1") as chat_session:
+        assert chat_session.turns == [("primera", "r1"), ("segunda", "r2")]
+    with manager.session("u1"):
+        pass
+    now[0] = 61
+    with manager.session("u1"):
+        pass
+    assert manager.stats()["loads"] == 2
+
+def test_least_recently_used_session_is_evicted():
+    " Prueba la expulsión LRU de sesiones. "
+    manager = ChatSessionManager(max_sessions=2)
+    for user_id in ["a", "b", "a", "c"]:
+        with manager.session(user_id) as chat_session:
+            chat_session.add_turn("hola", user_id)
+    with manager.session("a") as chat_session:
+        assert chat_session.turns == [("hola", "a"), ("hola", "a")]
+    with manager.session("b") as chat_session:
+        assert chat_session.turns == []
+    assert manager.stats()["evictions"] == 2
+
+def test_gemini_receives_history_per_call():
+    " Prueba que Gemini arma el chat con el historial recibido, sin estado compartido. "
+    client = GeminiLLMClient(api_key="fake_key", system_instruction="system_instruction")
+    client.model = Mock()
+    client.model.start_chat.return_value.send_message.return_value = Mock(text="Bien")
+    assert client.send_message("¿y vos?", history=[("user", "hola"), ("model", "¡Hola!")]) == "Bien"
+    client.model.start_chat.assert_called_once_with(history=[
+        {"role": "user", "parts": ["hola"]}, {"role": "model", "parts": ["¡Hola!"]}])
+
+class FakeRedisPipeline:
+    " Sustituto local mínimo de un pipeline redis-py con WATCH/MULTI. "
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def watch(self, key):
+        " Sin concurrencia real, WATCH no necesita registrar nada. "
+
+    def unwatch(self):
+        " Descarta el WATCH. "
+
+    def multi(self):
+        " Comienza a encolar comandos. "
+
+    def hget(self, key, field):
+        " Lee un campo del hash. "
+        return self.client.data.get(key, {}).get(field)
+
+    def hset(self, key, mapping):
+        " Encola la escritura del hash. "
+        self.commands.append(lambda: self.client.data.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        " El TTL lo gestionaría el servidor. "
+
+    def execute(self):
+        " Ejecuta los comandos encolados. "
+        for command in self.commands:
+            command()
+
+class FakeRedis:
+    " Sustituto local mínimo de un cliente redis-py para hashes. "
+    def __init__(self):
+        self.data = {}
+
+    def hmget(self, key, *fields):
+        " Lee varios campos del hash. "
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self):
+        " Crea un pipeline. "
+        return FakeRedisPipeline(self)
+
+    def delete(self, key):
+        " Elimina una clave. "
+        self.data.pop(key, None)
+
+def test_sqlite_store_rejects_stale_versions(tmp_path):
+    " Prueba la escritura condicional por versión y la serialización del historial. "
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    assert store.save("u1", [("hola", "¡Hola!")], 0, ttl=60) == 1
+    assert store.save("u1", [("otro", "turno")], 0, ttl=60) is None
+    assert store.save("u1", [("hola", "¡Hola!"), ("chau", "¡Chau!")], 1, ttl=60) == 2
+    assert store.load("u1") == StoredSession([("hola", "¡Hola!"), ("chau", "¡Chau!")], 2)
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: SQLiteSessionStore(str(tmp_path / "sessions.sqlite3")),
+    lambda tmp_path: RedisSessionStore(FakeRedis())
+])
+def test_workers_share_history_without_losing_turns(tmp_path, make_store):
+    " Prueba que dos workers comparten el historial y que un conflicto no pisa turnos. "
+    store = make_store(tmp_path)
+    worker_a, worker_b = ChatSessionManager(store=store), ChatSessionManager(store=store)
+    with worker_a.session("u1") as chat_session:
+        chat_session.add_turn("soy Ana", "Hola Ana")
+    with worker_b.session("u1") as chat_session:
+        assert chat_session.turns == [("soy Ana", "Hola Ana")]
+        # Otro turno del mismo usuario se guarda en otro worker mientras tanto.
+        with worker_a.session("u1") as concurrent_session:
+            concurrent_session.add_turn("tengo 30 años", "Anotado")
+        chat_session.add_turn("¿cómo me llamo?", "Ana")
+    assert store.load("u1").turns == [("soy Ana", "Hola Ana"), ("tengo 30 años", "Anotado"),
+                                      ("¿cómo me llamo?", "Ana")]
+    assert worker_b.stats()["conflicts"] == 1
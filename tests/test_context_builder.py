@@ -0,0 +1,47 @@
+"""
+Path: tests/test_context_builder.py
+
+"""
+
+from app.components.services.session.chat_session_manager import ChatSessionManager
+from app.components.services.session.context_builder import ContextBuilder, TokenCounter
+
+def test_token_counter_caches_counts():
+    " Prueba el conteo aproximado de tokens y su caché por mensaje. "
+    counter = TokenCounter()
+    assert counter.count("hola, cooperativa") == 5  # hola + , + coop|erat|iva
+    assert counter.count("hola, cooperativa") == 5
+    assert counter.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+def test_context_keeps_latest_turns_within_budget():
+    " Prueba que el contexto conserva los turnos más recientes que entran junto a la instrucción. "
+    builder = ContextBuilder(max_tokens=200, system_instruction="instrucción " * 40, turn_overhead=0,
+                             min_trimmed_tokens=1000)
+    turns = [(f"pregunta {number}", "respuesta " * 10) for number in range(10)]
+    history = builder.build(turns, "¿y ahora?")
+    assert history[-2:] == [("user", "pregunta 9"), ("model", "respuesta " * 10)]
+    kept = len(history) // 2
+    assert 0 < kept < 10
+    used = builder.system_tokens + builder.counter.count("¿y ahora?")
+    used += sum(builder.turn_tokens(*turn) for turn in turns[-kept:])
+    assert used <= 200 < used + builder.turn_tokens(*turns[-kept - 1])
+
+def test_context_trims_oldest_turn_that_does_not_fit():
+    " Prueba que el turno que no entra completo se recorta conservando su final. "
+    builder = ContextBuilder(max_tokens=60, turn_overhead=0, min_trimmed_tokens=10)
+    history = builder.build([("precio", "uno dos tres " * 30)], "hola")
+    assert history[0] == ("user", "precio")
+    assert history[1][1].startswith("…") and history[1][1].endswith("dos tres ")
+    assert sum(builder.counter.count(text) for _, text in history) <= 60 - builder.counter.count("hola")
+
+def test_session_context_respects_prompt_budget():
+    " Prueba que la sesión entrega al LLM solo el historial que entra en el presupuesto del prompt. "
+    manager = ChatSessionManager(max_turns=50, max_tokens=100000,
+                                 context_builder=ContextBuilder(max_tokens=100, min_trimmed_tokens=1000))
+    with manager.session("u1") as chat_session:
+        for number in range(50):
+            chat_session.add_turn(f"mensaje {number}", "respuesta larga " * 5)
+        assert len(chat_session.turns) == 50
+        history = chat_session.context("nuevo")
+    assert 0 < len(history) < 20
+    assert history[-1] == ("model", "respuesta larga " * 5)
@@ -0,0 +1,74 @@
+"""
+Path: tests/test_conversation_archiver.py
+
+"""
+
+import datetime
+import gzip
+import json
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from app.core.config import db
+from app.models import Conversation, User
+from app.components.services.archive.archive_impl.range_partitions import RangePartitions
+from app.components.services.archive.archive_impl.mysql_partitions import MySQLPartitions
+from app.components.services.archive.conversation_archiver import ConversationArchiver
+from app.components.services.archive.partitions import add_months
+
+TODAY = datetime.date(2026, 10, 18)
+
+@pytest.fixture
+def engine():
+    " SQLite en memoria con conversaciones de junio a octubre de 2026. "
+    engine = sa.create_engine("sqlite://", poolclass=sa.pool.StaticPool)
+    db.metadata.create_all(engine, tables=[User.__table__, Conversation.__table__])
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{"user_id": "u1"}])
+        connection.execute(Conversation.__table__.insert(), [
+            {"user_id": "u1", "message": f"m{month}-{day}", "response": "r",
+             "created_at": datetime.datetime(2026, month, day, 12)}
+            for month in range(6, 11) for day in (1, 15, 30) if (month, day) != (10, 30)
+        ])
+    return engine
+
+def test_add_months_crosses_years():
+    " Prueba la aritmética de meses. "
+    assert add_months(datetime.date(2026, 11, 1), 3) == datetime.date(2027, 2, 1)
+    assert add_months(datetime.date(2026, 1, 1), -1) == datetime.date(2025, 12, 1)
+
+def test_old_months_are_archived_and_dropped(engine, tmp_path):
+    " Prueba que los meses vencidos se archivan en JSONL comprimido y se eliminan de la tabla. "
+    archiver = ConversationArchiver(RangePartitions(engine), archive_dir=str(tmp_path), retention_months=2,
+                                    batch_size=2, today=lambda: TODAY)
+    assert archiver.run(dry_run=True) == [{"month": "2026-06", "rows": 3, "path": None},
+                                          {"month": "2026-07", "rows": 3, "path": None}]
+    results = archiver.run()
+    assert [(result["month"], result["rows"]) for result in results] == [("2026-06", 3), ("2026-07", 3)]
+
+    with gzip.open(tmp_path / "conversations-2026-06.jsonl.gz", "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["message"] for row in rows] == ["m6-1", "m6-15", "m6-30"]
+    assert rows[0]["created_at"] == "2026-06-01T12:00:00"
+
+    with engine.connect() as connection:
+        remaining = connection.execute(sa.select(Conversation.__table__.c.message)).scalars().all()
+    assert len(remaining) == 8 and all(message.startswith(("m8", "m9", "m10")) for message in remaining)
+    assert archiver.run() == []
+
+def test_month_is_kept_when_archive_is_incomplete(engine, tmp_path):
+    " Prueba que si no se archivaron todas las filas, el mes no se elimina. "
+    partitions = RangePartitions(engine)
+    original_rows = partitions.rows
+    partitions.rows = lambda month, batch_size: list(original_rows(month, batch_size))[:-1]
+    archiver = ConversationArchiver(partitions, archive_dir=str(tmp_path), retention_months=3,
+                                    today=lambda: TODAY)
+    with pytest.raises(RuntimeError):
+        archiver.run()
+    assert partitions.count(datetime.date(2026, 6, 1)) == 3
+    assert not list(tmp_path.iterdir())
+
+def test_mysql_reads_a_single_partition():
+    " Prueba que en MySQL las filas de un mes se leen de su partición. "
+    statement = MySQLPartitions._in_partition(sa.select(Conversation.__table__), datetime.date(2026, 6, 1))
+    assert "FROM conversations PARTITION (p202606)" in str(statement.compile(dialect=mysql.dialect()))
@@ -0,0 +1,124 @@
+"""
+Path: tests/test_gemini_context_cache.py
+
+"""
+
+import threading
+from unittest.mock import Mock
+from google.api_core.exceptions import NotFound
+from app.components.services.llm.llm_impl import gemini_llm
+from app.components.services.llm.llm_impl.gemini_context_cache import GeminiContextCache
+from app.components.services.llm.model_config import ModelConfig
+
+def make_caching():
+    " Módulo `caching` simulado: cada create retorna un contenido con nombre nuevo. "
+    caching = Mock()
+    caching.CachedContent.list.return_value = []
+
+    def create(**kwargs):
+        content = Mock()
+        content.name = f"cachedContents/{caching.CachedContent.create.call_count}"
+        return content
+
+    caching.CachedContent.create.side_effect = create
+    return caching
+
+def test_cache_is_created_refreshed_and_renewed_on_instruction_change():
+    " Prueba la creación, la extensión del TTL antes de vencer y la renovación al cambiar la instrucción. "
+    now = [0.0]
+    instruction = ["Sos MadyBot."]
+    caching = make_caching()
+    cache = GeminiContextCache("gemini-1.5-flash-002", lambda: instruction[0], ttl=100, refresh_margin=10,
+                               check_interval=5, caching=caching, clock=lambda: now[0])
+
+    first = cache.content()
+    assert first.name == "cachedContents/1"
+    assert caching.CachedContent.create.call_args.kwargs["system_instruction"] == "Sos MadyBot."
+    now[0] = 50
+    assert cache.content() is first
+    first.update.assert_not_called()
+    now[0] = 95
+    assert cache.content() is first
+    first.update.assert_called_once()
+
+    instruction[0] = "Sos MadyBot, versión 2."
+    now[0] = 101
+    second = cache.content()
+    first.delete.assert_called_once()
+    assert second.name == "cachedContents/2"
+    assert cache.system_instruction == "Sos MadyBot, versión 2."
+
+def test_cache_falls_back_when_provider_rejects_it():
+    " Prueba que un error al crear la caché deja de usarla hasta `retry_after`. "
+    now = [0.0]
+    caching = make_caching()
+    caching.CachedContent.create.side_effect = ValueError("contenido por debajo del mínimo de tokens")
+    cache = GeminiContextCache("gemini-1.5-flash-002", lambda: "Sos MadyBot.", retry_after=60,
+                               caching=caching, clock=lambda: now[0])
+    assert cache.content() is None
+    assert cache.content() is None
+    assert caching.CachedContent.create.call_count == 1
+    now[0] = 61
+    cache.content()
+    assert caching.CachedContent.create.call_count == 2
+    assert cache.stats()["failures"] == 2
+
+def test_api_calls_do_not_block_other_requests():
+    " Prueba que mientras un pedido crea o extiende la caché, los demás no esperan la llamada a la API. "
+    now = [0.0]
+    caching = make_caching()
+    release, creating = threading.Event(), threading.Event()
+    create = caching.CachedContent.create.side_effect
+
+    def slow_create(**kwargs):
+        creating.set()
+        release.wait(5)
+        return create(**kwargs)
+
+    caching.CachedContent.create.side_effect = slow_create
+    cache = GeminiContextCache("gemini-1.5-flash-002", lambda: "Sos MadyBot.", ttl=100, refresh_margin=10,
+                               caching=caching, clock=lambda: now[0])
+    results = []
+    creator = threading.Thread(target=lambda: results.append(cache.content()))
+    creator.start()
+    assert creating.wait(1)
+    assert cache.content() is None  # sin contenido todavía: instrucción completa, sin esperar
+    release.set()
+    creator.join()
+    first = results[0]
+    assert first.name == "cachedContents/1" and cache.content() is first
+
+    now[0] = 95
+    release_update, updating = threading.Event(), threading.Event()
+    first.update.side_effect = lambda **kwargs: updating.set() or release_update.wait(5)
+    refresher = threading.Thread(target=cache.content)
+    refresher.start()
+    assert updating.wait(1)
+    assert cache.content() is first  # el contenido vigente sigue sirviendo durante la extensión
+    release_update.set()
+    refresher.join()
+    assert cache.stats()["refreshes"] == 1 and caching.CachedContent.create.call_count == 1
+
+def test_gemini_client_uses_cached_model_and_recovers_when_cache_is_lost(monkeypatch):
+    " Prueba que el cliente usa el modelo ligado a la caché y reintenta sin ella si el proveedor la perdió. "
+    cache = GeminiContextCache("gemini-1.5-flash-002", lambda: "Sos MadyBot.", caching=make_caching())
+    cached_model = Mock()
+    cached_model.start_chat.return_value.send_message.side_effect = NotFound("CachedContent not found")
+    monkeypatch.setattr(gemini_llm.genai.GenerativeModel, "from_cached_content", Mock(return_value=cached_model))
+    client = gemini_llm.GeminiLLMClient(api_key="fake_key", system_instruction="Sos MadyBot.",
+                                        context_cache=cache)
+    client.model = Mock()
+    client.model.start_chat.return_value.send_message.return_value = Mock(text="Hola")
+
+    assert client.send_message("hola") == "Hola"
+    cached_model.start_chat.return_value.send_message.assert_called_once_with("hola")
+    assert cache.stats()["active"] is False
+
+def test_model_config_creates_context_cache_when_enabled(monkeypatch):
+    " Prueba que ModelConfig solo crea la caché de contexto con GEMINI_CONTEXT_CACHE.ENABLED. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    assert ModelConfig().create_context_cache("gemini-1.5-flash") is None
+    model_config = ModelConfig(config={"GEMINI_CONTEXT_CACHE": {"ENABLED": True, "CACHE_MODEL": "gemini-1.5-flash-002"}})
+    cache = model_config.create_context_cache("gemini-1.5-flash")
+    assert cache.model_name == "gemini-1.5-flash-002"
+    assert cache.system_instruction == model_config.current_system_instruction()
@@ -0,0 +1,149 @@
+"""
+Path: tests/test_interaction_persistence.py
+
+"""
+
+from unittest.mock import Mock
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+from app.core.config import db
+from app.models import Conversation, User
+from app.repositories.conversation_repository import ConversationRepository
+from app.repositories.user_repository import UserRepository
+from app.components.services.data.conversation_persistence_service import ConversationPersistenceService
+from app.components.services.data.data_service import DataService
+from app.components.services.data.user_fingerprint_cache import UserFingerprintCache
+
+USER_DATA = {"id": "u1", "browserData": {"userAgent": "Firefox", "screenResolution": "1920x1080",
+                                         "language": "es-AR", "platform": "Linux"}}
+
+@pytest.fixture
+def app_context():
+    " Aplicación Flask con SQLite en memoria y las tablas del modelo. "
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def count_statements():
+    " Cuenta las sentencias SQL y los commits emitidos por la sesión. "
+    counts = {"statements": 0, "commits": 0}
+    event.listen(db.engine, "before_cursor_execute", lambda *args: counts.__setitem__(
+        "statements", counts["statements"] + 1))
+    event.listen(db.engine, "commit", lambda *args: counts.__setitem__("commits", counts["commits"] + 1))
+    return counts
+
+def test_interaction_is_saved_in_one_transaction(app_context):
+    " Prueba que usuario y conversación se guardan con dos sentencias y un único commit. "
+    service = ConversationPersistenceService(ConversationRepository())
+    counts = count_statements()
+    conversation_id = service.save_interaction({"user_id": "u1", "message": "hola", "response": "¡Hola!"},
+                                               USER_DATA)
+    assert counts == {"statements": 2, "commits": 1}
+    conversation = db.session.get(Conversation, conversation_id)
+    assert (conversation.message, conversation.response) == ("hola", "¡Hola!")
+    assert User.query.filter_by(user_id="u1").one().user_agent == "Firefox"
+
+def test_upsert_keeps_stored_fields_when_new_value_is_missing(app_context):
+    " Prueba que el upsert actualiza los campos nuevos y conserva los que llegan vacíos. "
+    repository = UserRepository()
+    assert repository.upsert_user("u1", user_agent="Firefox", language="es-AR")
+    assert repository.upsert_user("u1", user_agent="Chrome", language=None)
+    user = User.query.filter_by(user_id="u1").one()
+    assert (user.user_agent, user.language) == ("Chrome", "es-AR")
+    assert User.query.count() == 1
+
+def test_portable_upsert_fallback(app_context, monkeypatch):
+    " Prueba el upsert portable (UPDATE + INSERT) para motores sin upsert nativo. "
+    monkeypatch.setattr(UserRepository, "_upsert_statement", staticmethod(lambda *args: None))
+    repository = UserRepository()
+    assert repository.upsert_user("u1", platform="Linux")
+    assert repository.upsert_user("u1", platform="Windows", language="es")
+    user = User.query.filter_by(user_id="u1").one()
+    assert (user.platform, user.language) == ("Windows", "es")
+
+def test_message_is_saved_when_generation_fails():
+    " Prueba que si la generación falla el mensaje se guarda igual, sin respuesta. "
+    validator, channel, generator, conversations = Mock(), Mock(), Mock(), Mock()
+    validator.validate.return_value = {"user_data": {"id": "u1"}}
+    channel.receive_message.return_value = {"message": "hola", "stream": False}
+    generator.generate_response.side_effect = ValueError("sin respuesta")
+    service = DataService(validator, generator, channel, Mock(), conversations)
+
+    assert service.process_incoming_data({}) == "Error procesando la solicitud."
+    conversations.save_interaction.assert_called_once_with(
+        {"user_id": "u1", "message": "hola", "response": None}, {"id": "u1"})
+
+def test_unchanged_profile_skips_user_upsert(app_context):
+    " Prueba que un perfil sin cambios solo inserta la conversación y que uno nuevo vuelve a guardarse. "
+    fingerprints = UserFingerprintCache()
+    service = ConversationPersistenceService(ConversationRepository(), user_fingerprints=fingerprints)
+    service.save_interaction({"user_id": "u1", "message": "hola"}, USER_DATA)
+    counts = count_statements()
+    service.save_interaction({"user_id": "u1", "message": "otra"}, USER_DATA)
+    assert counts == {"statements": 1, "commits": 1}
+
+    changed = {"id": "u1", "browserData": dict(USER_DATA["browserData"], platform="Windows")}
+    service.save_interaction({"user_id": "u1", "message": "y otra"}, changed)
+    assert counts["statements"] == 3
+    assert User.query.filter_by(user_id="u1").one().platform == "Windows"
+    assert fingerprints.stats()["hits"] == 1
+
+def test_stale_fingerprint_retries_with_upsert(app_context):
+    " Prueba que si el usuario ya no existe, la huella se descarta y se vuelve a crear el usuario. "
+    db.session.execute(text("PRAGMA foreign_keys=ON"))
+    fingerprints = UserFingerprintCache()
+    service = ConversationPersistenceService(ConversationRepository(), user_fingerprints=fingerprints)
+    service.save_interaction({"user_id": "u1", "message": "hola"}, USER_DATA)
+    Conversation.query.delete()
+    User.query.delete()
+    db.session.commit()
+
+    assert service.save_interaction({"user_id": "u1", "message": "volví"}, USER_DATA) is not None
+    assert User.query.filter_by(user_id="u1").count() == 1
+
+def test_stale_fingerprint_without_foreign_key_recreates_user(app_context):
+    " Prueba que, sin clave foránea (MySQL particionado), no quedan conversaciones huérfanas. "
+    fingerprints = UserFingerprintCache()
+    service = ConversationPersistenceService(ConversationRepository(), user_fingerprints=fingerprints)
+    service.save_interaction({"user_id": "u1", "message": "hola"}, USER_DATA)
+    User.query.delete()
+    db.session.commit()
+
+    assert service.save_interaction({"user_id": "u1", "message": "volví"}, USER_DATA) is not None
+    assert User.query.filter_by(user_id="u1").one().platform == "Linux"
+    assert ConversationRepository().save_interaction("fantasma", "hola") is None
+    assert Conversation.query.filter_by(user_id="fantasma").count() == 0
+
+def test_batch_recreates_missing_user_of_skipped_profile(app_context):
+    " Prueba que el lote guarda el perfil omitido por la huella si el usuario ya no existe. "
+    repository = ConversationRepository()
+    repository.save_interactions([], {"u1": {"language": "es-AR"}, "u2": {"language": "en"}})
+    User.query.filter_by(user_id="u2").delete()
+    db.session.commit()
+
+    counts = count_statements()
+    repository.save_interactions(
+        [{"user_id": "u1", "message": "hola"}, {"user_id": "u2", "message": "hello"}],
+        known_profiles={"u1": {"language": "es-AR"}, "u2": {"language": "en-US"}})
+    assert counts["statements"] == 3
+    assert {user.user_id: user.language for user in User.query.all()} == {"u1": "es-AR", "u2": "en-US"}
+    assert Conversation.query.count() == 2
+
+def test_fingerprint_cache_expires_and_is_bounded():
+    " Prueba el TTL y el límite de entradas de la caché de huellas. "
+    now = [0.0]
+    fingerprints = UserFingerprintCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    fingerprints.remember("u1", {"language": "es"})
+    assert fingerprints.matches("u1", {"language": "es"})
+    assert not fingerprints.matches("u1", {"language": "en"})
+    now[0] = 11
+    assert not fingerprints.matches("u1", {"language": "es"})
+    for user_id in ("u1", "u2", "u3"):
+        fingerprints.remember(user_id, {})
+    assert len(fingerprints) == 2 and not fingerprints.matches("u1", {})
@@ -0,0 +1,157 @@
+"""
+Path: tests/test_llm_resilience.py
+
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.llm.llm_client import IBaseLLMClient, IStreamingLLMClient
+from app.components.services.llm.llm_resilience import (
+    CircuitBreaker, CircuitOpenError, LLMUnavailableError, ResilientLLMClient, is_retryable)
+from app.components.services.response.response_generator import ResponseGenerator
+
+class ServiceUnavailable(Exception):
+    " Imita el error 503 de google-api-core. "
+    code = 503
+
+def make_client(side_effect, **kwargs):
+    " Crea un ResilientLLMClient sobre un cliente simulado, sin esperas reales. "
+    llm = Mock(spec=IBaseLLMClient)
+    llm.model_name = "simulado"
+    llm.send_message.side_effect = side_effect
+    return llm, ResilientLLMClient(llm, sleep=lambda seconds: None, **kwargs)
+
+def test_transient_errors_are_retried():
+    " Prueba que los errores transitorios se reintentan y los demás no. "
+    llm, client = make_client([ServiceUnavailable(), ServiceUnavailable(), "ok"], max_retries=2)
+    assert client.send_message("hola") == "ok"
+    assert llm.send_message.call_count == 3
+
+    llm, client = make_client(ValueError("prompt inválido"))
+    with pytest.raises(ValueError):
+        client.send_message("hola")
+    assert llm.send_message.call_count == 1
+    assert is_retryable(TimeoutError()) and not is_retryable(ValueError())
+
+def test_slow_call_times_out():
+    " Prueba el timeout por llamada. "
+    _, client = make_client(lambda message, history=None: time.sleep(1), timeout=0.05, max_retries=0)
+    start = time.perf_counter()
+    with pytest.raises(LLMUnavailableError):
+        client.send_message("hola")
+    assert time.perf_counter() - start < 0.5
+
+def test_sdk_timeout_cancels_the_call_before_the_backstop():
+    " Prueba que con timeout del SDK el executor solo es respaldo y se propaga el error del SDK. "
+    sdk_error = TimeoutError("deadline del SDK")
+
+    def sdk_call(message, history=None):
+        time.sleep(0.1)
+        raise sdk_error
+
+    llm, client = make_client(sdk_call, timeout=0.05, max_retries=0, backstop_margin=1)
+    assert client.call_timeout == 0.05
+    llm.request_timeout = 0.05
+    client = ResilientLLMClient(llm, timeout=0.05, max_retries=0, backstop_margin=1)
+    assert client.call_timeout == 1.05
+    with pytest.raises(LLMUnavailableError) as raised:
+        client.send_message("hola")
+    assert raised.value.__cause__ is sdk_error
+
+def test_waiting_for_a_pool_thread_is_not_a_provider_failure():
+    " Prueba que el timeout corre desde que la llamada tiene hilo y que la saturación no abre el circuito. "
+    llm, client = make_client(lambda message, history=None: time.sleep(0.1) or "ok",
+                              timeout=0.25, max_retries=0, max_workers=1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.send_message("hola"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["ok"] * 3 and llm.send_message.call_count == 3
+
+    release = threading.Event()
+    llm.send_message.side_effect = lambda message, history=None: release.wait(5) and "tarde"
+    busy = threading.Thread(target=lambda: pytest.raises(LLMUnavailableError, client.send_message, "hola"))
+    busy.start()
+    deadline = time.monotonic() + 2
+    while llm.send_message.call_count < 4 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    with pytest.raises(LLMUnavailableError, match="hilos libres"):
+        client.send_message("hola")
+    release.set()
+    busy.join()
+    assert client.stats()["calls"] == 4 and client.stats()["error_rate"] == 0.25
+
+def test_sdk_timeout_client_is_called_in_the_request_thread():
+    " Prueba que con timeout del SDK la llamada síncrona no pasa por el pool. "
+    threads = []
+    llm, _ = make_client(lambda message, history=None: threads.append(threading.get_ident()) or "ok")
+    llm.request_timeout = 5
+    assert ResilientLLMClient(llm).send_message("hola") == "ok"
+    assert threads == [threading.get_ident()]
+
+def test_abandoned_stream_stops_the_producer():
+    " Prueba que al abandonar el stream el productor deja de leer y cierra el iterador del SDK. "
+    closed = threading.Event()
+    produced = []
+
+    class EndlessStream(IStreamingLLMClient):
+        " Proveedor con un stream que no termina nunca. "
+        model_name = "infinito"
+
+        def send_message(self, message, history=None):
+            raise AssertionError("No debería usarse la versión no streaming.")
+
+        def send_message_streaming(self, message, history=None):
+            try:
+                while True:
+                    produced.append(1)
+                    time.sleep(0.01)
+                    yield "x"
+            finally:
+                closed.set()
+
+    client = ResilientLLMClient(EndlessStream(), timeout=1, max_workers=1)
+    stream = client.send_message_streaming("hola")
+    assert next(stream) == "x"
+    stream.close()
+    assert closed.wait(1)
+    count = len(produced)
+    time.sleep(0.05)
+    assert len(produced) == count
+    assert client._slots.acquire(timeout=1)  # pylint: disable=protected-access
+
+def test_breaker_opens_fails_fast_and_recovers():
+    " Prueba la apertura del circuito, el rechazo inmediato y el cierre tras una prueba exitosa. "
+    now = [0.0]
+    breaker = CircuitBreaker(error_threshold=0.5, min_calls=2, reset_timeout=10, clock=lambda: now[0])
+    llm, client = make_client(ServiceUnavailable(), max_retries=0, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            client.send_message("hola")
+    assert client.stats()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        client.send_message("hola")
+    assert llm.send_message.call_count == 2
+
+    now[0] = 11
+    llm.send_message.side_effect = None
+    llm.send_message.return_value = "recuperado"
+    assert client.send_message("hola") == "recuperado"
+    assert client.stats()["state"] == "closed"
+
+def test_generator_answers_with_fallback_when_llm_is_unavailable(monkeypatch):
+    " Prueba que ResponseGenerator usa la respuesta de contingencia si el circuito está abierto. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.record_failure()
+    _, client = make_client("no se usa", breaker=breaker)
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    generator = ResponseGenerator(client, rules_engine=rules, fallback_response="Probá más tarde.")
+    assert generator.generate_response("hola") == "Probá más tarde."
+    assert list(generator.generate_response_streaming("hola")) == ["Probá más tarde."]
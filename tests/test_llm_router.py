@@ -0,0 +1,90 @@
+"""
+Path: tests/test_llm_router.py
+
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+from app.components.services.llm.llm_client import IBaseLLMClient
+from app.components.services.llm.llm_router import LLMRouter
+from app.components.services.llm.model_config import ModelConfig
+from app.components.services.llm.llm_impl import deep_seek_llm
+
+class FakeProvider(IBaseLLMClient):
+    " Proveedor simulado con demora y fallas configurables. "
+    def __init__(self, name, delay=0.0, fail=False):
+        self.model_name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def send_message(self, message, history=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model_name} caído")
+        return f"{self.model_name}: {message}"
+
+def test_router_prefers_fastest_healthy_provider():
+    " Prueba que, tras medir, el enrutador elige al proveedor más rápido. "
+    slow, fast = FakeProvider("lento", delay=0.02), FakeProvider("rápido")
+    router = LLMRouter({"lento": slow, "rápido": fast})
+    router.send_message("hola")
+    router.send_message("hola")
+    assert router.rank() == ["rápido", "lento"]
+    assert router.send_message("hola") == "rápido: hola"
+
+def test_router_fails_over_and_marks_unhealthy_provider():
+    " Prueba la conmutación ante errores y que un proveedor con muchos errores queda último. "
+    broken, backup = FakeProvider("roto", fail=True), FakeProvider("respaldo", delay=0.01)
+    router = LLMRouter({"roto": broken, "respaldo": backup}, min_samples=2)
+    assert router.send_message("hola") == "respaldo: hola"
+    assert router.send_message("hola") == "respaldo: hola"
+    assert router.rank() == ["respaldo", "roto"]
+    assert router.stats()["providers"]["roto"]["error_rate"] == 1.0
+
+def test_demoted_provider_recovers_when_its_samples_expire():
+    " Prueba que un proveedor relegado vuelve a probarse cuando vencen sus mediciones. "
+    now = [0.0]
+    flaky, backup = FakeProvider("inestable", fail=True), FakeProvider("respaldo")
+    router = LLMRouter({"inestable": flaky, "respaldo": backup}, min_samples=2, sample_max_age=60,
+                       clock=lambda: now[0])
+    router.send_message("hola")
+    router.send_message("hola")
+    assert router.rank() == ["respaldo", "inestable"]
+    assert router.send_message("hola") == "respaldo: hola"
+
+    flaky.fail = False
+    now[0] = 61
+    assert router.rank() == ["inestable", "respaldo"]
+    assert router.send_message("hola") == "inestable: hola"
+    assert router.stats()["providers"]["inestable"]["error_rate"] == 0.0
+
+def test_hedged_request_uses_first_answer():
+    " Prueba que el duplicado al segundo proveedor responde cuando el primero demora. "
+    release = threading.Event()
+    stuck = Mock(spec=IBaseLLMClient)
+    stuck.send_message.side_effect = lambda message, history=None: release.wait(5) and "tarde"
+    router = LLMRouter({"lento": stuck, "rápido": FakeProvider("rápido")},
+                       hedge=True, hedge_default_delay=0.05)
+    start = time.perf_counter()
+    assert router.send_message("hola") == "rápido: hola"
+    assert time.perf_counter() - start < 1
+    release.set()
+    assert router.stats()["hedges"] == 1 and router.stats()["hedge_wins"] == 1
+
+def test_model_config_wires_deepseek_and_router(monkeypatch):
+    " Prueba que ModelConfig crea DeepSeek y el enrutador desde la configuración. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    monkeypatch.setattr(deep_seek_llm, "api_key", "fake_key")
+    config = {
+        "SELECTED_MODEL": {"COMPANY": "DeepSeek", "MODEL": "deepseek-chat"},
+        "LLM_ROUTER": {"ENABLED": False, "PROVIDERS": [
+            {"COMPANY": "Google", "MODEL": "gemini-1.5-flash"},
+            {"COMPANY": "DeepSeek", "MODEL": "deepseek-chat"}]}
+    }
+    assert isinstance(ModelConfig(config=config).create_llm_client(), deep_seek_llm.DeepSeekLLMClient)
+    config["LLM_ROUTER"]["ENABLED"] = True
+    router = ModelConfig(config=config).create_llm_client()
+    assert list(router.providers) == ["Google:gemini-1.5-flash", "DeepSeek:deepseek-chat"]
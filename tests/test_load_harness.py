@@ -0,0 +1,87 @@
+"""
+Path: tests/test_load_harness.py
+
+"""
+
+import asyncio
+import itertools
+import pytest
+from benchmarks.load_harness import parse_failed_stage, parse_server_timing, run_load, summarize
+from app.components.services.llm.llm_impl.fake_llm import FakeLLMClient, FakeLLMError
+from app.components.services.llm.llm_resilience import is_retryable
+from app.components.services.llm.model_config import ModelConfig
+from app.utils.stage_timing import failed_stage, server_timing_header, stage, start_timing
+
+def test_fake_llm_latency_and_streaming():
+    " Prueba que el cliente local espera la latencia configurada y transmite a la tasa de tokens. "
+    waits = []
+    client = FakeLLMClient(latency_distribution="fixed", latency_ms=200, tokens_per_second=10,
+                           response_tokens=5, sleep=waits.append)
+    chunks = list(client.send_message_streaming("hola mundo"))
+    assert "".join(chunks).startswith("hola mundo ")
+    assert len(chunks) == 5
+    assert waits == [0.2] + [0.1] * 4
+    assert asyncio.run(client.send_message_async("hola mundo")) == "".join(chunks)
+
+def test_fake_llm_error_injection_is_retryable():
+    " Prueba la inyección de errores con un estado HTTP que la capa de resiliencia reintenta. "
+    client = FakeLLMClient(error_rate=1.0, error_code=503, sleep=lambda _: None, seed=1)
+    with pytest.raises(FakeLLMError) as error:
+        client.send_message("hola")
+    assert is_retryable(error.value)
+
+def test_model_config_selects_local_provider(monkeypatch):
+    " Prueba que ModelConfig crea el proveedor local sin API Key de Gemini. "
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    config = {"SELECTED_MODEL": {"COMPANY": "Local", "MODEL": "fake-llm"},
+              "FAKE_LLM": {"LATENCY_MS": 0, "TOKENS_PER_SECOND": 0, "RESPONSE_TOKENS": 3},
+              "LLM_RESILIENCE": {"ENABLED": False}}
+    client = ModelConfig(config=config).create_llm_client()
+    assert isinstance(client, FakeLLMClient)
+    assert client.send_message("uno dos tres cuatro") == "uno dos tres"
+
+def test_stage_timing_header():
+    " Prueba la medición de etapas y su formato en la cabecera Server-Timing. "
+    timings = start_timing()
+    with stage("llm"):
+        pass
+    with stage("llm"):
+        pass
+    assert list(timings) == ["llm"]
+    assert parse_server_timing(server_timing_header(timings)).keys() == {"llm"}
+    assert parse_server_timing("validate;dur=1.5, llm;desc=x;dur=300") == {"validate": 1.5, "llm": 300.0}
+
+def test_load_run_summary():
+    " Prueba el lazo abierto del generador de carga y el resumen de latencias y errores. "
+    outcomes = itertools.cycle([(200, None, {"llm": 10.0}, None), (200, None, {"llm": 30.0}, None),
+                                (503, "http_5xx", {}, "llm"), (None, "timeout", {}, None)])
+    results, elapsed = run_load(lambda payload: next(outcomes), itertools.repeat({}),
+                                rps=200, duration=0.2, concurrency=4)
+    summary = summarize(results, elapsed)
+    assert summary["requests"] == 40
+    assert summary["errors"] == {"http_5xx": 10, "timeout": 10}
+    assert summary["error_rate"] == 0.5
+    assert summary["stages"]["llm"]["count"] == 20
+    assert summary["stages"]["llm"]["p99_ms"] == 30.0
+    assert summary["stages"]["llm"]["errors"] == 10
+    assert summary["stages"]["llm"]["error_rate"] == 0.25
+    assert summary["stages"]["transport"]["errors"] == 10
+    assert summary["stages"]["transport"]["count"] == 0
+
+def test_failed_stage_in_server_timing():
+    " Prueba que la etapa que falla (la más interna) se informa en Server-Timing y el generador la lee. "
+    timings = start_timing()
+    with stage("rules"):
+        pass
+    with pytest.raises(RuntimeError):
+        with stage("generate"):
+            with stage("llm"):
+                raise RuntimeError("proveedor caído")
+    assert failed_stage() == "llm"
+    header = server_timing_header(timings, failed_stage())
+    assert header.endswith("error;desc=llm")
+    assert parse_failed_stage(header) == "llm"
+    assert parse_server_timing(header).keys() == {"rules", "generate", "llm"}
+    start_timing()
+    assert failed_stage() is None
+    assert parse_failed_stage("llm;dur=3.0") is None
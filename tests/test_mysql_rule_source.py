@@ -0,0 +1,102 @@
+"""
+Path: tests/test_mysql_rule_source.py
+
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import Mock
+import pymysql
+import pytest
+from app.components.services.business.mysql_rule_source import MySQLRuleSource
+from app.infrastructure.mysql_pool import MySQLConnectionPool
+
+class FakeCursor:
+    " Cursor mínimo que responde a las consultas de MySQLRuleSource sobre una tabla en memoria. "
+    def __init__(self, table):
+        self.table = table
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        " Simula las tres consultas usadas por la fuente. "
+        if "COUNT(*)" in query:
+            version = max((row["updated_at"] for row in self.table), default=None)
+            self.result = [{"version": version, "total": len(self.table)}]
+        elif "updated_at >=" in query:
+            self.result = [row for row in self.table if row["updated_at"] >= params[0]]
+        else:
+            self.result = sorted(self.table, key=lambda row: row["id"])
+
+    def fetchone(self):
+        " Retorna la primera fila. "
+        return self.result[0]
+
+    def fetchmany(self, size):
+        " Retorna el siguiente lote de filas. "
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+class FakePool:
+    " Pool que entrega conexiones falsas sobre la misma tabla. "
+    def __init__(self, table):
+        self.table = table
+
+    @contextmanager
+    def connection(self):
+        " Entrega una conexión falsa. "
+        connection = type("Connection", (), {})()
+        connection.cursor = lambda *args: FakeCursor(self.table)
+        yield connection
+
+def _row(row_id, keyword, response, minute):
+    return {"id": row_id, "keyword": keyword, "response": response,
+            "updated_at": datetime(2025, 1, 1, 0, minute)}
+
+def test_full_then_delta_load():
+    " Prueba la carga completa seguida de una carga incremental. "
+    table = [_row(1, "Hola", "¡Hola!", 0), _row(2, "chau", "¡Adiós!", 1)]
+    source = MySQLRuleSource({}, pool=FakePool(table), fetch_size=1)
+    assert source.load() == {"hola": "¡Hola!", "chau": "¡Adiós!"}
+
+    table.append(_row(3, "gracias", "¡De nada!", 5))
+    table[0] = _row(1, "hola", "¡Buenas!", 5)
+    assert source.load() == {"hola": "¡Buenas!", "chau": "¡Adiós!", "gracias": "¡De nada!"}
+
+def test_delete_triggers_full_reload():
+    " Prueba que un borrado en la tabla provoca una recarga completa. "
+    table = [_row(1, "hola", "¡Hola!", 0), _row(2, "chau", "¡Adiós!", 1)]
+    source = MySQLRuleSource({}, pool=FakePool(table))
+    source.load()
+    del table[1]
+    assert source.load() == {"hola": "¡Hola!"}
+
+def test_pool_connection_is_released_or_closed_on_every_exit(monkeypatch):
+    " Prueba que la conexión vuelve al pool ante errores ajenos a MySQL y se cierra ante errores de MySQL. "
+    pool = MySQLConnectionPool({"host": "h", "user": "u", "password": "p", "database": "d"})
+    monkeypatch.setattr(pool, "_connect", Mock)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("error de la aplicación")
+    assert pool._idle.qsize() == 1  # pylint: disable=protected-access
+
+    def rows():
+        with pool.connection() as connection:
+            yield connection
+
+    generator = rows()
+    next(generator)
+    generator.close()
+    assert pool._idle.qsize() == 1  # pylint: disable=protected-access
+
+    with pytest.raises(pymysql.MySQLError):
+        with pool.connection() as connection:
+            raise pymysql.OperationalError("conexión perdida")
+    connection.close.assert_called_once()
+    assert pool._idle.qsize() == 0  # pylint: disable=protected-access
@@ -0,0 +1,54 @@
+"""
+Path: tests/test_online_ddl.py
+
+"""
+
+from unittest.mock import MagicMock
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.core.config import db
+from app.utils import online_ddl
+from app.utils.online_ddl import create_index_online, drop_index_online
+
+def migration_op(dialect, bind=None):
+    " Operaciones de Alembic simuladas para el dialecto indicado. "
+    op = MagicMock()
+    op.get_context.return_value.as_sql = False
+    op.get_context.return_value.dialect = dialect
+    op.get_bind.return_value = bind
+    return op
+
+def test_mysql_index_is_built_inplace_without_lock(monkeypatch):
+    " Prueba que en MySQL el índice se crea y elimina con ALGORITHM=INPLACE, LOCK=NONE. "
+    monkeypatch.setattr(online_ddl, "index_exists", lambda op, table, name: False)
+    op = migration_op(mysql.dialect())
+    create_index_online(op, "ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"])
+    op.execute.assert_called_once_with(
+        "ALTER TABLE conversations ADD INDEX ix_conversations_user_id_created_at (user_id, created_at), "
+        "ALGORITHM=INPLACE, LOCK=NONE")
+
+    monkeypatch.setattr(online_ddl, "index_exists", lambda op, table, name: True)
+    op = migration_op(mysql.dialect())
+    drop_index_online(op, "ix_conversations_user_id_created_at", "conversations")
+    assert op.execute.call_args.args[0].endswith("DROP INDEX ix_conversations_user_id_created_at, "
+                                                 "ALGORITHM=INPLACE, LOCK=NONE")
+
+def test_postgresql_index_is_built_concurrently(monkeypatch):
+    " Prueba que en PostgreSQL el índice se crea CONCURRENTLY fuera de la transacción. "
+    monkeypatch.setattr(online_ddl, "index_exists", lambda op, table, name: False)
+    op = migration_op(postgresql.dialect())
+    create_index_online(op, "ix_test", "conversations", ["user_id", "created_at"])
+    op.get_context.return_value.autocommit_block.assert_called_once()
+    op.create_index.assert_called_once_with("ix_test", "conversations", ["user_id", "created_at"],
+                                            postgresql_concurrently=True)
+
+def test_existing_index_is_not_created_again():
+    " Prueba que la creación es idempotente: el índice declarado en el modelo ya existe. "
+    engine = sa.create_engine("sqlite://")
+    db.metadata.create_all(engine, tables=[db.metadata.tables["users"], db.metadata.tables["conversations"]])
+    with engine.connect() as connection:
+        op = migration_op(sqlite.dialect(), connection)
+        create_index_online(op, "ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"])
+        op.create_index.assert_not_called()
+        drop_index_online(op, "ix_missing", "conversations")
+        op.drop_index.assert_not_called()
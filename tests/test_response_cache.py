@@ -0,0 +1,169 @@
+"""
+Path: tests/test_response_cache.py
+
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+from app.components.services.cache.response_cache import ResponseCache, normalize_prompt, prompt_digest
+from app.components.services.cache.cache_impl.memory_backend import MemoryCacheBackend
+from app.components.services.cache.cache_impl.sqlite_backend import SQLiteCacheBackend
+from app.components.services.cache.cache_impl.redis_backend import RedisCacheBackend
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.llm.llm_client import IBaseLLMClient
+from app.components.services.response.response_generator import ResponseGenerator
+from app.components.services.session.context_builder import ContextBuilder
+
+class FakeRedis:
+    " Sustituto local mínimo de un cliente redis-py. "
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        " Lee una clave. "
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        " Escribe una clave (el TTL lo gestionaría el servidor). "
+        self.data[key] = value
+
+    def delete(self, key):
+        " Elimina una clave. "
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        " Itera las claves con el prefijo indicado. "
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+@pytest.fixture
+def generator(monkeypatch):
+    " Fixture con un ResponseGenerator con LLM y reglas simulados y caché en memoria. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IBaseLLMClient)
+    llm.model_name = "fake-model"
+    llm.send_message.side_effect = lambda message: f"LLM: {message}"
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    cache = ResponseCache(MemoryCacheBackend(16), ttl=60)
+    return ResponseGenerator(llm, response_cache=cache, rules_engine=rules)
+
+def test_normalize_prompt_keeps_digits():
+    " Prueba que la normalización no elimina dígitos ni signos. "
+    assert normalize_prompt("  ¿Stock  del\tProducto 12?") == normalize_prompt("¿stock del producto 12?")
+    assert normalize_prompt("producto 12") != normalize_prompt("producto 13")
+
+def test_generator_serves_repeated_prompt_from_cache(generator):
+    " Prueba que un prompt repetido no vuelve a llamar al LLM. "
+    assert generator.generate_response("¿Qué es el VAN?") == "LLM: ¿Qué es el VAN?"
+    assert generator.generate_response("¿qué es  el VAN?") == "LLM: ¿Qué es el VAN?"
+    generator.model.send_message.assert_called_once()
+    assert generator.response_cache.stats()["hits"] == 1
+
+def test_key_depends_on_model_and_instructions():
+    " Prueba que la clave cambia con el modelo y las instrucciones del sistema. "
+    cache = ResponseCache(MemoryCacheBackend())
+    cache.set("hola", "modelo-a", "inst-1", "respuesta")
+    assert cache.get("hola", "modelo-a", "inst-1") == "respuesta"
+    assert cache.get("hola", "modelo-b", "inst-1") is None
+    assert cache.get("hola", "modelo-a", "inst-2") is None
+
+def test_memory_backend_ttl_and_lru():
+    " Prueba la expiración por TTL y la expulsión LRU del backend en memoria. "
+    now = [0.0]
+    backend = MemoryCacheBackend(max_entries=2, clock=lambda: now[0])
+    backend.set("a", "1", ttl=10)
+    backend.set("b", "2", ttl=10)
+    backend.get("a")
+    backend.set("c", "3", ttl=10)
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    now[0] = 11
+    assert backend.get("a") is None
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    " Prueba que dos instancias (como dos workers) comparten el archivo SQLite. "
+    path = str(tmp_path / "cache" / "responses.sqlite3")
+    writer, reader = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+    writer.set("clave", "valor", ttl=60)
+    assert reader.get("clave") == "valor"
+    writer.set("vencida", "valor", ttl=-1)
+    assert reader.get("vencida") is None
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path):
+    " Prueba la expulsión LRU del backend SQLite. "
+    backend = SQLiteCacheBackend(str(tmp_path / "responses.sqlite3"), max_entries=2, evict_every=1)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    backend.set("c", "3", ttl=60)
+    assert backend.get("a") is None
+    assert backend.get("c") == "3"
+
+def test_redis_backend_with_local_stand_in():
+    " Prueba el backend Redis con un sustituto local del cliente. "
+    backend = RedisCacheBackend(FakeRedis())
+    cache = ResponseCache(backend)
+    cache.set("hola", "modelo", "inst", "¡Hola!")
+    assert cache.get("hola", "modelo", "inst") == "¡Hola!"
+    backend.clear()
+    assert cache.get("hola", "modelo", "inst") is None
+
+def test_concurrent_identical_prompts_share_one_llm_call(generator):
+    " Prueba que las consultas idénticas concurrentes comparten una llamada al LLM y su error. "
+    release = threading.Event()
+    outcomes = []
+
+    def slow_llm(message):
+        release.wait(5)
+        raise RuntimeError(f"fallo: {message}")
+
+    def ask(prompt):
+        try:
+            generator.generate_response(prompt)
+        except RuntimeError as exc:
+            outcomes.append(str(exc))
+
+    generator.model.send_message.side_effect = slow_llm
+    threads = [threading.Thread(target=ask, args=(prompt,))
+               for prompt in ["Precio del cartón", "precio del  cartón", "PRECIO DEL CARTÓN"]]
+    for thread in threads:
+        thread.start()
+    key = prompt_digest("precio del cartón", generator.model_name, generator.instruction_digest)
+    deadline = time.monotonic() + 5
+    while generator.single_flight.waiters(key) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    generator.model.send_message.assert_called_once()
+    assert len(outcomes) == 3 and len(set(outcomes)) == 1
+    assert generator.single_flight.stats() == {"executed": 1, "shared": 2, "in_flight": 0}
+
+def test_cache_backend_errors_do_not_fail_the_request(generator):
+    " Prueba que una caché caída cuenta como fallo de caché y no descarta la respuesta del LLM. "
+    backend = Mock(spec=MemoryCacheBackend)
+    backend.get.side_effect = ConnectionError("Redis caído")
+    backend.set.side_effect = ConnectionError("Redis caído")
+    generator.response_cache = ResponseCache(backend)
+    assert generator.generate_response("¿Qué es el VAN?") == "LLM: ¿Qué es el VAN?"
+    assert generator.generate_response("¿Qué es el VAN?") == "LLM: ¿Qué es el VAN?"
+    assert generator.model.send_message.call_count == 2
+    backend.set.assert_called()
+
+def test_instruction_change_changes_cache_scope(generator, tmp_path):
+    " Prueba que al editar la instrucción del sistema cambian las claves de caché y el presupuesto. "
+    instruction_file = tmp_path / "system_instruction.txt"
+    instruction_file.write_text("Sos MadyBot.", encoding="utf-8")
+    generator.model_config.instruction_file_path = str(instruction_file)
+    assert generator.generate_response("¿Qué es el VAN?") == "LLM: ¿Qué es el VAN?"
+    first_digest = generator.instruction_digest
+
+    instruction_file.write_text("Sos MadyBot, versión 2 con más detalle.", encoding="utf-8")
+    assert generator.instruction_digest != first_digest
+    generator.generate_response("¿Qué es el VAN?")
+    assert generator.model.send_message.call_count == 2
+
+    builder = ContextBuilder(system_instruction=generator.model_config.current_system_instruction)
+    assert builder.system_tokens == builder.counter.count("Sos MadyBot, versión 2 con más detalle.")
@@ -0,0 +1,54 @@
+"""
+Path: tests/test_semantic_cache.py
+
+"""
+
+from unittest.mock import Mock
+from app.components.services.cache.semantic_cache import SemanticResponseCache, prompt_terms
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.llm.llm_client import IBaseLLMClient
+from app.components.services.response.response_generator import ResponseGenerator
+
+def test_prompt_terms_ignore_order_punctuation_and_filler():
+    " Prueba que el orden, los signos y las palabras de relleno no cambian los términos. "
+    assert prompt_terms("¿Me explicas qué es el VAN, por favor?") == prompt_terms("van qué es explicas")
+
+def test_similar_prompt_reuses_cached_answer():
+    " Prueba que un prompt casi duplicado reutiliza la respuesta e informa el prompt original. "
+    cache = SemanticResponseCache(threshold=0.8)
+    cache.store("¿Qué es el flujo de fondos descontado?", "Es un método de valuación.")
+    hit = cache.lookup("flujo de fondos descontado, ¿qué es?")
+    assert hit.response == "Es un método de valuación."
+    assert hit.cached_prompt == "¿Qué es el flujo de fondos descontado?"
+    assert hit.similarity == 1.0
+    assert cache.stats()["recent_hits"][0]["cached_prompt"] == hit.cached_prompt
+
+def test_different_prompt_is_not_reused():
+    " Prueba que prompts distintos no comparten respuesta, ni entre ámbitos. "
+    cache = SemanticResponseCache(threshold=0.8)
+    cache.store("¿Qué es el VAN?", "Valor actual neto.", scope="modelo-a")
+    assert cache.lookup("¿Qué es la TIR?", scope="modelo-a") is None
+    assert cache.lookup("¿Qué es el VAN?", scope="modelo-b") is None
+
+def test_entry_ttl_and_lru():
+    " Prueba el TTL por entrada y la expulsión LRU. "
+    now = [0.0]
+    cache = SemanticResponseCache(max_entries=2, clock=lambda: now[0])
+    cache.store("stock de materia prima", "100 kg", ttl=5)
+    cache.store("stock de producto final", "20 unidades", ttl=100)
+    cache.store("stock de producto intermedio", "7 unidades", ttl=100)
+    assert cache.lookup("stock de materia prima") is None
+    now[0] = 50
+    assert cache.lookup("stock de producto final").response == "20 unidades"
+
+def test_generator_uses_semantic_cache(monkeypatch):
+    " Prueba la integración con ResponseGenerator. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IBaseLLMClient)
+    llm.send_message.return_value = "Respuesta del LLM"
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    generator = ResponseGenerator(llm, rules_engine=rules, semantic_cache=SemanticResponseCache())
+    generator.generate_response("¿Cómo calculo el punto de equilibrio?")
+    assert generator.generate_response("calculo el punto de equilibrio cómo") == "Respuesta del LLM"
+    llm.send_message.assert_called_once()
@@ -0,0 +1,86 @@
+"""
+Path: tests/test_streaming_response.py
+
+"""
+
+import json
+from unittest.mock import Mock
+from flask import Flask
+from app.components.services.business.business_rules_engine import BusinessRulesEngine
+from app.components.services.data.data_service import DataService
+from app.components.services.llm.llm_client import IStreamingLLMClient
+from app.components.services.llm.llm_impl.gemini_llm import GeminiLLMClient
+from app.components.services.response.response_generator import ResponseGenerator
+from app.components.services.cache.response_cache import ResponseCache
+from app.components.services.cache.cache_impl.memory_backend import MemoryCacheBackend
+from app.utils.response import render_stream_response
+
+def test_gemini_streams_chunks_as_they_arrive():
+    " Prueba que Gemini se llama con stream=True y entrega los fragmentos sin esperar el final. "
+    client = GeminiLLMClient(api_key="fake_key", system_instruction="system_instruction")
+    client.model = Mock()
+    chat = client.model.start_chat.return_value
+    chat.send_message.return_value = iter([Mock(text="Hola, "), Mock(text="¿cómo estás?")])
+
+    stream = client.send_message_streaming("Hola")
+    assert next(stream) == "Hola, "
+    assert list(stream) == ["¿cómo estás?"]
+    chat.send_message.assert_called_once_with("Hola", stream=True)
+
+def test_generator_streams_and_caches_full_text(monkeypatch):
+    " Prueba que ResponseGenerator reenvía los fragmentos y cachea el texto completo. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IStreamingLLMClient)
+    llm.send_message_streaming.side_effect = lambda message, history=None: iter(["uno ", "dos"])
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.return_value = None
+    cache = ResponseCache(MemoryCacheBackend())
+    generator = ResponseGenerator(llm, rules_engine=rules, response_cache=cache)
+
+    assert list(generator.generate_response_streaming("contar")) == ["uno ", "dos"]
+    assert list(generator.generate_response_streaming("contar")) == ["uno dos"]
+    llm.send_message_streaming.assert_called_once()
+
+def test_streaming_answers_from_business_rules_first(monkeypatch):
+    " Prueba que con streaming una palabra clave se responde con la regla, igual que sin streaming. "
+    monkeypatch.setenv("GEMINI_API_KEY", "fake_key")
+    llm = Mock(spec=IStreamingLLMClient)
+    rules = Mock(spec=BusinessRulesEngine)
+    rules.get_response.side_effect = lambda message: "Horario: 9 a 18 h." if "horario" in message else None
+    generator = ResponseGenerator(llm, rules_engine=rules)
+
+    assert list(generator.generate_response_streaming("¿Cuál es el horario?")) == ["Horario: 9 a 18 h."]
+    assert generator.generate_response("¿Cuál es el horario?") == "Horario: 9 a 18 h."
+    llm.send_message_streaming.assert_not_called()
+
+def test_data_service_persists_after_stream_completes():
+    " Prueba que la respuesta completa se guarda recién al terminar el stream. "
+    validator, channel = Mock(), Mock()
+    validator.validate.return_value = {"user_data": {"id": "u1"}}
+    channel.receive_message.return_value = {"message": "hola", "stream": True}
+    generator = Mock()
+    generator.generate_response_streaming.return_value = iter(["¡Ho", "la!"])
+    conversations = Mock()
+    service = DataService(validator, generator, channel, Mock(), conversations)
+
+    chunks = service.process_incoming_data({})
+    assert next(chunks) == "¡Ho"
+    conversations.save_interaction.assert_not_called()
+    assert list(chunks) == ["la!"]
+    conversations.save_interaction.assert_called_once_with(
+        {"user_id": "u1", "message": "hola", "response": "¡Hola!"}, {"id": "u1"})
+
+def test_render_stream_response_emits_sse_events():
+    " Prueba el formato SSE, incluido el evento de error si el stream falla. "
+    def failing_chunks():
+        yield "parcial"
+        raise RuntimeError("se cortó")
+
+    with Flask(__name__).test_request_context():
+        response = render_stream_response(failing_chunks())
+        body = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/event-stream"
+    first, error = body.strip().split("\n\n")
+    assert json.loads(first[len("data: "):]) == {"response_MadyBot": None, "response_MadyBot_stream": "parcial"}
+    assert error.startswith("event: error\n")
@@ -0,0 +1,148 @@
+"""
+Path: tests/test_write_behind.py
+
+"""
+
+import json
+import os
+from unittest.mock import Mock
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from app.core.config import db
+from app.models import Conversation, User
+from app.repositories.conversation_repository import ConversationRepository
+from app.components.services.data.conversation_persistence_service import ConversationPersistenceService
+from app.components.services.data.write_behind import WriteBehindQueue, persistence_flusher
+
+@pytest.fixture
+def app_context():
+    " Aplicación Flask con SQLite en memoria y las tablas del modelo. "
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_batches_by_size_and_by_delay():
+    " Prueba que los registros se agrupan al llegar a max_batch o al vencer max_delay. "
+    batches = []
+    write_behind = WriteBehindQueue(batches.append, max_batch=3, max_delay=0.05)
+    write_behind.start()
+    for number in range(7):
+        write_behind.put({"n": number})
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [record["n"] for batch in batches for record in batch] == list(range(7))
+    assert write_behind.stats()["depth"] == 0 and write_behind.stats()["flushed"] == 7
+
+def test_failed_batch_is_retried_in_order():
+    " Prueba que un lote fallido queda al frente de la cola y se reintenta. "
+    batches, calls = [], []
+
+    def flaky_flush(records):
+        calls.append([record["n"] for record in records])
+        if len(calls) == 1:
+            raise RuntimeError("BD caída")
+        batches.append(records)
+
+    write_behind = WriteBehindQueue(flaky_flush, max_batch=2, max_delay=0.01, retry_delay=0.01)
+    write_behind.start()
+    for number in range(4):
+        write_behind.put({"n": number})
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    assert calls[0] == calls[1] == [0, 1]
+    assert [record["n"] for batch in batches for record in batch] == [0, 1, 2, 3]
+    assert write_behind.stats()["failures"] == 1
+
+def test_orphan_spool_is_recovered(tmp_path):
+    " Prueba que al arrancar se retoman los registros no confirmados del spool de un proceso caído. "
+    orphan = tmp_path / "spool-99999.jsonl"
+    lines = [json.dumps({"seq": seq, "record": {"n": seq}}) for seq in (1, 2, 3)]
+    orphan.write_text("\n".join(lines + [json.dumps({"ack": 2}), '{"seq": 4, "rec']), encoding="utf-8")
+
+    batches = []
+    write_behind = WriteBehindQueue(batches.append, max_delay=0.01, spool_dir=str(tmp_path))
+    write_behind.start()
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    assert batches == [[{"n": 3}]]
+    assert write_behind.stats()["recovered"] == 1
+    assert not orphan.exists()
+    assert os.path.getsize(tmp_path / f"spool-{os.getpid()}.jsonl") == 0
+
+def test_flusher_saves_batch_in_one_transaction(app_context):
+    " Prueba el guardado masivo de usuarios y conversaciones encolados, con un único commit. "
+    write_behind = WriteBehindQueue(persistence_flusher(ConversationRepository()), max_batch=100, max_delay=60)
+    service = ConversationPersistenceService(ConversationRepository(), write_behind)
+    for number in range(10):
+        user_data = {"id": f"u{number % 3}", "browserData": {"language": "es-AR", "platform": f"P{number}"}}
+        assert service.save_interaction({"user_id": user_data["id"], "message": f"m{number}",
+                                         "response": f"r{number}"}, user_data) is None
+    assert Conversation.query.count() == 0
+
+    commits = []
+    event.listen(db.engine, "commit", lambda *args: commits.append(1))
+    write_behind.start(app_context.app_context)
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    db.session.remove()
+    assert len(commits) == 1
+    assert Conversation.query.count() == 10
+    assert {user.user_id: user.platform for user in User.query.all()} == {"u0": "P9", "u1": "P7", "u2": "P8"}
+
+def test_bad_record_is_isolated_and_dead_lettered(tmp_path):
+    " Prueba que un registro que falla siempre se aísla por bisección y no bloquea la cola. "
+    saved = []
+
+    def flush_fn(records):
+        if any(record["n"] == 5 for record in records):
+            raise ValueError("NOT NULL")
+        saved.extend(record["n"] for record in records)
+
+    write_behind = WriteBehindQueue(flush_fn, max_batch=8, max_delay=60, spool_dir=str(tmp_path),
+                                    retry_delay=0.001, max_attempts=2)
+    for number in range(8):
+        write_behind.put({"n": number})
+    write_behind.start()
+    assert write_behind.flush(timeout=2)
+    write_behind.put({"n": 8})
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    assert saved == [0, 1, 2, 3, 4, 6, 7, 8]
+    assert write_behind.stats()["dead_lettered"] == 1
+    dead = [json.loads(line) for line in (tmp_path / "dead-letter.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert dead[0]["record"] == {"n": 5} and dead[0]["error"] == "NOT NULL"
+
+def test_transient_errors_are_not_dead_lettered():
+    " Prueba que un error transitorio se reintenta sin dividir ni descartar el lote. "
+    calls = []
+
+    def flush_fn(records):
+        calls.append(len(records))
+        if len(calls) < 5:
+            raise ConnectionError("BD caída")
+
+    write_behind = WriteBehindQueue(flush_fn, max_batch=4, max_delay=60, retry_delay=0.001, max_attempts=2,
+                                    is_permanent=lambda error: not isinstance(error, ConnectionError))
+    for number in range(4):
+        write_behind.put({"n": number})
+    write_behind.start()
+    assert write_behind.flush(timeout=2)
+    write_behind.close()
+    assert calls == [4] * 5 and write_behind.stats()["dead_lettered"] == 0
+
+def test_spool_error_falls_back_to_synchronous_write(app_context, tmp_path, monkeypatch):
+    " Prueba que si no se puede escribir el spool, la interacción se guarda en línea. "
+    write_behind = WriteBehindQueue(Mock(), spool_dir=str(tmp_path))
+    monkeypatch.setattr(write_behind, "_write_spool", Mock(side_effect=OSError("disco lleno")))
+    service = ConversationPersistenceService(ConversationRepository(), write_behind)
+    conversation_id = service.save_interaction({"user_id": "u1", "message": "hola", "response": "r"},
+                                               {"id": "u1"})
+    assert conversation_id is not None
+    assert write_behind.stats()["depth"] == 0 and write_behind._seq == 0  # pylint: disable=protected-access